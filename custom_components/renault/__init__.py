@@ -3,17 +3,26 @@ import aiohttp
 from awesomeversion import AwesomeVersion
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import __version__, CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import callback
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers.typing import HomeAssistantType
 import logging
+from time import monotonic
 
 
-from .const import CONF_LOCALE, DOMAIN, SUPPORTED_PLATFORMS
+from .const import CONF_LOCALE, CONF_PROMETHEUS_METRICS, DOMAIN, SUPPORTED_PLATFORMS
 from .renault_hub import RenaultHub
-from .services import async_setup_services, async_unload_services
+from .services import (
+    async_register_vehicles,
+    async_setup_services,
+    async_unload_services,
+    async_unregister_vehicles,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+RENAULT_METRICS_VIEW = "renault_metrics_view"
+
 
 async def async_setup(hass, config):
     """Set up renault integrations."""
@@ -30,6 +39,7 @@ async def async_setup_entry(hass: HomeAssistantType, config_entry: ConfigEntry):
     """Load a config entry."""
     hass.data.setdefault(DOMAIN, {})
 
+    started = monotonic()
     renault_hub = RenaultHub(hass, config_entry.data[CONF_LOCALE])
     try:
         login_success = await renault_hub.attempt_login(
@@ -42,8 +52,11 @@ async def async_setup_entry(hass: HomeAssistantType, config_entry: ConfigEntry):
         return False
 
     await renault_hub.async_initialise(config_entry)
+    renault_hub.startup_timings["setup_entry"] = monotonic() - started
+    _LOGGER.debug("Startup timings: %s", renault_hub.startup_timings)
 
     hass.data[DOMAIN][config_entry.unique_id] = renault_hub
+    async_register_vehicles(hass, renault_hub)
 
     for component in SUPPORTED_PLATFORMS:
         hass.async_create_task(
@@ -52,9 +65,27 @@ async def async_setup_entry(hass: HomeAssistantType, config_entry: ConfigEntry):
 
     await async_setup_services(hass)
 
+    if config_entry.options.get(CONF_PROMETHEUS_METRICS, False):
+        async_register_metrics_view(hass)
+
     return True
 
 
+@callback
+def async_register_metrics_view(hass: HomeAssistantType) -> None:
+    """Register the Prometheus metrics view, once."""
+    if hass.data.get(RENAULT_METRICS_VIEW):
+        return
+    if hass.http is None:
+        _LOGGER.warning("Prometheus metrics require the http integration")
+        return
+    # Local import, the http integration is only needed for this option.
+    from .renault_prometheus import RenaultMetricsView
+
+    hass.http.register_view(RenaultMetricsView())
+    hass.data[RENAULT_METRICS_VIEW] = True
+
+
 async def async_unload_entry(hass, config_entry):
     """Unload a config entry."""
     unload_ok = True
@@ -65,7 +96,9 @@ async def async_unload_entry(hass, config_entry):
         )
 
     if unload_ok:
-        hass.data[DOMAIN].pop(config_entry.unique_id)
+        renault_hub = hass.data[DOMAIN].pop(config_entry.unique_id)
+        async_unregister_vehicles(hass, renault_hub)
+        await renault_hub.async_unload()
         if not hass.data[DOMAIN]:
             await async_unload_services(hass)
 
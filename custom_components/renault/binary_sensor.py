@@ -8,7 +8,6 @@ from homeassistant.components.binary_sensor import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.typing import HomeAssistantType
-from renault_api.kamereon.enums import ChargeState, PlugState
 
 from .const import DOMAIN
 from .renault_entities import RenaultBatteryDataEntity, RenaultDataEntity
@@ -50,9 +49,7 @@ class RenaultPluggedInSensor(RenaultBatteryDataEntity, BinarySensorEntity):
     @property
     def is_on(self) -> Optional[bool]:
         """Return true if the binary sensor is on."""
-        if (not self.data) or (self.data.plugStatus is None):
-            return None
-        return self.data.get_plug_status() == PlugState.PLUGGED
+        return self.snapshot.plugged_in if self.snapshot else None
 
     @property
     def icon(self) -> str:
@@ -71,11 +68,9 @@ class RenaultChargingSensor(RenaultBatteryDataEntity, BinarySensorEntity):
     """Charging sensor."""
 
     @property
-    def is_on(self) -> bool:
+    def is_on(self) -> Optional[bool]:
         """Return true if the binary sensor is on."""
-        if (not self.data) or (self.data.chargingStatus is None):
-            return None
-        return self.data.get_charging_status() == ChargeState.CHARGE_IN_PROGRESS
+        return self.snapshot.charging if self.snapshot else None
 
     @property
     def icon(self) -> str:
@@ -11,8 +11,17 @@ import voluptuous as vol
 from .const import (  # pylint: disable=unused-import
     CONF_DISTANCES_IN_MILES,
     CONF_KAMEREON_ACCOUNT_ID,
+    CONF_DAILY_REQUEST_BUDGET,
     CONF_LOCALE,
+    CONF_PROMETHEUS_METRICS,
+    CONF_REQUEST_BUDGET,
+    CONF_TRACKER_MAX_INTERVAL,
+    CONF_TRACKER_MIN_DISTANCE,
+    DEFAULT_DAILY_REQUEST_BUDGET,
+    DEFAULT_REQUEST_BUDGET,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_TRACKER_MAX_INTERVAL,
+    DEFAULT_TRACKER_MIN_DISTANCE,
     DOMAIN,
     MIN_SCAN_INTERVAL,
 )
@@ -130,6 +139,36 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                             CONF_DISTANCES_IN_MILES, False
                         ),
                     ): bool,
+                    vol.Optional(
+                        CONF_TRACKER_MIN_DISTANCE,
+                        default=self.config_entry.options.get(
+                            CONF_TRACKER_MIN_DISTANCE, DEFAULT_TRACKER_MIN_DISTANCE
+                        ),
+                    ): cv.positive_int,
+                    vol.Optional(
+                        CONF_TRACKER_MAX_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_TRACKER_MAX_INTERVAL, DEFAULT_TRACKER_MAX_INTERVAL
+                        ),
+                    ): cv.positive_int,
+                    vol.Optional(
+                        CONF_PROMETHEUS_METRICS,
+                        default=self.config_entry.options.get(
+                            CONF_PROMETHEUS_METRICS, False
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_REQUEST_BUDGET,
+                        default=self.config_entry.options.get(
+                            CONF_REQUEST_BUDGET, DEFAULT_REQUEST_BUDGET
+                        ),
+                    ): cv.positive_int,
+                    vol.Optional(
+                        CONF_DAILY_REQUEST_BUDGET,
+                        default=self.config_entry.options.get(
+                            CONF_DAILY_REQUEST_BUDGET, DEFAULT_DAILY_REQUEST_BUDGET
+                        ),
+                    ): cv.positive_int,
                 }
             ),
         )
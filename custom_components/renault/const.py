@@ -6,9 +6,18 @@ CONF_KAMEREON_APIKEY = "kamereon-api-key"
 CONF_LOCALE = "locale"
 CONF_KAMEREON_ACCOUNT_ID = "kamereon_account_id"
 CONF_DISTANCES_IN_MILES = "distances_in_miles"
+CONF_TRACKER_MIN_DISTANCE = "tracker_min_distance"
+CONF_TRACKER_MAX_INTERVAL = "tracker_max_interval"
+CONF_PROMETHEUS_METRICS = "prometheus_metrics"
+CONF_REQUEST_BUDGET = "request_budget"
+CONF_DAILY_REQUEST_BUDGET = "daily_request_budget"
 
 DEFAULT_SCAN_INTERVAL = 300  # 5 minutes
 MIN_SCAN_INTERVAL = 60  # 1 minute
+DEFAULT_TRACKER_MIN_DISTANCE = 0  # meters, every move is tracked
+DEFAULT_TRACKER_MAX_INTERVAL = 3600  # 1 hour
+DEFAULT_REQUEST_BUDGET = 0  # requests per hour, no warning
+DEFAULT_DAILY_REQUEST_BUDGET = 0  # requests per day, no warning
 
 REGEX_VIN = "(?i)^VF1[\\w]{14}$"
 
@@ -22,4 +31,9 @@ DEVICE_CLASS_PLUG_STATE = "renault__plug_state"
 DEVICE_CLASS_CHARGE_STATE = "renault__charge_state"
 DEVICE_CLASS_CHARGE_MODE = "renault__charge_mode"
 
+# Sensor state classes are not available in all supported Home Assistant
+# versions, so they are also exposed as capability attributes.
+ATTR_STATE_CLASS = "state_class"
+STATE_CLASS_TOTAL_INCREASING = "total_increasing"
+
 RENAULT_API_URL = "https://github.com/hacf-fr/renault-api/issues"
@@ -1,14 +1,22 @@
 """Device tracker for Renault vehicles."""
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from homeassistant.components.device_tracker import SOURCE_TYPE_GPS
 from homeassistant.components.device_tracker.config_entry import TrackerEntity
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
 from homeassistant.helpers.typing import HomeAssistantType
+from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN
-from .renault_entities import RenaultDataEntity, RenaultLocationDataEntity
+from .renault_entities import (
+    ATTR_LAST_UPDATE,
+    RenaultDataEntity,
+    RenaultLocationDataEntity,
+)
 from .renault_hub import RenaultHub
+from .renault_locations import haversine_distance
+from .renault_snapshots import LocationSnapshot
 from .renault_vehicle import RenaultVehicleProxy
 
 
@@ -40,7 +48,48 @@ async def get_vehicle_entities(vehicle: RenaultVehicleProxy) -> List[RenaultData
 
 
 class RenaultLocationSensor(RenaultLocationDataEntity, TrackerEntity):
-    """Location sensor."""
+    """Location sensor.
+
+    The tracked position only follows the vehicle when it moved further than
+    the minimum distance, or when the tracked position is older than the
+    maximum interval, so that GPS jitter of parked cars is ignored.
+    """
+
+    def __init__(self, vehicle: RenaultVehicleProxy, entity_type: str) -> None:
+        """Initialise entity."""
+        super().__init__(vehicle, entity_type)
+        self._position: Optional[LocationSnapshot] = None
+
+    def _update_position(self) -> None:
+        """Follow the latest location, unless the vehicle did not really move."""
+        snapshot = self.snapshot
+        position = self._position
+        if snapshot is None or snapshot.latitude is None or snapshot.longitude is None:
+            return
+        if position is not None:
+            if snapshot.last_update == position.last_update:
+                return
+            previous_time = dt_util.parse_datetime(position.last_update or "")
+            current_time = dt_util.parse_datetime(snapshot.last_update or "")
+            if (
+                previous_time is not None
+                and current_time is not None
+                and current_time - previous_time < self.vehicle.tracker_max_interval
+                and haversine_distance(
+                    position.latitude,
+                    position.longitude,
+                    snapshot.latitude,
+                    snapshot.longitude,
+                )
+                < self.vehicle.tracker_min_distance
+            ):
+                return
+        self._position = snapshot
+
+    @property
+    def position(self) -> Optional[LocationSnapshot]:
+        """Return the tracked position."""
+        return self._position or self.snapshot
 
     @property
     def icon(self) -> str:
@@ -50,12 +99,45 @@ class RenaultLocationSensor(RenaultLocationDataEntity, TrackerEntity):
     @property
     def latitude(self) -> Optional[float]:
         """Return latitude value of the device."""
-        return self.data.gpsLatitude
+        return self.position.latitude
 
     @property
     def longitude(self) -> Optional[float]:
         """Return longitude value of the device."""
-        return self.data.gpsLongitude
+        return self.position.longitude
+
+    @property
+    def device_state_attributes(self) -> Dict[str, Any]:
+        """Return the device state attributes."""
+        attrs = {}
+        if self.position.last_update:
+            attrs[ATTR_LAST_UPDATE] = self.position.last_update
+        return attrs
+
+    def _state_fingerprint(self) -> Tuple[Any, ...]:
+        """Return the values that end up in the state machine."""
+        # The state is looked up from the zones, which can change while the
+        # coordinates stay the same.
+        if not self.available:
+            return (False,)
+        return (
+            True,
+            self.state,
+            self.latitude,
+            self.longitude,
+            self.device_state_attributes,
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        self._update_position()
+        await super().async_added_to_hass()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._update_position()
+        super()._handle_coordinator_update()
 
     @property
     def source_type(self) -> str:
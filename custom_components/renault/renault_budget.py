@@ -0,0 +1,173 @@
+"""Rolling count of the requests made to Renault servers by an account."""
+from collections import deque
+import logging
+from time import time
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.typing import HomeAssistantType
+
+LOGGER = logging.getLogger(__name__)
+
+EVENT_REQUEST_BUDGET = "renault_request_budget"
+
+REQUEST_COMMAND = "command"
+REQUEST_POLL = "poll"
+
+# Requests are counted in buckets of this many seconds.
+BUCKET_SIZE = 60
+HOUR = 3600
+DAY = 86400
+
+_Key = Tuple[str, str]
+
+
+class RollingCounter:
+    """Request counts over a rolling window, by (endpoint, kind).
+
+    Requests are added to per-minute buckets, and the totals of the window
+    are updated when a bucket enters or leaves it, so that counting a request
+    and reading the totals do not depend on the number of requests.
+    """
+
+    __slots__ = ("_length", "_buckets", "totals")
+
+    def __init__(self, length: int) -> None:
+        """Initialise counter, with a window length in seconds."""
+        self._length = length
+        self._buckets: Deque[Tuple[int, Dict[_Key, int]]] = deque()
+        self.totals: Dict[_Key, int] = {}
+
+    def add(self, now: float, key: _Key) -> None:
+        """Count a request."""
+        self.expire(now)
+        bucket = int(now) // BUCKET_SIZE
+        if not self._buckets or self._buckets[-1][0] != bucket:
+            self._buckets.append((bucket, {}))
+        counts = self._buckets[-1][1]
+        counts[key] = counts.get(key, 0) + 1
+        self.totals[key] = self.totals.get(key, 0) + 1
+
+    def expire(self, now: float) -> None:
+        """Remove the buckets which left the window."""
+        oldest = (int(now) - self._length) // BUCKET_SIZE
+        while self._buckets and self._buckets[0][0] <= oldest:
+            for key, count in self._buckets.popleft()[1].items():
+                total = self.totals[key] - count
+                if total:
+                    self.totals[key] = total
+                else:
+                    del self.totals[key]
+
+    def total(self) -> int:
+        """Return the number of requests in the window."""
+        return sum(self.totals.values())
+
+    def by_position(self, position: int) -> Dict[str, int]:
+        """Return the number of requests by endpoint (0) or by kind (1)."""
+        result: Dict[str, int] = {}
+        for key, count in self.totals.items():
+            result[key[position]] = result.get(key[position], 0) + count
+        return result
+
+
+class RequestBudget:
+    """Requests made by an account over the last hour and day.
+
+    A warning event is fired when the requests of the last hour, or day,
+    reach the hourly, or daily, budget, and again only once they have
+    dropped below it. Listeners are called after each request.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistantType,
+        account_id: Optional[str] = None,
+        hourly_budget: int = 0,
+        daily_budget: int = 0,
+    ) -> None:
+        """Initialise request budget."""
+        self.hass = hass
+        self.account_id = account_id
+        # Requests per hour and per day, no warning if 0.
+        self.hourly_budget = hourly_budget
+        self.daily_budget = daily_budget
+        self._hour = RollingCounter(HOUR)
+        self._day = RollingCounter(DAY)
+        self._exceeded = {"hour": False, "day": False}
+        self._listeners: List[CALLBACK_TYPE] = []
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> Callable[[], None]:
+        """Listen for requests, and return a callback to stop listening."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    def record(self, endpoint: str, kind: str) -> None:
+        """Count a request to an endpoint, for a poll or a command."""
+        now = time()
+        key = (endpoint, kind)
+        self._hour.add(now, key)
+        self._day.add(now, key)
+        self._check("hour", self._hour, self.hourly_budget)
+        self._check("day", self._day, self.daily_budget)
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def _check(self, window: str, counter: RollingCounter, budget: int) -> None:
+        """Warn when the requests of a window reach its budget."""
+        if not budget:
+            return
+        requests = counter.total()
+        if requests < budget:
+            self._exceeded[window] = False
+        elif not self._exceeded[window]:
+            self._exceeded[window] = True
+            LOGGER.warning(
+                "%s requests to Renault servers in the last %s, budget is %s",
+                requests,
+                window,
+                budget,
+            )
+            self.hass.bus.async_fire(
+                EVENT_REQUEST_BUDGET,
+                {
+                    "account": self.account_id,
+                    "window": window,
+                    "requests": requests,
+                    "budget": budget,
+                },
+            )
+
+    def _counters(self) -> List[RollingCounter]:
+        """Return the counters, without the expired requests."""
+        now = time()
+        self._hour.expire(now)
+        self._day.expire(now)
+        return [self._hour, self._day]
+
+    @property
+    def hour_requests(self) -> int:
+        """Return the number of requests in the last hour."""
+        return self._counters()[0].total()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the requests of each window, by endpoint and by kind."""
+        return {
+            window: {
+                "requests": counter.total(),
+                "budget": budget or None,
+                "endpoints": counter.by_position(0),
+                "kinds": counter.by_position(1),
+            }
+            for window, counter, budget in zip(
+                ("hour", "day"),
+                self._counters(),
+                (self.hourly_budget, self.daily_budget),
+            )
+        }
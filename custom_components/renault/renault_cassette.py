@@ -0,0 +1,347 @@
+"""Opt-in recording of the exchanges with the Renault servers into cassettes."""
+import asyncio
+import base64
+from datetime import timedelta
+import json
+import logging
+import re
+from time import monotonic, time
+from typing import Any, Dict, List, Mapping, Match, Optional
+
+import aiohttp
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.typing import HomeAssistantType
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import save_json
+from yarl import URL
+
+LOGGER = logging.getLogger(__name__)
+
+RENAULT_CASSETTE = "renault_cassette"
+
+CASSETTE_VERSION = 1
+REDACTED = "**REDACTED**"
+
+# Keys holding credentials or personal data, in Gigya form data and in
+# response bodies, in lower case: Gigya spells the API key ApiKey in requests.
+# Gigya account responses hold the e-mail of the account, which is also its
+# login ID, in profile, emails and loginIDs.
+SCRUBBED_KEYS = frozenset(
+    {
+        "apikey",
+        "cookievalue",
+        "email",
+        "emails",
+        "id_token",
+        "login_token",
+        "loginid",
+        "loginids",
+        "password",
+        "profile",
+        "radiocode",
+        "registrationnumber",
+        "uid",
+        "uidsignature",
+    }
+)
+
+# Keys holding the location of vehicles, in lower case, whose values are removed.
+LOCATION_KEYS = frozenset({"gpslatitude", "gpslongitude"})
+
+# Keys identifying the person, the accounts and the vehicles, in lower case,
+# with the kind of placeholder replacing their values.
+PLACEHOLDER_KEYS = {"accountid": "account", "personid": "person", "vin": "vin"}
+
+# Path segments identifying the person, the accounts and the vehicles, with the
+# kind of placeholder replacing them.
+PLACEHOLDER_SEGMENTS = {
+    "accounts": "account",
+    "cars": "vin",
+    "persons": "person",
+    "vehicles": "vin",
+}
+PLACEHOLDER_PATH = re.compile(r"/(accounts|cars|persons|vehicles)/([^/]+)")
+
+# Service of each request, found by the start of its path after the root URL.
+SERVICE_PATHS = (("gigya", "/accounts."), ("kamereon", "/commerce/"))
+
+
+def scrub(value: Any, replacements: Optional[Mapping[str, str]] = None) -> Any:
+    """Return a copy of a JSON value, with the credentials and locations removed.
+
+    Strings found in replacements are replaced wherever they are.
+    """
+    if isinstance(value, dict):
+        return {
+            key: REDACTED
+            if key.lower() in SCRUBBED_KEYS
+            else None
+            if key.lower() in LOCATION_KEYS
+            else scrub(item, replacements)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [scrub(item, replacements) for item in value]
+    if isinstance(value, str) and replacements:
+        return replacements.get(value, value)
+    return value
+
+
+def _split_url(url: str) -> Dict[str, str]:
+    """Return the service and the path of a URL, without the root URL."""
+    path = URL(url).path
+    for service, start in SERVICE_PATHS:
+        index = path.find(start)
+        if index >= 0:
+            return {"service": service, "path": path[index:]}
+    return {"service": "other", "path": path}
+
+
+def _token_lifetime(token: str) -> Optional[int]:
+    """Return the seconds left before a JWT expires, without verifying it."""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+        return int(claims["exp"] - time())
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class RenaultCassetteRecorder:
+    """Recording session, writing a cassette to the config directory.
+
+    Exchanges are recorded in order, with their start time relative to the
+    start of the session and their duration. Credentials are redacted, and
+    the lifetime of each JWT is kept so that replays can expire tokens. The
+    credentials sent in requests, such as the login ID, are also redacted
+    from any later response. The person, account and vehicle identifiers
+    are replaced by placeholders (person-0, account-0, vin-0...), in paths
+    and in bodies, so that a replay can map them to other values.
+    Recording goes on through config entry reloads, until the duration
+    expires or Home Assistant stops.
+    """
+
+    def __init__(self, hass: HomeAssistantType) -> None:
+        """Initialise recording session."""
+        self.hass = hass
+        self.path = hass.config.path(
+            f"renault_cassette_{dt_util.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+        self.exchanges: List[Dict[str, Any]] = []
+        # Redacted request fields and identifiers, with their replacement.
+        self._replacements: Dict[str, str] = {}
+        self._placeholders: Dict[str, int] = {}
+        self._recorded = dt_util.utcnow().isoformat()
+        self._started = monotonic()
+        self._unsub_stop: Optional[CALLBACK_TYPE] = None
+        self._unsub_shutdown: Optional[CALLBACK_TYPE] = None
+
+    @callback
+    def async_start(self, duration: timedelta) -> None:
+        """Record until the duration expires."""
+        self._unsub_stop = async_call_later(
+            self.hass, duration.total_seconds(), self._async_handle_stop
+        )
+        self._unsub_shutdown = self.hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_handle_shutdown
+        )
+        LOGGER.info("Recording for %s, writing to %s", duration, self.path)
+
+    def _placeholder(self, kind: str, value: str) -> str:
+        """Return the placeholder of an identifier, adding it if it is new."""
+        if value not in self._replacements:
+            index = self._placeholders.get(kind, 0)
+            self._placeholders[kind] = index + 1
+            self._replacements[value] = f"{kind}-{index}"
+        return self._replacements[value]
+
+    def _add_placeholders(self, value: Any) -> None:
+        """Add the placeholders of the identifiers found in a JSON value."""
+        if isinstance(value, dict):
+            for key, item in value.items():
+                kind = PLACEHOLDER_KEYS.get(key.lower())
+                if kind is not None and isinstance(item, str):
+                    self._placeholder(kind, item)
+                else:
+                    self._add_placeholders(item)
+        elif isinstance(value, list):
+            for item in value:
+                self._add_placeholders(item)
+
+    def _replace_segment(self, match: Match[str]) -> str:
+        """Return a path segment, with the identifier after it replaced."""
+        kind = PLACEHOLDER_SEGMENTS[match.group(1)]
+        return f"/{match.group(1)}/{self._placeholder(kind, match.group(2))}"
+
+    @callback
+    def record(
+        self,
+        method: str,
+        url: str,
+        kwargs: Dict[str, Any],
+        started: float,
+        status: Optional[int] = None,
+        text: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Record an exchange, or a request which failed with a client error."""
+        exchange: Dict[str, Any] = {
+            "time": round(started - self._started, 3),
+            "duration": round(monotonic() - started, 3),
+            "method": method,
+            **_split_url(url),
+        }
+        exchange["path"] = PLACEHOLDER_PATH.sub(self._replace_segment, exchange["path"])
+        for name in ("params", "data", "json"):
+            if kwargs.get(name) is not None:
+                fields = dict(kwargs[name])
+                self._replacements.update(
+                    (value, REDACTED)
+                    for key, value in fields.items()
+                    if key.lower() in SCRUBBED_KEYS and isinstance(value, str)
+                )
+                self._add_placeholders(fields)
+                exchange[name] = scrub(fields, self._replacements)
+        if error is not None:
+            exchange["error"] = error
+        else:
+            exchange["status"] = status
+            try:
+                body = json.loads(text or "")
+            except ValueError:
+                exchange["response"] = scrub(text, self._replacements)
+            else:
+                if isinstance(body, dict) and isinstance(body.get("id_token"), str):
+                    exchange["token_lifetime"] = _token_lifetime(body["id_token"])
+                self._add_placeholders(body)
+                exchange["response"] = json.dumps(scrub(body, self._replacements))
+        self.exchanges.append(exchange)
+
+    async def _async_handle_stop(self, _now: Any) -> None:
+        """Stop when the duration expires."""
+        self._unsub_stop = None
+        await self.async_stop()
+
+    async def _async_handle_shutdown(self, _event: Event) -> None:
+        """Stop when Home Assistant stops."""
+        self._unsub_shutdown = None
+        await self.async_stop()
+
+    async def async_stop(self) -> None:
+        """Stop recording, and write the cassette."""
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+        if self._unsub_shutdown is not None:
+            self._unsub_shutdown()
+            self._unsub_shutdown = None
+        if self.hass.data.get(RENAULT_CASSETTE) is self:
+            del self.hass.data[RENAULT_CASSETTE]
+        cassette = {
+            "version": CASSETTE_VERSION,
+            "recorded": self._recorded,
+            "exchanges": self.exchanges,
+        }
+        await self.hass.async_add_executor_job(save_json, self.path, cassette)
+        LOGGER.info(
+            "Cassette with %s exchanges written to %s", len(self.exchanges), self.path
+        )
+
+
+class _RecordedRequest:
+    """Request context manager, recording the exchange once it is done."""
+
+    __slots__ = ("_recorder", "_context", "_method", "_url", "_kwargs")
+
+    def __init__(
+        self,
+        recorder: RenaultCassetteRecorder,
+        context: Any,
+        method: str,
+        url: str,
+        kwargs: Dict[str, Any],
+    ) -> None:
+        """Initialise request."""
+        self._recorder = recorder
+        self._context = context
+        self._method = method
+        self._url = url
+        self._kwargs = kwargs
+
+    async def __aenter__(self) -> aiohttp.ClientResponse:
+        """Send the request, and record the response."""
+        started = monotonic()
+        try:
+            response = await self._context.__aenter__()
+            # aiohttp keeps the body, for the caller to read it again.
+            text = await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            self._recorder.record(
+                self._method, self._url, self._kwargs, started, error=type(err).__name__
+            )
+            raise
+        self._recorder.record(
+            self._method,
+            self._url,
+            self._kwargs,
+            started,
+            status=response.status,
+            text=text,
+        )
+        return response
+
+    async def __aexit__(self, *args: Any) -> Any:
+        """Release the response."""
+        return await self._context.__aexit__(*args)
+
+
+class CassetteClientSession:
+    """Client session recording the requests while a recording is active.
+
+    Anything other than requests is left to the wrapped session.
+    """
+
+    def __init__(
+        self, hass: HomeAssistantType, websession: aiohttp.ClientSession
+    ) -> None:
+        """Initialise session."""
+        self._hass = hass
+        self._websession = websession
+
+    def request(self, method: str, url: str, **kwargs: Any) -> Any:
+        """Send a request, recorded if a recording session is active."""
+        context = self._websession.request(method, url, **kwargs)
+        recorder: Optional[RenaultCassetteRecorder] = self._hass.data.get(
+            RENAULT_CASSETTE
+        )
+        if recorder is None:
+            return context
+        return _RecordedRequest(recorder, context, method, url, kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        """Return the attributes of the wrapped session."""
+        return getattr(self._websession, name)
+
+
+@callback
+def async_start_recorder(
+    hass: HomeAssistantType, duration: timedelta
+) -> RenaultCassetteRecorder:
+    """Start a recording session, unless one is already active."""
+    if RENAULT_CASSETTE in hass.data:
+        raise HomeAssistantError("A recording session is already active")
+    recorder = hass.data[RENAULT_CASSETTE] = RenaultCassetteRecorder(hass)
+    recorder.async_start(duration)
+    return recorder
+
+
+async def async_stop_recorder(hass: HomeAssistantType) -> None:
+    """Stop the active recording session, if any."""
+    recorder: Optional[RenaultCassetteRecorder] = hass.data.get(RENAULT_CASSETTE)
+    if recorder is not None:
+        await recorder.async_stop()
@@ -0,0 +1,131 @@
+"""Per-vehicle queue for commands sent to Renault servers."""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional
+
+from homeassistant.helpers.typing import HomeAssistantType
+
+LOGGER = logging.getLogger(__name__)
+
+COMMAND_AC_CANCEL = "ac_cancel"
+COMMAND_AC_START = "ac_start"
+COMMAND_CHARGE_MODE = "charge_mode"
+COMMAND_CHARGE_SCHEDULES = "charge_schedules"
+COMMAND_CHARGE_START = "charge_start"
+
+# Pending commands which are made obsolete by a newer command. Charge schedule
+# uploads are not merged: each one only holds the update of its caller.
+SUPERSEDED_COMMANDS: Dict[str, FrozenSet[str]] = {
+    COMMAND_AC_CANCEL: frozenset({COMMAND_AC_START, COMMAND_AC_CANCEL}),
+    COMMAND_AC_START: frozenset({COMMAND_AC_START}),
+    COMMAND_CHARGE_MODE: frozenset({COMMAND_CHARGE_MODE}),
+    COMMAND_CHARGE_START: frozenset({COMMAND_CHARGE_START}),
+}
+
+
+class CommandSupersededError(Exception):
+    """Raised to the caller of a command dropped in favour of a newer one."""
+
+    def __init__(self, command: str, superseded_by: str) -> None:
+        """Initialise error."""
+        super().__init__(f"{command} superseded by {superseded_by}")
+        self.command = command
+        self.superseded_by = superseded_by
+
+
+class QueuedCommand:
+    """Command waiting to be sent to the vehicle."""
+
+    __slots__ = ("command", "send", "future")
+
+    def __init__(
+        self,
+        command: str,
+        send: Callable[[], Awaitable[Any]],
+        future: "asyncio.Future[Any]",
+    ) -> None:
+        """Initialise queued command."""
+        self.command = command
+        self.send = send
+        self.future = future
+
+
+class RenaultCommandQueue:
+    """Serialize the commands sent to a vehicle and merge superseded ones.
+
+    Commands are sent one at a time. While a command is in flight, newer
+    commands are queued, and a queued command replaces any pending command
+    that it makes obsolete (for example an older charge mode, or an A/C
+    start followed by an A/C cancel). Callers of a dropped command get a
+    CommandSupersededError at once, rather than the outcome of the command
+    which replaced it.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistantType,
+        name: str,
+        on_send: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        """Initialise command queue."""
+        self._hass = hass
+        self._name = name
+        # Called with the command name before each command is sent.
+        self._on_send = on_send
+        self._pending: List[QueuedCommand] = []
+        self._worker: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def pending_commands(self) -> List[str]:
+        """Return the commands waiting to be sent."""
+        return [queued.command for queued in self._pending]
+
+    async def async_send(self, command: str, send: Callable[[], Awaitable[Any]]) -> Any:
+        """Queue a command and wait for its outcome."""
+        future: "asyncio.Future[Any]" = self._hass.loop.create_future()
+        queued = QueuedCommand(command, send, future)
+
+        superseded = SUPERSEDED_COMMANDS.get(command, frozenset())
+        for pending in list(self._pending):
+            if pending.command in superseded:
+                LOGGER.debug(
+                    "%s: dropping pending %s superseded by %s",
+                    self._name,
+                    pending.command,
+                    command,
+                )
+                self._pending.remove(pending)
+                if not pending.future.done():
+                    pending.future.set_exception(
+                        CommandSupersededError(pending.command, command)
+                    )
+        self._pending.append(queued)
+
+        if self._worker is None:
+            self._worker = self._hass.async_create_task(self._async_process())
+        return await future
+
+    async def _async_process(self) -> None:
+        """Send queued commands one at a time."""
+        try:
+            while self._pending:
+                queued = self._pending.pop(0)
+                if self._on_send is not None:
+                    self._on_send(queued.command)
+                try:
+                    result = await queued.send()
+                except asyncio.CancelledError:
+                    self._pending.insert(0, queued)
+                    raise
+                except Exception as err:  # pylint: disable=broad-except
+                    if not queued.future.done():
+                        queued.future.set_exception(err)
+                else:
+                    if not queued.future.done():
+                        queued.future.set_result(result)
+        finally:
+            self._worker = None
+            # Only reached with pending commands if the worker was cancelled.
+            for queued in self._pending:
+                queued.future.cancel()
+            self._pending.clear()
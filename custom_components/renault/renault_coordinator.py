@@ -1,6 +1,8 @@
 """Proxy to handle account communication with Renault servers."""
-from typing import Optional
+from time import monotonic
+from typing import Any, Callable, List, Optional
 
+from homeassistant.core import CALLBACK_TYPE, callback
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     T,
@@ -12,33 +14,112 @@ from renault_api.kamereon.exceptions import (
     NotSupportedException,
 )
 
+from .renault_metrics import EndpointMetrics
+
 
 class RenaultDataUpdateCoordinator(DataUpdateCoordinator):
     """Handle vehicle communication with Renault servers."""
 
-    def __init__(self, *args, **kwargs) -> None:
+    def __init__(
+        self,
+        *args,
+        snapshot_factory: Optional[Callable[[T], Any]] = None,
+        metrics: Optional[EndpointMetrics] = None,
+        on_request: Optional[Callable[[], None]] = None,
+        **kwargs,
+    ) -> None:
         super().__init__(*args, **kwargs)
         self.access_denied = False
         self.not_supported = False
+        # Immutable view over the latest data, built once per update.
+        self.snapshot: Any = None
+        # Incremented after each refresh, used by entities to invalidate caches.
+        self.generation = 0
+        self._snapshot_factory = snapshot_factory
+        self._snapshot_listeners: List[Callable[[Any], None]] = []
+        self.metrics = metrics
+        # Called before each request, to count it against the request budget.
+        self._on_request = on_request
+
+    @callback
+    def async_add_snapshot_listener(
+        self, update_callback: Callable[[Any], None]
+    ) -> CALLBACK_TYPE:
+        """Listen for new snapshots.
+
+        Unlike entity listeners, snapshot listeners do not cause the
+        coordinator to poll: they only see the data fetched for entities.
+        """
+        self._snapshot_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove snapshot listener."""
+            self._snapshot_listeners.remove(update_callback)
+
+        return remove_listener
 
     async def _async_update_data(self) -> Optional[T]:
         """Fetch the latest data from the source."""
+        started = monotonic()
+        try:
+            if self.access_denied or self.not_supported:
+                # Polls can still be requested, for example by entity updates.
+                if self.metrics is not None:
+                    self.metrics.record_skipped_poll("disabled")
+                raise UpdateFailed("This endpoint has been disabled")
+            return await self._async_fetch_data()
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_refresh(monotonic() - started)
+            # Nothing is awaited between this point and the parent class storing
+            # the new data/status, so entity caches cannot pick up stale values.
+            self.generation += 1
+
+    async def _async_call_update_method(self) -> Optional[T]:
+        """Call the update method, recording its latency and outcome."""
+        if self._on_request is not None:
+            self._on_request()
+        if self.metrics is None:
+            return await self.update_method()
+        started = monotonic()
+        try:
+            data = await self.update_method()
+        except Exception as err:
+            self.metrics.record_error(type(err).__name__, monotonic() - started)
+            raise
+        self.metrics.record_success(monotonic() - started)
+        return data
+
+    async def _async_fetch_data(self) -> Optional[T]:
+        """Fetch the latest data from the source and build the snapshot."""
         if self.update_method is None:
             raise NotImplementedError("Update method not implemented")
         try:
-            return await self.update_method()
+            data = await self._async_call_update_method()
         except AccessDeniedException as err:
             # Disable because the account is not allowed to access this Renault endpoint.
             self.update_interval = None
             self.access_denied = True
+            if self.metrics is not None:
+                self.metrics.disabled = "access_denied"
             raise UpdateFailed(f"This endpoint has been disabled: {err}")
 
         except NotSupportedException as err:
             # Disable because the vehicle does not support this Renault endpoint.
             self.update_interval = None
             self.not_supported = True
+            if self.metrics is not None:
+                self.metrics.disabled = "not_supported"
             raise UpdateFailed(f"This endpoint has been disabled: {err}")
 
         except KamereonResponseException as err:
             # Other Renault errors.
             raise UpdateFailed(f"Error communicating with API: {err}")
+
+        if self._snapshot_factory is not None:
+            self.snapshot = None if data is None else self._snapshot_factory(data)
+            if self.snapshot is not None:
+                for update_callback in self._snapshot_listeners:
+                    update_callback(self.snapshot)
+        return data
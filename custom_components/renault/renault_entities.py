@@ -1,21 +1,58 @@
 """Base classes for Renault entities."""
-from typing import Any, Dict
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
 
+from homeassistant.core import callback
 from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import slugify
 from renault_api.kamereon.models import (
     KamereonVehicleBatteryStatusData,
+    KamereonVehicleChargeHistoryData,
     KamereonVehicleChargeModeData,
+    KamereonVehicleChargingSettingsData,
     KamereonVehicleCockpitData,
+    KamereonVehicleHvacSettingsData,
     KamereonVehicleHvacStatusData,
     KamereonVehicleLocationData,
 )
 
+from .renault_snapshots import (
+    BatterySnapshot,
+    ChargeHistorySnapshot,
+    ChargeModeSnapshot,
+    ChargingSettingsSnapshot,
+    CockpitSnapshot,
+    HvacSettingsSnapshot,
+    HvacSnapshot,
+    LocationSnapshot,
+    RenaultSnapshot,
+)
 from .renault_vehicle import RenaultVehicleProxy
 
 ATTR_LAST_UPDATE = "last_update"
 
+_T = TypeVar("_T")
+
+
+def cached_per_update(func: Callable[[Any], _T]) -> property:
+    """Turn a method into a property cached until the next coordinator update."""
+    key = func.__qualname__
+
+    @wraps(func)
+    def wrapper(self: "RenaultDataEntity") -> _T:
+        generation = self.coordinator.generation
+        if self._cache_generation != generation:
+            self._cache.clear()
+            self._cache_generation = generation
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = func(self)
+            return value
+
+    return property(wrapper)
+
 
 class RenaultDataEntity(CoordinatorEntity, Entity):
     """Implementation of a Renault entity with a data coordinator."""
@@ -24,9 +61,15 @@ class RenaultDataEntity(CoordinatorEntity, Entity):
         self, vehicle: RenaultVehicleProxy, entity_type: str, coordinator_key: str
     ) -> None:
         """Initialise entity."""
-        super().__init__(vehicle.coordinators[coordinator_key])
+        super().__init__(vehicle.coordinators.get(coordinator_key))
         self.vehicle = vehicle
+        self._coordinator_key = coordinator_key
         self._entity_type = entity_type
+        self._name = f"{vehicle.details.vin}-{entity_type}"
+        self._unique_id = slugify(self._name)
+        self._cache: Dict[str, Any] = {}
+        self._cache_generation = -1
+        self._written_fingerprint: Optional[Tuple[Any, ...]] = None
 
     @property
     def device_info(self) -> Dict[str, Any]:
@@ -36,18 +79,71 @@ class RenaultDataEntity(CoordinatorEntity, Entity):
     @property
     def unique_id(self) -> str:
         """Return a unique identifier for this entity."""
-        return slugify(f"{self.vehicle.details.vin}-{self._entity_type}")
+        return self._unique_id
 
     @property
     def name(self) -> str:
         """Return the name of this entity."""
-        return f"{self.vehicle.details.vin}-{self._entity_type}"
+        return self._name
 
-    @property
+    @cached_per_update
     def available(self) -> bool:
         """Return if entity is available."""
         # Data can succeed, but be empty
-        return self.coordinator.last_update_success and self.coordinator.data
+        return bool(self.coordinator.last_update_success and self.coordinator.data)
+
+    @property
+    def snapshot(self) -> Optional[RenaultSnapshot]:
+        """Return the snapshot built from the latest coordinator update."""
+        return self.coordinator.snapshot
+
+    def _state_fingerprint(self) -> Tuple[Any, ...]:
+        """Return the values that end up in the state machine."""
+        if not self.available:
+            return (False,)
+        return (
+            True,
+            self.state,
+            self.icon,
+            self.state_attributes,
+            self.device_state_attributes,
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        await super().async_added_to_hass()
+        # The entity platform writes the initial state right after this returns.
+        self._written_fingerprint = self._state_fingerprint()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        fingerprint = self._state_fingerprint()
+        if fingerprint == self._written_fingerprint:
+            # Nothing visible changed for this entity: skip the state write.
+            return
+        self._written_fingerprint = fingerprint
+        self.async_write_ha_state()
+
+
+class RenaultLazyDataEntity(RenaultDataEntity):
+    """Implementation of a Renault entity with a coordinator created on demand.
+
+    These entities are disabled by default: the coordinator (and its polling)
+    only exists once one of its entities is enabled and added to hass.
+    """
+
+    @property
+    def entity_registry_enabled_default(self) -> bool:
+        """Return if the entity should be enabled when first added."""
+        return False
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        self.coordinator = await self.vehicle.async_get_coordinator(
+            self._coordinator_key
+        )
+        await super().async_added_to_hass()
 
 
 class RenaultBatteryDataEntity(RenaultDataEntity):
@@ -63,11 +159,16 @@ class RenaultBatteryDataEntity(RenaultDataEntity):
         return self.coordinator.data
 
     @property
+    def snapshot(self) -> Optional[BatterySnapshot]:  # for type hints
+        """Return the snapshot built from the latest coordinator update."""
+        return self.coordinator.snapshot
+
+    @cached_per_update
     def device_state_attributes(self) -> Dict[str, Any]:
         """Return the state attributes of this entity."""
         attrs = {}
-        if self.data.timestamp:
-            attrs[ATTR_LAST_UPDATE] = self.data.timestamp
+        if self.snapshot.timestamp:
+            attrs[ATTR_LAST_UPDATE] = self.snapshot.timestamp
         return attrs
 
 
@@ -83,6 +184,11 @@ class RenaultChargeModeDataEntity(RenaultDataEntity):
         """Return collected data."""
         return self.coordinator.data
 
+    @property
+    def snapshot(self) -> Optional[ChargeModeSnapshot]:  # for type hints
+        """Return the snapshot built from the latest coordinator update."""
+        return self.coordinator.snapshot
+
 
 class RenaultHVACDataEntity(RenaultDataEntity):
     """Implementation of a Renault entity with hvac_status coordinator."""
@@ -96,6 +202,11 @@ class RenaultHVACDataEntity(RenaultDataEntity):
         """Return collected data."""
         return self.coordinator.data
 
+    @property
+    def snapshot(self) -> Optional[HvacSnapshot]:  # for type hints
+        """Return the snapshot built from the latest coordinator update."""
+        return self.coordinator.snapshot
+
 
 class RenaultLocationDataEntity(RenaultDataEntity):
     """Implementation of a Renault entity with location coordinator."""
@@ -110,11 +221,16 @@ class RenaultLocationDataEntity(RenaultDataEntity):
         return self.coordinator.data
 
     @property
+    def snapshot(self) -> Optional[LocationSnapshot]:  # for type hints
+        """Return the snapshot built from the latest coordinator update."""
+        return self.coordinator.snapshot
+
+    @cached_per_update
     def device_state_attributes(self) -> Dict[str, Any]:
         """Return the device state attributes."""
         attrs = {}
-        if self.data.lastUpdateTime:
-            attrs[ATTR_LAST_UPDATE] = self.data.lastUpdateTime
+        if self.snapshot.last_update:
+            attrs[ATTR_LAST_UPDATE] = self.snapshot.last_update
         return attrs
 
 
@@ -129,3 +245,62 @@ class RenaultCockpitDataEntity(RenaultDataEntity):
     def data(self) -> KamereonVehicleCockpitData:  # for type hints
         """Return collected data."""
         return self.coordinator.data
+
+    @property
+    def snapshot(self) -> Optional[CockpitSnapshot]:  # for type hints
+        """Return the snapshot built from the latest coordinator update."""
+        return self.coordinator.snapshot
+
+
+class RenaultChargingSettingsDataEntity(RenaultLazyDataEntity):
+    """Implementation of a Renault entity with charging_settings coordinator."""
+
+    def __init__(self, vehicle: RenaultVehicleProxy, entity_type: str) -> None:
+        """Initialise entity."""
+        super().__init__(vehicle, entity_type, "charging_settings")
+
+    @property
+    def data(self) -> KamereonVehicleChargingSettingsData:  # for type hints
+        """Return collected data."""
+        return self.coordinator.data
+
+    @property
+    def snapshot(self) -> Optional[ChargingSettingsSnapshot]:  # for type hints
+        """Return the snapshot built from the latest coordinator update."""
+        return self.coordinator.snapshot
+
+
+class RenaultHvacSettingsDataEntity(RenaultLazyDataEntity):
+    """Implementation of a Renault entity with hvac_settings coordinator."""
+
+    def __init__(self, vehicle: RenaultVehicleProxy, entity_type: str) -> None:
+        """Initialise entity."""
+        super().__init__(vehicle, entity_type, "hvac_settings")
+
+    @property
+    def data(self) -> KamereonVehicleHvacSettingsData:  # for type hints
+        """Return collected data."""
+        return self.coordinator.data
+
+    @property
+    def snapshot(self) -> Optional[HvacSettingsSnapshot]:  # for type hints
+        """Return the snapshot built from the latest coordinator update."""
+        return self.coordinator.snapshot
+
+
+class RenaultChargeHistoryDataEntity(RenaultLazyDataEntity):
+    """Implementation of a Renault entity with charge_history coordinator."""
+
+    def __init__(self, vehicle: RenaultVehicleProxy, entity_type: str) -> None:
+        """Initialise entity."""
+        super().__init__(vehicle, entity_type, "charge_history")
+
+    @property
+    def data(self) -> KamereonVehicleChargeHistoryData:  # for type hints
+        """Return collected data."""
+        return self.coordinator.data
+
+    @property
+    def snapshot(self) -> Optional[ChargeHistorySnapshot]:  # for type hints
+        """Return the snapshot built from the latest coordinator update."""
+        return self.coordinator.snapshot
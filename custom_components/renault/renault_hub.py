@@ -12,10 +12,21 @@ from renault_api.renault_account import RenaultAccount
 from renault_api.renault_client import RenaultClient
 
 from .const import (
+    CONF_DAILY_REQUEST_BUDGET,
     CONF_DISTANCES_IN_MILES,
     CONF_KAMEREON_ACCOUNT_ID,
+    CONF_REQUEST_BUDGET,
+    CONF_TRACKER_MAX_INTERVAL,
+    CONF_TRACKER_MIN_DISTANCE,
+    DEFAULT_DAILY_REQUEST_BUDGET,
+    DEFAULT_REQUEST_BUDGET,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_TRACKER_MAX_INTERVAL,
+    DEFAULT_TRACKER_MIN_DISTANCE,
 )
+from .renault_budget import RequestBudget
+from .renault_cassette import CassetteClientSession
+from .renault_metrics import AccountMetrics, MetricsCredentialStore, record_duration
 from .renault_vehicle import RenaultVehicleProxy
 
 LOGGER = logging.getLogger(__name__)
@@ -24,12 +35,30 @@ LOGGER = logging.getLogger(__name__)
 class RenaultHub:
     """Handle account communication with Renault servers."""
 
-    def __init__(self, hass: HomeAssistantType, locale: str) -> None:
-        """Initialise proxy."""
+    def __init__(
+        self,
+        hass: HomeAssistantType,
+        locale: str,
+        locale_details: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Initialise proxy.
+
+        The locale details (API keys and root URLs of the Gigya and Kamereon
+        servers) default to the ones known by renault-api for the locale.
+        """
         LOGGER.debug("Creating RenaultHub")
         self._hass = hass
+        self.metrics = AccountMetrics()
+        self.request_budget = RequestBudget(hass)
+        # Duration of each setup phase, in seconds.
+        self.startup_timings: Dict[str, float] = {}
         self._client = RenaultClient(
-            websession=async_get_clientsession(self._hass), locale=locale
+            websession=CassetteClientSession(
+                self._hass, async_get_clientsession(self._hass)
+            ),
+            locale=locale,
+            locale_details=locale_details,
+            credential_store=MetricsCredentialStore(self.metrics),
         )
         self._account: Optional[RenaultAccount] = None
         self._vehicles: Dict[str, RenaultVehicleProxy] = {}
@@ -37,7 +66,8 @@ class RenaultHub:
     async def attempt_login(self, username: str, password: str) -> bool:
         """Attempt login to Renault servers."""
         try:
-            await self._client.session.login(username, password)
+            with record_duration(self.startup_timings, "attempt_login"):
+                await self._client.session.login(username, password)
         except InvalidCredentialsException as ex:
             LOGGER.error("Login to Renault failed: %s", ex.error_details)
         else:
@@ -53,22 +83,52 @@ class RenaultHub:
         distances_in_miles: bool = config_entry.options.get(
             CONF_DISTANCES_IN_MILES, False
         )
+        tracker_min_distance: int = config_entry.options.get(
+            CONF_TRACKER_MIN_DISTANCE, DEFAULT_TRACKER_MIN_DISTANCE
+        )
+        tracker_max_interval = timedelta(
+            seconds=config_entry.options.get(
+                CONF_TRACKER_MAX_INTERVAL, DEFAULT_TRACKER_MAX_INTERVAL
+            )
+        )
+        self.request_budget.account_id = account_id
+        self.request_budget.hourly_budget = config_entry.options.get(
+            CONF_REQUEST_BUDGET, DEFAULT_REQUEST_BUDGET
+        )
+        self.request_budget.daily_budget = config_entry.options.get(
+            CONF_DAILY_REQUEST_BUDGET, DEFAULT_DAILY_REQUEST_BUDGET
+        )
 
-        self._account = await self._client.get_api_account(account_id)
-        vehicles = await self._account.get_vehicles()
+        with record_duration(self.startup_timings, "get_api_account"):
+            self._account = await self._client.get_api_account(account_id)
+        with record_duration(self.startup_timings, "get_vehicles"):
+            vehicles = await self._account.get_vehicles()
         for vehicle_link in vehicles.vehicleLinks:
             # Generate vehicle proxy
             vin = vehicle_link.vin
+            with record_duration(self.startup_timings, "get_api_vehicle"):
+                api_vehicle = await self._account.get_api_vehicle(vin)
             vehicle = RenaultVehicleProxy(
                 hass=self._hass,
-                vehicle=await self._account.get_api_vehicle(vin),
+                vehicle=api_vehicle,
                 details=vehicle_link.vehicleDetails,
                 scan_interval=scan_interval,
                 distances_in_miles=distances_in_miles,
+                tracker_min_distance=tracker_min_distance,
+                tracker_max_interval=tracker_max_interval,
+                request_budget=self.request_budget,
             )
-            await vehicle.async_initialise()
+            with record_duration(self.startup_timings, "vehicles"):
+                with record_duration(vehicle.startup_timings, "total"):
+                    await vehicle.async_initialise()
+            LOGGER.debug("Startup timings of %s: %s", vin, vehicle.startup_timings)
             self._vehicles[vin] = vehicle
 
+    async def async_unload(self) -> None:
+        """Unload vehicles."""
+        for vehicle in self._vehicles.values():
+            await vehicle.async_unload()
+
     async def get_account_ids(self) -> List[str]:
         """Get Kamereon account ids."""
         accounts = []
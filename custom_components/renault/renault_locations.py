@@ -0,0 +1,324 @@
+"""Location history of a Renault vehicle."""
+from array import array
+from bisect import bisect_right
+from datetime import datetime
+import json
+import logging
+import math
+import struct
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from homeassistant.core import callback
+from homeassistant.helpers.typing import HomeAssistantType
+from homeassistant.util import dt as dt_util
+
+from .renault_snapshots import LocationSnapshot
+from .renault_storage import RenaultBinaryStore
+
+LOGGER = logging.getLogger(__name__)
+
+# Coordinates are stored as integers in millionths of degree (about 0.1m).
+COORDINATE_SCALE = 10 ** 6
+# A checkpoint with absolute values is kept every CHECKPOINT_INTERVAL points,
+# so that range queries only decode from the nearest checkpoint.
+CHECKPOINT_INTERVAL = 64
+# Beyond this number of points, the oldest checkpoint block is dropped: at a
+# few bytes per point, this keeps the history around a megabyte.
+MAX_LOCATION_POINTS = 2048 * CHECKPOINT_INTERVAL
+LOCATION_SAVE_DELAY = 300
+
+# Binary file layout: header, then the encoded points.
+FILE_MAGIC = b"RNLH"
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct("<4sBI")
+
+EARTH_RADIUS = 6371008.8  # meters
+
+EXPORT_GEOJSON = "geojson"
+EXPORT_GPX = "gpx"
+
+
+class LocationPoint(NamedTuple):
+    """Single location fix."""
+
+    timestamp: int
+    latitude: float
+    longitude: float
+
+
+def haversine_distance(
+    latitude1: float, longitude1: float, latitude2: float, longitude2: float
+) -> float:
+    """Return the great-circle distance between two points, in meters."""
+    phi1 = math.radians(latitude1)
+    phi2 = math.radians(latitude2)
+    half_delta_phi = (phi2 - phi1) / 2
+    half_delta_lambda = math.radians(longitude2 - longitude1) / 2
+    sin_phi = math.sin(half_delta_phi)
+    sin_lambda = math.sin(half_delta_lambda)
+    return (
+        2
+        * EARTH_RADIUS
+        * math.asin(
+            math.sqrt(
+                sin_phi * sin_phi
+                + math.cos(phi1) * math.cos(phi2) * sin_lambda * sin_lambda
+            )
+        )
+    )
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    """Append a signed integer, zigzag and varint encoded."""
+    value = (value << 1) ^ (value >> 63)
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(buffer: bytes, offset: int) -> Tuple[int, int]:
+    """Read a signed integer written by _write_varint, and the next offset."""
+    value = shift = 0
+    while True:
+        byte = buffer[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return (value >> 1) ^ -(value & 1), offset
+        shift += 7
+
+
+class LocationHistory:
+    """Append-only location history, delta and varint encoded.
+
+    Each point is stored as the difference with the previous point (time in
+    seconds, latitude and longitude in millionths of degree), which usually
+    takes a few bytes. Points which are not newer than the latest point, or
+    which have the same coordinates, are ignored. Once the history holds more
+    than max_points points (at least CHECKPOINT_INTERVAL), the oldest
+    CHECKPOINT_INTERVAL points are dropped.
+    """
+
+    __slots__ = (
+        "_max_points",
+        "_data",
+        "_count",
+        "_last",
+        "_checkpoint_times",
+        "_checkpoint_values",
+        "_checkpoint_offsets",
+    )
+
+    def __init__(self, max_points: int = MAX_LOCATION_POINTS) -> None:
+        """Initialise history."""
+        self._max_points = max(max_points, CHECKPOINT_INTERVAL)
+        self._data = bytearray()
+        self._count = 0
+        self._last: Tuple[int, int, int] = (0, 0, 0)
+        self._checkpoint_times = array("q")
+        # Latitude and longitude of each checkpoint, interleaved.
+        self._checkpoint_values = array("q")
+        self._checkpoint_offsets = array("q")
+
+    def __len__(self) -> int:
+        """Return the number of points."""
+        return self._count
+
+    @property
+    def size(self) -> int:
+        """Return the size of the encoded points, in bytes."""
+        return len(self._data)
+
+    def append(self, timestamp: float, latitude: float, longitude: float) -> bool:
+        """Append a location fix.
+
+        Returns False if the fix was ignored.
+        """
+        point = (
+            int(timestamp),
+            round(latitude * COORDINATE_SCALE),
+            round(longitude * COORDINATE_SCALE),
+        )
+        last = self._last
+        if self._count and (point[0] <= last[0] or point[1:] == last[1:]):
+            return False
+        for value, previous in zip(point, last):
+            _write_varint(self._data, value - previous)
+        if self._count % CHECKPOINT_INTERVAL == 0:
+            self._checkpoint_times.append(point[0])
+            self._checkpoint_values.extend(point[1:])
+            self._checkpoint_offsets.append(len(self._data))
+        self._count += 1
+        self._last = point
+        if self._count > self._max_points:
+            self._drop_oldest_block()
+        return True
+
+    def _drop_oldest_block(self) -> None:
+        """Drop the points before the second checkpoint."""
+        # The second checkpoint becomes the first point, encoded as a delta
+        # with zero like the first point of a new history.
+        first = bytearray()
+        _write_varint(first, self._checkpoint_times[1])
+        _write_varint(first, self._checkpoint_values[2])
+        _write_varint(first, self._checkpoint_values[3])
+        start = self._checkpoint_offsets[1]
+        self._data[:start] = first
+        shift = start - len(first)
+        del self._checkpoint_times[0]
+        del self._checkpoint_values[:2]
+        del self._checkpoint_offsets[0]
+        offsets = self._checkpoint_offsets
+        for index in range(len(offsets)):
+            offsets[index] -= shift
+        self._count -= CHECKPOINT_INTERVAL
+
+    def points(
+        self, start: Optional[float] = None, end: Optional[float] = None
+    ) -> Iterator[LocationPoint]:
+        """Iterate over the points in [start, end)."""
+        if not self._count:
+            return
+        checkpoint = 0
+        if start is not None:
+            checkpoint = max(0, bisect_right(self._checkpoint_times, start) - 1)
+        timestamp = self._checkpoint_times[checkpoint]
+        latitude, longitude = self._checkpoint_values[
+            2 * checkpoint : 2 * checkpoint + 2
+        ]
+        offset = self._checkpoint_offsets[checkpoint]
+        remaining = self._count - checkpoint * CHECKPOINT_INTERVAL
+        data = self._data
+        while True:
+            if end is not None and timestamp >= end:
+                return
+            if start is None or timestamp >= start:
+                yield LocationPoint(
+                    timestamp,
+                    latitude / COORDINATE_SCALE,
+                    longitude / COORDINATE_SCALE,
+                )
+            remaining -= 1
+            if not remaining:
+                return
+            delta, offset = _read_varint(data, offset)
+            timestamp += delta
+            delta, offset = _read_varint(data, offset)
+            latitude += delta
+            delta, offset = _read_varint(data, offset)
+            longitude += delta
+
+    def to_bytes(self) -> bytes:
+        """Serialize the points."""
+        return FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, self._count) + self._data
+
+    @classmethod
+    def from_bytes(
+        cls, data: bytes, max_points: int = MAX_LOCATION_POINTS
+    ) -> "LocationHistory":
+        """Deserialize points, rebuilding the checkpoints."""
+        magic, version, count = FILE_HEADER.unpack_from(data)
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            raise ValueError("Unsupported location history file")
+        history = cls(max_points)
+        offset = FILE_HEADER.size
+        point = [0, 0, 0]
+        for _ in range(count):
+            for index in range(3):
+                delta, offset = _read_varint(data, offset)
+                point[index] += delta
+            history.append(
+                point[0], point[1] / COORDINATE_SCALE, point[2] / COORDINATE_SCALE
+            )
+        return history
+
+
+def _isoformat(timestamp: int) -> str:
+    """Format a timestamp for export."""
+    return datetime.fromtimestamp(timestamp, dt_util.UTC).isoformat()
+
+
+def export_gpx(name: str, points: List[LocationPoint]) -> str:
+    """Export points as a GPX track."""
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<gpx version="1.1" creator="hassRenaultZE"'
+        ' xmlns="http://www.topografix.com/GPX/1/1">',
+        "<trk>",
+        f"<name>{escape(name)}</name>",
+        "<trkseg>",
+    ]
+    lines.extend(
+        f'<trkpt lat="{point.latitude}" lon="{point.longitude}">'
+        f"<time>{_isoformat(point.timestamp)}</time></trkpt>"
+        for point in points
+    )
+    lines.extend(["</trkseg>", "</trk>", "</gpx>", ""])
+    return "\n".join(lines)
+
+
+def export_geojson(name: str, points: List[LocationPoint]) -> str:
+    """Export points as a GeoJSON line, with the time of each point."""
+    return json.dumps(
+        {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "geometry": {
+                        "type": "LineString",
+                        "coordinates": [
+                            [point.longitude, point.latitude] for point in points
+                        ],
+                    },
+                    "properties": {
+                        "name": name,
+                        "times": [_isoformat(point.timestamp) for point in points],
+                    },
+                }
+            ],
+        }
+    )
+
+
+class RenaultLocationHistory:
+    """Record the location history of a vehicle, and persist it to disk."""
+
+    def __init__(self, hass: HomeAssistantType, vin: str) -> None:
+        """Initialise location history."""
+        self.history = LocationHistory()
+        self._store = RenaultBinaryStore(
+            hass, f"locations.{vin.lower()}", self._serialize
+        )
+
+    def _serialize(self) -> bytes:
+        """Serialize the history."""
+        return self.history.to_bytes()
+
+    async def async_load(self) -> None:
+        """Load persisted points."""
+        data = await self._store.async_load()
+        if data is not None:
+            try:
+                self.history = LocationHistory.from_bytes(data)
+            except (ValueError, IndexError, struct.error) as err:
+                LOGGER.warning(
+                    "Unable to load location history %s: %s", self._store.path, err
+                )
+
+    @callback
+    def async_record(self, snapshot: LocationSnapshot) -> None:
+        """Record a location snapshot, unless it was already recorded."""
+        timestamp = dt_util.parse_datetime(snapshot.last_update or "")
+        if timestamp is None or snapshot.latitude is None or snapshot.longitude is None:
+            return
+        if self.history.append(
+            timestamp.timestamp(), snapshot.latitude, snapshot.longitude
+        ):
+            self._store.async_delay_save(LOCATION_SAVE_DELAY)
+
+    async def async_unload(self) -> None:
+        """Save pending points."""
+        await self._store.async_unload()
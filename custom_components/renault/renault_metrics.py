@@ -0,0 +1,180 @@
+"""In-memory metrics of the requests made to Renault servers."""
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from time import monotonic
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from homeassistant.util import dt as dt_util
+from renault_api.credential import Credential
+from renault_api.credential_store import CredentialStore
+from renault_api.gigya import GIGYA_JWT
+
+# Upper bounds of the latency histogram buckets, in seconds. The last bucket
+# counts everything above the last bound.
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+@contextmanager
+def record_duration(timings: Dict[str, float], phase: str) -> Iterator[None]:
+    """Add the duration of the block to a phase, in seconds."""
+    started = monotonic()
+    try:
+        yield
+    finally:
+        timings[phase] = timings.get(phase, 0.0) + monotonic() - started
+
+
+class EndpointMetrics:
+    """Latency histogram, outcomes and last success of a single endpoint.
+
+    Recording a request only updates counters in place, so that it is cheap
+    enough for every request.
+    """
+
+    __slots__ = (
+        "buckets",
+        "latency_sum",
+        "success_count",
+        "errors",
+        "last_success",
+        "last_latency",
+        "refresh_count",
+        "refresh_duration_sum",
+        "skipped_polls",
+        "disabled",
+    )
+
+    def __init__(self) -> None:
+        """Initialise metrics."""
+        self.buckets: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.success_count = 0
+        # Error count by exception type name.
+        self.errors: Dict[str, int] = {}
+        self.last_success: Optional[datetime] = None
+        self.last_latency: Optional[float] = None
+        # Coordinator refreshes, including the snapshot and its listeners.
+        self.refresh_count = 0
+        self.refresh_duration_sum = 0.0
+        # Polls which did not call the endpoint, by reason.
+        self.skipped_polls: Dict[str, int] = {}
+        # Reason why the endpoint was disabled, if it was.
+        self.disabled: Optional[str] = None
+
+    @property
+    def request_count(self) -> int:
+        """Return the number of requests, successful or not."""
+        return sum(self.buckets)
+
+    @property
+    def error_count(self) -> int:
+        """Return the number of failed requests."""
+        return sum(self.errors.values())
+
+    @property
+    def mean_latency(self) -> Optional[float]:
+        """Return the mean latency of the requests, in seconds."""
+        count = self.request_count
+        return self.latency_sum / count if count else None
+
+    def _record_latency(self, latency: float) -> None:
+        """Add a request to the latency histogram."""
+        self.buckets[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.latency_sum += latency
+        self.last_latency = latency
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful request."""
+        self._record_latency(latency)
+        self.success_count += 1
+        self.last_success = dt_util.utcnow()
+
+    def record_error(self, error: str, latency: float) -> None:
+        """Record a failed request, with the type name of its exception."""
+        self._record_latency(latency)
+        self.errors[error] = self.errors.get(error, 0) + 1
+
+    def record_refresh(self, duration: float) -> None:
+        """Record a coordinator refresh."""
+        self.refresh_count += 1
+        self.refresh_duration_sum += duration
+
+    def record_skipped_poll(self, reason: str) -> None:
+        """Record a poll which did not call the endpoint."""
+        self.skipped_polls[reason] = self.skipped_polls.get(reason, 0) + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the metrics, for services and diagnostics."""
+        return {
+            "disabled": self.disabled,
+            "requests": self.request_count,
+            "successes": self.success_count,
+            "errors": dict(self.errors),
+            "last_success": self.last_success.isoformat()
+            if self.last_success
+            else None,
+            "last_latency": self.last_latency,
+            "mean_latency": self.mean_latency,
+            "refreshes": self.refresh_count,
+            "refresh_duration": self.refresh_duration_sum,
+            "skipped_polls": dict(self.skipped_polls),
+            "latency_buckets": {
+                **{
+                    str(bound): count
+                    for bound, count in zip(LATENCY_BUCKETS, self.buckets)
+                },
+                "+Inf": self.buckets[-1],
+            },
+        }
+
+
+class RenaultMetrics:
+    """Metrics of a vehicle, by endpoint."""
+
+    def __init__(self) -> None:
+        """Initialise metrics."""
+        self.endpoints: Dict[str, EndpointMetrics] = {}
+        # Service command count by (service, outcome).
+        self.commands: Dict[Tuple[str, str], int] = {}
+
+    def endpoint(self, name: str) -> EndpointMetrics:
+        """Return the metrics of an endpoint, creating them if needed."""
+        metrics = self.endpoints.get(name)
+        if metrics is None:
+            metrics = self.endpoints[name] = EndpointMetrics()
+        return metrics
+
+    def record_command(self, service: str, outcome: str) -> None:
+        """Record the outcome of a service command."""
+        key = (service, outcome)
+        self.commands[key] = self.commands.get(key, 0) + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the metrics of all endpoints."""
+        return {name: metrics.as_dict() for name, metrics in self.endpoints.items()}
+
+
+class AccountMetrics:
+    """Metrics of an account session."""
+
+    __slots__ = ("token_refreshes",)
+
+    def __init__(self) -> None:
+        """Initialise metrics."""
+        self.token_refreshes = 0
+
+
+class MetricsCredentialStore(CredentialStore):
+    """Credential store counting the renewals of the Gigya token."""
+
+    def __init__(self, metrics: AccountMetrics) -> None:
+        """Initialise the credential store."""
+        super().__init__()
+        self._metrics = metrics
+
+    def __setitem__(self, name: str, value: Credential) -> None:
+        """Add a credential to the credential store."""
+        if name == GIGYA_JWT:
+            self._metrics.token_refreshes += 1
+        super().__setitem__(name, value)
@@ -0,0 +1,265 @@
+"""Opt-in profiling of the Renault integration hot paths."""
+import cProfile
+from datetime import timedelta
+from functools import wraps
+import logging
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity_platform import async_get_platforms
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.typing import HomeAssistantType
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .renault_coordinator import RenaultDataUpdateCoordinator
+
+LOGGER = logging.getLogger(__name__)
+
+RENAULT_PROFILER = "renault_profiler"
+
+# Methods profiled while a profiling session is active: (class, name, is async).
+# Entity updates are profiled by registering wrapped coordinator listeners
+# instead, as the listeners are bound methods registered when the entities
+# were added.
+PROFILED_METHODS: Tuple[Tuple[type, str, bool], ...] = (
+    (RenaultDataUpdateCoordinator, "_async_update_data", True),
+)
+
+
+class _ScopedProfiler:
+    """cProfile profiler, only enabled while a profiled method runs.
+
+    Nested profiled calls keep the profiler enabled until the outermost call
+    returns.
+    """
+
+    def __init__(self) -> None:
+        """Initialise profiler."""
+        self.profile = cProfile.Profile()
+        self._depth = 0
+
+    def enter(self) -> None:
+        """Enable the profiler, unless it is already enabled."""
+        if not self._depth:
+            self.profile.enable()
+        self._depth += 1
+
+    def exit(self) -> None:
+        """Disable the profiler when leaving the outermost call."""
+        self._depth -= 1
+        if not self._depth:
+            self.profile.disable()
+
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Profile a synchronous call."""
+        self.enter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.exit()
+
+    def drive(self, coro: Any) -> Generator[Any, Any, Any]:
+        """Run a coroutine, only profiling its steps, not its waits.
+
+        While the coroutine waits, the event loop runs unrelated code, which
+        must not end up in the profile.
+        """
+        value: Any = None
+        error: Optional[BaseException] = None
+        while True:
+            self.enter()
+            try:
+                if error is None:
+                    future = coro.send(value)
+                else:
+                    future = coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.exit()
+            try:
+                value = yield future
+                error = None
+            except BaseException as err:  # pylint: disable=broad-except
+                value, error = None, err
+
+
+class _ProfiledListener:
+    """Coordinator listener, called through a scoped profiler.
+
+    Compares equal to the wrapped listener, so that entities removed while
+    profiling still remove it with their own listener.
+    """
+
+    __slots__ = ("_profiler", "listener")
+
+    def __init__(self, profiler: _ScopedProfiler, listener: CALLBACK_TYPE) -> None:
+        """Initialise listener."""
+        self._profiler = profiler
+        self.listener = listener
+
+    def __call__(self) -> None:
+        """Call the listener."""
+        self._profiler.call(self.listener)
+
+    def __eq__(self, other: Any) -> bool:
+        """Compare to the wrapped listener."""
+        if isinstance(other, _ProfiledListener):
+            other = other.listener
+        return bool(self.listener == other)
+
+    def __hash__(self) -> int:
+        """Hash as the wrapped listener."""
+        return hash(self.listener)
+
+
+class _ProfiledAwaitable:
+    """Awaitable running a coroutine through a scoped profiler."""
+
+    __slots__ = ("_profiler", "_coro")
+
+    def __init__(self, profiler: _ScopedProfiler, coro: Any) -> None:
+        """Initialise awaitable."""
+        self._profiler = profiler
+        self._coro = coro
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        """Run the coroutine."""
+        return self._profiler.drive(self._coro.__await__())
+
+
+class RenaultProfiler:
+    """Profiling session, writing a cProfile file to the config directory.
+
+    cProfile is a deterministic profiler, not a sampling one: it traces every
+    function call and return, which typically makes the profiled code two to
+    three times slower, and the timings of small functions are inflated
+    accordingly. The profiler is only enabled while a profiled method, entity
+    listener or service handler runs, and these are only wrapped while the
+    session is active, so profiling costs nothing the rest of the time.
+    Entities and coordinators added during the session are not profiled.
+    """
+
+    def __init__(self, hass: HomeAssistantType) -> None:
+        """Initialise profiling session."""
+        self.hass = hass
+        self.path = hass.config.path(
+            f"renault_profile_{dt_util.utcnow().strftime('%Y%m%d_%H%M%S')}.cprof"
+        )
+        self._profiler = _ScopedProfiler()
+        self._originals: List[Tuple[type, str, Callable[..., Any]]] = []
+        self._services: Dict[str, Any] = {}
+        self._listeners: List[
+            Tuple[RenaultDataUpdateCoordinator, _ProfiledListener]
+        ] = []
+        self._unsub_stop: Optional[CALLBACK_TYPE] = None
+
+    def _wrap_async(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap a coroutine function."""
+        profiler = self._profiler
+
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return await _ProfiledAwaitable(profiler, func(*args, **kwargs))
+
+        return wrapper
+
+    def _wrap_sync(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap a function."""
+        profiler = self._profiler
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return profiler.call(func, *args, **kwargs)
+
+        return wrapper
+
+    @callback
+    def async_start(self, duration: timedelta, excluded_services: List[str]) -> None:
+        """Wrap the profiled methods and services, until the duration expires."""
+        for cls, name, is_async in PROFILED_METHODS:
+            original = cls.__dict__[name]
+            self._originals.append((cls, name, original))
+            wrap = self._wrap_async if is_async else self._wrap_sync
+            setattr(cls, name, wrap(original))
+        for platform in async_get_platforms(self.hass, DOMAIN):
+            for entity in platform.entities.values():
+                coordinator = getattr(entity, "coordinator", None)
+                if not isinstance(coordinator, RenaultDataUpdateCoordinator):
+                    continue
+                # pylint: disable=protected-access
+                listener = entity._handle_coordinator_update
+                wrapped = _ProfiledListener(self._profiler, listener)
+                # Add the wrapped listener first, so that the coordinator never
+                # runs out of listeners, which would stop its polling.
+                coordinator.async_add_listener(wrapped)
+                coordinator.async_remove_listener(listener)
+                self._listeners.append((coordinator, wrapped))
+        services = self.hass.services.async_services().get(DOMAIN, {})
+        for name, service in services.items():
+            if name in excluded_services:
+                continue
+            self._services[name] = service
+            self.hass.services.async_register(
+                DOMAIN,
+                name,
+                self._wrap_async(service.job.target),
+                schema=service.schema,
+            )
+        self._unsub_stop = async_call_later(
+            self.hass, duration.total_seconds(), self._async_handle_stop
+        )
+        LOGGER.info("Profiling for %s, writing to %s", duration, self.path)
+
+    async def _async_handle_stop(self, _now: Any) -> None:
+        """Stop when the duration expires."""
+        self._unsub_stop = None
+        await self.async_stop()
+
+    async def async_stop(self) -> None:
+        """Restore the original methods and services, and write the profile."""
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+        while self._originals:
+            cls, name, original = self._originals.pop()
+            setattr(cls, name, original)
+        while self._listeners:
+            coordinator, wrapped = self._listeners.pop()
+            # If the entity was removed meanwhile, its listener was already
+            # removed: this adds it back, then removes it again.
+            coordinator.async_add_listener(wrapped.listener)
+            coordinator.async_remove_listener(wrapped)
+        for name, service in self._services.items():
+            if self.hass.services.has_service(DOMAIN, name):
+                self.hass.services.async_register(
+                    DOMAIN, name, service.job.target, schema=service.schema
+                )
+        self._services.clear()
+        if self.hass.data.get(RENAULT_PROFILER) is self:
+            del self.hass.data[RENAULT_PROFILER]
+        await self.hass.async_add_executor_job(
+            self._profiler.profile.dump_stats, self.path
+        )
+        LOGGER.info("Profile written to %s", self.path)
+
+
+@callback
+def async_start_profiler(
+    hass: HomeAssistantType, duration: timedelta, excluded_services: List[str]
+) -> RenaultProfiler:
+    """Start a profiling session, unless one is already active."""
+    if RENAULT_PROFILER in hass.data:
+        raise HomeAssistantError("A profiling session is already active")
+    profiler = hass.data[RENAULT_PROFILER] = RenaultProfiler(hass)
+    profiler.async_start(duration, excluded_services)
+    return profiler
+
+
+async def async_stop_profiler(hass: HomeAssistantType) -> None:
+    """Stop the active profiling session, if any."""
+    profiler: Optional[RenaultProfiler] = hass.data.get(RENAULT_PROFILER)
+    if profiler is not None:
+        await profiler.async_stop()
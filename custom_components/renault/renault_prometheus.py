@@ -0,0 +1,168 @@
+"""Prometheus export of the Renault integration metrics."""
+from typing import Dict, Iterator, List
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+
+from .const import DOMAIN
+from .renault_hub import RenaultHub
+from .renault_metrics import LATENCY_BUCKETS
+
+METRICS_URL = "/api/renault/metrics"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _labels(**labels: str) -> str:
+    """Format labels, escaping their values."""
+    return ",".join(
+        '{}="{}"'.format(
+            name,
+            value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'),
+        )
+        for name, value in labels.items()
+    )
+
+
+def _metric(name: str, kind: str, description: str) -> List[str]:
+    """Return the HELP and TYPE lines of a metric."""
+    return [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+
+
+def _metric_groups(hubs: Dict[str, RenaultHub]) -> Iterator[List[str]]:
+    """Return the samples of each metric, grouped by metric."""
+    token_refreshes = _metric(
+        "renault_token_refreshes_total", "counter", "Gigya token renewals."
+    )
+    durations = _metric(
+        "renault_request_duration_seconds",
+        "histogram",
+        "Latency of the requests to Kamereon endpoints.",
+    )
+    errors = _metric(
+        "renault_request_errors_total",
+        "counter",
+        "Failed requests to Kamereon endpoints, by exception type.",
+    )
+    last_success = _metric(
+        "renault_last_success_timestamp_seconds",
+        "gauge",
+        "Time of the latest successful request.",
+    )
+    refreshes = _metric(
+        "renault_refresh_duration_seconds",
+        "summary",
+        "Duration of coordinator refreshes, including snapshot listeners.",
+    )
+    skipped = _metric(
+        "renault_polls_skipped_total",
+        "counter",
+        "Polls which did not call the endpoint, by reason.",
+    )
+    disabled = _metric(
+        "renault_endpoint_disabled",
+        "gauge",
+        "Endpoints disabled after an access denied or not supported error.",
+    )
+    commands = _metric(
+        "renault_commands_total", "counter", "Service commands, by outcome."
+    )
+    disabled_count = 0
+    for account_id, hub in hubs.items():
+        token_refreshes.append(
+            f"renault_token_refreshes_total{{{_labels(account=account_id)}}} "
+            f"{hub.metrics.token_refreshes}"
+        )
+        for vin, vehicle in hub.vehicles.items():
+            for endpoint, metrics in vehicle.metrics.endpoints.items():
+                labels = _labels(vin=vin, endpoint=endpoint)
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, metrics.buckets):
+                    cumulative += count
+                    durations.append(
+                        "renault_request_duration_seconds_bucket"
+                        f'{{{labels},le="{bound}"}} {cumulative}'
+                    )
+                cumulative += metrics.buckets[-1]
+                durations.append(
+                    "renault_request_duration_seconds_bucket"
+                    f'{{{labels},le="+Inf"}} {cumulative}'
+                )
+                durations.append(
+                    f"renault_request_duration_seconds_sum{{{labels}}} "
+                    f"{metrics.latency_sum}"
+                )
+                durations.append(
+                    f"renault_request_duration_seconds_count{{{labels}}} "
+                    f"{cumulative}"
+                )
+                for error, count in metrics.errors.items():
+                    errors.append(
+                        "renault_request_errors_total"
+                        f"{{{labels},{_labels(error=error)}}} {count}"
+                    )
+                if metrics.last_success is not None:
+                    last_success.append(
+                        f"renault_last_success_timestamp_seconds{{{labels}}} "
+                        f"{metrics.last_success.timestamp()}"
+                    )
+                refreshes.append(
+                    f"renault_refresh_duration_seconds_sum{{{labels}}} "
+                    f"{metrics.refresh_duration_sum}"
+                )
+                refreshes.append(
+                    f"renault_refresh_duration_seconds_count{{{labels}}} "
+                    f"{metrics.refresh_count}"
+                )
+                for reason, count in metrics.skipped_polls.items():
+                    skipped.append(
+                        "renault_polls_skipped_total"
+                        f"{{{labels},{_labels(reason=reason)}}} {count}"
+                    )
+                if metrics.disabled is not None:
+                    disabled_count += 1
+                    disabled.append(
+                        "renault_endpoint_disabled"
+                        f"{{{labels},{_labels(reason=metrics.disabled)}}} 1"
+                    )
+            for (service, outcome), count in vehicle.metrics.commands.items():
+                commands.append(
+                    "renault_commands_total"
+                    f"{{{_labels(vin=vin, service=service, outcome=outcome)}}} "
+                    f"{count}"
+                )
+    yield token_refreshes
+    yield durations
+    yield errors
+    yield last_success
+    yield refreshes
+    yield skipped
+    yield disabled
+    yield _metric(
+        "renault_disabled_endpoints", "gauge", "Number of disabled endpoints."
+    ) + [f"renault_disabled_endpoints {disabled_count}"]
+    yield commands
+
+
+def render_metrics(hubs: Dict[str, RenaultHub]) -> str:
+    """Render the metrics of all accounts in Prometheus text format."""
+    lines: List[str] = []
+    for metric_lines in _metric_groups(hubs):
+        lines.extend(metric_lines)
+    lines.append("")
+    return "\n".join(lines)
+
+
+class RenaultMetricsView(HomeAssistantView):
+    """Serve the metrics of the Renault integration to Prometheus."""
+
+    url = METRICS_URL
+    name = "api:renault:metrics"
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return the metrics."""
+        hass = request.app["hass"]
+        return web.Response(
+            body=render_metrics(hass.data.get(DOMAIN, {})).encode("utf-8"),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
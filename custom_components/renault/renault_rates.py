@@ -0,0 +1,144 @@
+"""Charging rates derived from recent battery samples of a Renault vehicle."""
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Optional, Tuple
+
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+
+from .renault_snapshots import BatterySnapshot
+
+RATES_WINDOW_SIZE = 12
+
+
+class RollingRegression:
+    """Least-squares slope over a fixed-size window of (x, y) samples.
+
+    The sums needed by the regression are updated when a sample enters or
+    leaves the window, so adding a sample is O(1).
+    """
+
+    __slots__ = ("_samples", "_sum_x", "_sum_y", "_sum_xx", "_sum_xy")
+
+    def __init__(self, size: int) -> None:
+        """Initialise regression."""
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=size)
+        self._sum_x = self._sum_y = self._sum_xx = self._sum_xy = 0.0
+
+    def __len__(self) -> int:
+        """Return the number of samples in the window."""
+        return len(self._samples)
+
+    def clear(self) -> None:
+        """Remove all samples."""
+        self._samples.clear()
+        self._sum_x = self._sum_y = self._sum_xx = self._sum_xy = 0.0
+
+    def add(self, x: float, y: float) -> None:
+        """Add a sample, evicting the oldest one if the window is full."""
+        if len(self._samples) == self._samples.maxlen:
+            old_x, old_y = self._samples[0]
+            self._sum_x -= old_x
+            self._sum_y -= old_y
+            self._sum_xx -= old_x * old_x
+            self._sum_xy -= old_x * old_y
+        self._samples.append((x, y))
+        self._sum_x += x
+        self._sum_y += y
+        self._sum_xx += x * x
+        self._sum_xy += x * y
+
+    def fit(self) -> Optional[Tuple[float, float]]:
+        """Return (slope, intercept), or None with less than two distinct x."""
+        count = len(self._samples)
+        denominator = count * self._sum_xx - self._sum_x * self._sum_x
+        if count < 2 or denominator <= 1e-9:
+            return None
+        slope = (count * self._sum_xy - self._sum_x * self._sum_y) / denominator
+        return slope, (self._sum_y - slope * self._sum_x) / count
+
+
+class RenaultChargingRates:
+    """Charging rates over the latest battery samples while charging.
+
+    Rates are per hour. Times are kept in hours relative to the first sample
+    of the window, to keep the regression sums small.
+    """
+
+    def __init__(self, size: int = RATES_WINDOW_SIZE) -> None:
+        """Initialise charging rates."""
+        self._energy = RollingRegression(size)
+        self._level = RollingRegression(size)
+        self._autonomy = RollingRegression(size)
+        self._origin: Optional[datetime] = None
+        self._last_time: Optional[float] = None
+
+    @callback
+    def async_record(self, snapshot: BatterySnapshot) -> None:
+        """Add a battery snapshot, unless it was already added."""
+        timestamp = dt_util.parse_datetime(snapshot.timestamp or "")
+        if timestamp is None:
+            return
+        if not snapshot.charging:
+            # Rates are only meaningful during a charge.
+            self._reset()
+            return
+        if self._origin is None:
+            self._origin = timestamp
+        hours = (timestamp - self._origin).total_seconds() / 3600
+        if self._last_time is not None and hours <= self._last_time:
+            return
+        self._last_time = hours
+        for regression, value in (
+            (self._energy, snapshot.battery_available_energy),
+            (self._level, snapshot.battery_level),
+            (self._autonomy, snapshot.battery_autonomy),
+        ):
+            if value is not None:
+                regression.add(hours, value)
+
+    def _reset(self) -> None:
+        """Forget the samples of the previous charge."""
+        self._energy.clear()
+        self._level.clear()
+        self._autonomy.clear()
+        self._origin = None
+        self._last_time = None
+
+    @staticmethod
+    def _rate(regression: RollingRegression) -> Optional[float]:
+        """Return the slope of a regression."""
+        fit = regression.fit()
+        return None if fit is None else fit[0]
+
+    @property
+    def energy_rate(self) -> Optional[float]:
+        """Return the charge rate, in kWh per hour."""
+        return self._rate(self._energy)
+
+    @property
+    def level_rate(self) -> Optional[float]:
+        """Return the charge rate, in battery percent per hour."""
+        return self._rate(self._level)
+
+    @property
+    def autonomy_rate(self) -> Optional[float]:
+        """Return the range gained per hour."""
+        return self._rate(self._autonomy)
+
+    @property
+    def charge_end(self) -> Optional[datetime]:
+        """Return when the battery is expected to be full.
+
+        The prediction uses the fitted battery level rather than the last
+        reported one, which smoothes out the rounding of the battery level.
+        """
+        fit = self._level.fit()
+        if fit is None or self._origin is None or self._last_time is None:
+            return None
+        slope, intercept = fit
+        if slope <= 0:
+            return None
+        level = intercept + slope * self._last_time
+        hours = self._last_time + max(0.0, 100 - level) / slope
+        return self._origin + timedelta(hours=hours)
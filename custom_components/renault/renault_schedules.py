@@ -0,0 +1,113 @@
+"""Local model of the charge schedules of a Renault vehicle."""
+import dataclasses
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from renault_api.kamereon import models
+import voluptuous as vol
+
+DAYS_OF_WEEK = (
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+)
+
+REGEX_START_TIME = "^T([01][0-9]|2[0-3]):[0-5][0-9]Z$"
+
+MINUTES_PER_DAY = 24 * 60
+
+DAY_SCHEDULE_SCHEMA = vol.Schema(
+    {
+        vol.Required("startTime"): cv.matches_regex(REGEX_START_TIME),
+        vol.Required("duration"): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MINUTES_PER_DAY)
+        ),
+    }
+)
+
+SCHEDULE_UPDATE_SCHEMA = vol.Schema(
+    {
+        vol.Required("id"): vol.Coerce(int),
+        vol.Optional("activated"): cv.boolean,
+        # A null day clears the schedule of that day
+        **{
+            vol.Optional(day): vol.Any(None, DAY_SCHEDULE_SCHEMA)
+            for day in DAYS_OF_WEEK
+        },
+    }
+)
+
+
+class NormalizedSchedule(NamedTuple):
+    """Charge schedule reduced to the values sent to the vehicle."""
+
+    id: Optional[int]
+    activated: bool
+    # (start in minutes after midnight, duration in minutes) for each day
+    days: Tuple[Optional[Tuple[int, int]], ...]
+
+
+def _normalize_day(
+    day_schedule: Optional[models.ChargeDaySchedule],
+) -> Optional[Tuple[int, int]]:
+    """Normalize the schedule of a single day."""
+    if day_schedule is None or day_schedule.startTime is None:
+        return None
+    start_time = day_schedule.startTime
+    start = int(start_time[1:3]) * 60 + int(start_time[4:6])
+    return (start, day_schedule.duration or 0)
+
+
+def normalize_schedules(
+    settings: models.KamereonVehicleChargingSettingsData,
+) -> Tuple[NormalizedSchedule, ...]:
+    """Normalize charging settings so that they can be compared."""
+    return tuple(
+        sorted(
+            (
+                NormalizedSchedule(
+                    schedule.id,
+                    bool(schedule.activated),
+                    tuple(
+                        _normalize_day(getattr(schedule, day)) for day in DAYS_OF_WEEK
+                    ),
+                )
+                for schedule in settings.schedules or []
+            ),
+            key=lambda schedule: schedule.id or 0,
+        )
+    )
+
+
+def apply_schedule_update(
+    settings: models.KamereonVehicleChargingSettingsData, update: Dict[str, Any]
+) -> models.KamereonVehicleChargingSettingsData:
+    """Return a copy of the charging settings with the update applied.
+
+    The update must have been validated with SCHEDULE_UPDATE_SCHEMA.
+    """
+    schedules: List[models.ChargeSchedule] = list(settings.schedules or [])
+    for index, schedule in enumerate(schedules):
+        if schedule.id == update["id"]:
+            break
+    else:
+        raise HomeAssistantError(f"Unable to find charge schedule: {update['id']}")
+
+    days = {
+        day: None
+        if update[day] is None
+        else models.ChargeDaySchedule(
+            update[day], update[day]["startTime"], update[day]["duration"]
+        )
+        for day in DAYS_OF_WEEK
+        if day in update
+    }
+    schedules[index] = dataclasses.replace(
+        schedule, activated=update.get("activated", schedule.activated), **days
+    )
+    return dataclasses.replace(settings, schedules=schedules)
@@ -0,0 +1,142 @@
+"""Charging session detection for a Renault vehicle."""
+import logging
+from typing import Any, Dict, Optional
+
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import HomeAssistantType
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .renault_snapshots import BatterySnapshot
+
+LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 60
+
+# Ignore power readings for gaps longer than this: the car may have charged
+# at a different rate while no data was received.
+MAX_POWER_INTEGRATION_SECONDS = 3600
+
+
+class RenaultChargingSessions:
+    """Detect charging sessions and account for the energy they deliver.
+
+    A session starts when the battery starts charging, and ends when the
+    vehicle is unplugged (or, if the plug status is unknown, when charging
+    stops). Between two updates, the energy delivered is the increase of
+    available energy. When the available energy is unknown or did not
+    increase, and the vehicle was charging at both updates, it falls back to
+    the integral of the charging power.
+
+    Each update is processed in constant time, only the running totals are
+    kept.
+    """
+
+    def __init__(self, hass: HomeAssistantType, vin: str) -> None:
+        """Initialise charging sessions."""
+        self._store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.charging_sessions.{vin.lower()}"
+        )
+        self.session_active = False
+        self.session_start: Optional[str] = None
+        self.session_end: Optional[str] = None
+        self.session_energy = 0.0
+        self.total_energy = 0.0
+        self.session_count = 0
+        self._last_timestamp: Optional[float] = None
+        self._last_charging = False
+        self._last_energy: Optional[float] = None
+        self._last_power: Optional[float] = None
+
+    async def async_load(self) -> None:
+        """Restore the sessions state."""
+        data = await self._store.async_load()
+        if data is None:
+            return
+        self.session_active = data["session_active"]
+        self.session_start = data["session_start"]
+        self.session_end = data["session_end"]
+        self.session_energy = data["session_energy"]
+        self.total_energy = data["total_energy"]
+        self.session_count = data["session_count"]
+        self._last_timestamp = data["last_timestamp"]
+        self._last_charging = data["last_charging"]
+        self._last_energy = data["last_energy"]
+        self._last_power = data["last_power"]
+
+    async def async_unload(self) -> None:
+        """Save pending changes."""
+        if self._last_timestamp is not None:
+            await self._store.async_save(self._data_to_save())
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the sessions state to store."""
+        return {
+            "session_active": self.session_active,
+            "session_start": self.session_start,
+            "session_end": self.session_end,
+            "session_energy": self.session_energy,
+            "total_energy": self.total_energy,
+            "session_count": self.session_count,
+            "last_timestamp": self._last_timestamp,
+            "last_charging": self._last_charging,
+            "last_energy": self._last_energy,
+            "last_power": self._last_power,
+        }
+
+    @callback
+    def async_record(self, snapshot: BatterySnapshot) -> None:
+        """Process a battery snapshot, unless it was already processed."""
+        timestamp = dt_util.parse_datetime(snapshot.timestamp or "")
+        if timestamp is None:
+            return
+        now = timestamp.timestamp()
+        if self._last_timestamp is not None and now <= self._last_timestamp:
+            return
+        charging = bool(snapshot.charging)
+        energy = snapshot.battery_available_energy
+        power = snapshot.charging_power
+
+        if charging and not self.session_active:
+            LOGGER.debug("Charging session started at %s", snapshot.timestamp)
+            self.session_active = True
+            self.session_start = snapshot.timestamp
+            self.session_end = None
+            self.session_energy = 0.0
+            self.session_count += 1
+        elif self.session_active and self._last_charging:
+            self._add_energy(now, energy, power if charging else None)
+
+        if self.session_active and (
+            snapshot.plugged_in is False
+            or (snapshot.plugged_in is None and not charging)
+        ):
+            LOGGER.debug("Charging session ended at %s", snapshot.timestamp)
+            self.session_active = False
+            self.session_end = snapshot.timestamp
+
+        self._last_timestamp = now
+        self._last_charging = charging
+        self._last_energy = energy
+        self._last_power = power
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    def _add_energy(
+        self, now: float, energy: Optional[float], power: Optional[float]
+    ) -> None:
+        """Add the energy delivered since the previous charging update.
+
+        power is None if the vehicle stopped charging since that update.
+        """
+        delivered = 0.0
+        if energy is not None and self._last_energy is not None:
+            delivered = energy - self._last_energy
+        if delivered <= 0 and power and self._last_power:
+            elapsed = now - (self._last_timestamp or now)
+            if elapsed <= MAX_POWER_INTEGRATION_SECONDS:
+                delivered = (self._last_power + power) / 2 * elapsed / 3600
+        if delivered > 0:
+            self.session_energy += delivered
+            self.total_energy += delivered
@@ -0,0 +1,259 @@
+"""Immutable per-update snapshots of Renault coordinator data."""
+from typing import Any, Optional
+
+from homeassistant.helpers.icon import icon_for_battery_level
+from homeassistant.util import slugify
+from homeassistant.util.unit_system import IMPERIAL_SYSTEM, METRIC_SYSTEM
+from renault_api.kamereon.enums import ChargeState, PlugState
+from renault_api.kamereon.models import (
+    KamereonVehicleBatteryStatusData,
+    KamereonVehicleChargeHistoryData,
+    KamereonVehicleChargeModeData,
+    KamereonVehicleChargingSettingsData,
+    KamereonVehicleCockpitData,
+    KamereonVehicleHvacSettingsData,
+    KamereonVehicleHvacStatusData,
+    KamereonVehicleLocationData,
+)
+
+
+def _convert_distance(value: Optional[float], in_miles: bool) -> Optional[int]:
+    """Convert a distance in kilometres to the display unit."""
+    if value is None:
+        return None
+    if in_miles:
+        return round(IMPERIAL_SYSTEM.length(value, METRIC_SYSTEM.length_unit))
+    return round(value)
+
+
+class RenaultSnapshot:
+    """Base class for immutable coordinator snapshots.
+
+    Snapshots are built once per coordinator update, so that entities read
+    precomputed values instead of deriving them on every property access.
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Prevent modification of the snapshot."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        """Prevent modification of the snapshot."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self) -> str:
+        """Return a representation of the snapshot."""
+        fields = ", ".join(
+            f"{slot}={getattr(self, slot)!r}" for slot in type(self).__slots__
+        )
+        return f"{type(self).__name__}({fields})"
+
+
+class BatterySnapshot(RenaultSnapshot):
+    """Snapshot of battery-status data."""
+
+    __slots__ = (
+        "timestamp",
+        "battery_level",
+        "battery_temperature",
+        "battery_autonomy",
+        "battery_available_energy",
+        "charging_remaining_time",
+        "charging_power",
+        "plug_status",
+        "plug_state",
+        "plugged_in",
+        "charge_state",
+        "charging",
+        "battery_icon",
+    )
+
+    def __init__(
+        self,
+        data: KamereonVehicleBatteryStatusData,
+        *,
+        distances_in_miles: bool,
+        power_in_watts: bool,
+    ) -> None:
+        """Initialise snapshot."""
+        _set = object.__setattr__
+        _set(self, "timestamp", data.timestamp)
+        _set(self, "battery_level", data.batteryLevel)
+        _set(self, "battery_temperature", data.batteryTemperature)
+        # Only converted distances are rounded, kilometres are kept as is.
+        _set(
+            self,
+            "battery_autonomy",
+            _convert_distance(data.batteryAutonomy, True)
+            if distances_in_miles
+            else data.batteryAutonomy,
+        )
+        _set(self, "battery_available_energy", data.batteryAvailableEnergy)
+        _set(self, "charging_remaining_time", data.chargingRemainingTime)
+
+        charging_power = data.chargingInstantaneousPower
+        if charging_power is not None and power_in_watts:
+            # Need to convert to kilowatts
+            charging_power = charging_power / 1000
+        _set(self, "charging_power", charging_power)
+
+        _set(self, "plug_status", data.plugStatus)
+        plug_status = data.get_plug_status()
+        _set(
+            self,
+            "plug_state",
+            slugify(plug_status.name) if plug_status is not None else None,
+        )
+        _set(
+            self,
+            "plugged_in",
+            plug_status == PlugState.PLUGGED if plug_status is not None else None,
+        )
+
+        charging_status = data.get_charging_status()
+        _set(
+            self,
+            "charge_state",
+            slugify(charging_status.name) if charging_status is not None else None,
+        )
+        charging = (
+            charging_status == ChargeState.CHARGE_IN_PROGRESS
+            if charging_status is not None
+            else None
+        )
+        _set(self, "charging", charging)
+        _set(
+            self,
+            "battery_icon",
+            icon_for_battery_level(
+                battery_level=data.batteryLevel, charging=bool(charging)
+            ),
+        )
+
+
+class ChargeModeSnapshot(RenaultSnapshot):
+    """Snapshot of charge-mode data."""
+
+    __slots__ = ("charge_mode", "icon")
+
+    def __init__(self, data: KamereonVehicleChargeModeData) -> None:
+        """Initialise snapshot."""
+        _set = object.__setattr__
+        _set(self, "charge_mode", data.chargeMode)
+        _set(
+            self,
+            "icon",
+            "mdi:calendar-clock"
+            if data.chargeMode == "schedule_mode"
+            else "mdi:calendar-remove",
+        )
+
+
+class ChargeHistorySnapshot(RenaultSnapshot):
+    """Snapshot of charge-history data, summed over the returned periods."""
+
+    __slots__ = ("charge_count", "charge_duration")
+
+    def __init__(self, data: KamereonVehicleChargeHistoryData) -> None:
+        """Initialise snapshot."""
+        _set = object.__setattr__
+        summaries = (data.raw_data or {}).get("chargeSummaries") or []
+        _set(
+            self,
+            "charge_count",
+            sum(summary.get("totalChargesNumber") or 0 for summary in summaries),
+        )
+        _set(
+            self,
+            "charge_duration",
+            sum(summary.get("totalChargesDuration") or 0 for summary in summaries),
+        )
+
+
+class ChargingSettingsSnapshot(RenaultSnapshot):
+    """Snapshot of charging-settings data."""
+
+    __slots__ = ("mode", "active_schedules")
+
+    def __init__(self, data: KamereonVehicleChargingSettingsData) -> None:
+        """Initialise snapshot."""
+        _set = object.__setattr__
+        _set(self, "mode", data.mode)
+        _set(
+            self,
+            "active_schedules",
+            sum(1 for schedule in data.schedules or [] if schedule.activated),
+        )
+
+
+class CockpitSnapshot(RenaultSnapshot):
+    """Snapshot of cockpit data."""
+
+    __slots__ = ("mileage", "fuel_autonomy", "fuel_quantity")
+
+    def __init__(
+        self,
+        data: KamereonVehicleCockpitData,
+        *,
+        distances_in_miles: bool,
+        is_metric: bool,
+    ) -> None:
+        """Initialise snapshot."""
+        _set = object.__setattr__
+        _set(self, "mileage", _convert_distance(data.totalMileage, distances_in_miles))
+        _set(
+            self,
+            "fuel_autonomy",
+            _convert_distance(data.fuelAutonomy, distances_in_miles),
+        )
+        fuel_quantity = data.fuelQuantity
+        if fuel_quantity is not None:
+            if not is_metric:
+                fuel_quantity = IMPERIAL_SYSTEM.volume(
+                    fuel_quantity, METRIC_SYSTEM.volume_unit
+                )
+            fuel_quantity = round(fuel_quantity)
+        _set(self, "fuel_quantity", fuel_quantity)
+
+
+class HvacSnapshot(RenaultSnapshot):
+    """Snapshot of hvac-status data."""
+
+    __slots__ = ("external_temperature", "hvac_status")
+
+    def __init__(self, data: KamereonVehicleHvacStatusData) -> None:
+        """Initialise snapshot."""
+        _set = object.__setattr__
+        _set(self, "external_temperature", data.externalTemperature)
+        _set(self, "hvac_status", data.hvacStatus)
+
+
+class HvacSettingsSnapshot(RenaultSnapshot):
+    """Snapshot of hvac-settings data."""
+
+    __slots__ = ("mode", "active_schedules")
+
+    def __init__(self, data: KamereonVehicleHvacSettingsData) -> None:
+        """Initialise snapshot."""
+        _set = object.__setattr__
+        _set(self, "mode", data.mode)
+        _set(
+            self,
+            "active_schedules",
+            sum(1 for schedule in data.schedules or [] if schedule.activated),
+        )
+
+
+class LocationSnapshot(RenaultSnapshot):
+    """Snapshot of location data."""
+
+    __slots__ = ("last_update", "latitude", "longitude")
+
+    def __init__(self, data: KamereonVehicleLocationData) -> None:
+        """Initialise snapshot."""
+        _set = object.__setattr__
+        _set(self, "last_update", data.lastUpdateTime)
+        _set(self, "latitude", data.gpsLatitude)
+        _set(self, "longitude", data.gpsLongitude)
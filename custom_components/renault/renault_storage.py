@@ -0,0 +1,94 @@
+"""Binary files stored by the Renault integration."""
+import logging
+import os
+from typing import Any, Callable, Optional
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import Event, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.helpers.typing import HomeAssistantType
+
+from .const import DOMAIN
+
+LOGGER = logging.getLogger(__name__)
+
+
+class RenaultBinaryStore:
+    """Persist binary data under .storage, with delayed writes.
+
+    Similar to homeassistant.helpers.storage.Store, for data which would be
+    too bulky as JSON. Files are read and written in the executor.
+    """
+
+    def __init__(
+        self, hass: HomeAssistantType, key: str, serialize: Callable[[], bytes]
+    ) -> None:
+        """Initialise store."""
+        self.hass = hass
+        self.path = hass.config.path(STORAGE_DIR, f"{DOMAIN}.{key}")
+        self._serialize = serialize
+        self._dirty = False
+        self._unsub_save: Optional[Callable[[], None]] = None
+        self._unsub_final_write: Optional[Callable[[], None]] = None
+
+    async def async_load(self) -> Optional[bytes]:
+        """Load the data, and start listening for Home Assistant stopping."""
+        if self._unsub_final_write is None:
+            self._unsub_final_write = self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_handle_final_write
+            )
+        return await self.hass.async_add_executor_job(self._read)
+
+    @callback
+    def async_delay_save(self, delay: float) -> None:
+        """Save the data after a delay, unless a save is already scheduled."""
+        self._dirty = True
+        if self._unsub_save is None:
+            self._unsub_save = async_call_later(
+                self.hass, delay, self._async_handle_delayed_save
+            )
+
+    async def _async_handle_delayed_save(self, _now: Any) -> None:
+        """Save after the delay."""
+        self._unsub_save = None
+        await self.async_save()
+
+    async def _async_handle_final_write(self, _event: Event) -> None:
+        """Save when Home Assistant stops."""
+        self._unsub_final_write = None
+        await self.async_save()
+
+    async def async_save(self) -> None:
+        """Save the data, if it changed."""
+        if not self._dirty:
+            return
+        self._dirty = False
+        await self.hass.async_add_executor_job(self._write, self._serialize())
+
+    async def async_unload(self) -> None:
+        """Stop listening, and save pending changes."""
+        if self._unsub_save is not None:
+            self._unsub_save()
+            self._unsub_save = None
+        if self._unsub_final_write is not None:
+            self._unsub_final_write()
+            self._unsub_final_write = None
+        await self.async_save()
+
+    def _read(self) -> Optional[bytes]:
+        """Read the file."""
+        try:
+            with open(self.path, "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, data: bytes) -> None:
+        """Write the file atomically."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, self.path)
+        LOGGER.debug("Saved %s (%s bytes)", self.path, len(data))
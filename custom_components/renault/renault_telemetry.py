@@ -0,0 +1,248 @@
+"""Local time-series store for the battery telemetry of a Renault vehicle."""
+from array import array
+import logging
+import math
+import struct
+import sys
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Tuple
+
+from homeassistant.core import callback
+from homeassistant.helpers.typing import HomeAssistantType
+from homeassistant.util import dt as dt_util
+
+from .renault_snapshots import BatterySnapshot
+from .renault_storage import RenaultBinaryStore
+
+LOGGER = logging.getLogger(__name__)
+
+# 2**16 samples cover more than 7 months of 5 minute updates.
+TELEMETRY_CAPACITY = 2 ** 16
+TELEMETRY_SAVE_DELAY = 300
+
+# Column name and array typecode. Missing floats are stored as NaN, and a
+# missing plug status as PLUG_STATUS_UNKNOWN.
+TELEMETRY_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("timestamp", "d"),
+    ("battery_level", "f"),
+    ("battery_available_energy", "f"),
+    ("charging_power", "f"),
+    ("battery_temperature", "f"),
+    ("plug_status", "i"),
+)
+PLUG_STATUS_UNKNOWN = -(2 ** 31)
+
+# Binary file layout: header, then each column in chronological order.
+FILE_MAGIC = b"RNTL"
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct("<4sBI")
+
+
+class TelemetrySample(NamedTuple):
+    """Single telemetry sample."""
+
+    timestamp: float
+    battery_level: Optional[float]
+    battery_available_energy: Optional[float]
+    charging_power: Optional[float]
+    battery_temperature: Optional[float]
+    plug_status: Optional[int]
+
+
+def _to_float(value: Optional[float]) -> float:
+    """Convert an optional value for storage in a float column."""
+    return math.nan if value is None else value
+
+
+def _from_float(value: float) -> Optional[float]:
+    """Convert a stored float back to an optional value."""
+    return None if math.isnan(value) else value
+
+
+class TelemetryBuffer:
+    """Fixed capacity ring buffer, with one array per column.
+
+    Samples are kept in chronological order: a sample which is not newer
+    than the latest one is ignored. Columns grow with the samples, so that
+    vehicles with little history stay small. Once full, the oldest sample is
+    overwritten.
+    """
+
+    __slots__ = ("capacity", "_columns", "_start", "_size")
+
+    def __init__(self, capacity: int = TELEMETRY_CAPACITY) -> None:
+        """Initialise buffer."""
+        self.capacity = capacity
+        self._columns: Dict[str, array] = {
+            name: array(typecode) for name, typecode in TELEMETRY_COLUMNS
+        }
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of samples."""
+        return self._size
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        """Return the timestamp of the latest sample."""
+        if not self._size:
+            return None
+        return self._columns["timestamp"][self._index(self._size - 1)]
+
+    def _index(self, position: int) -> int:
+        """Convert a chronological position to an array index."""
+        return (self._start + position) % self.capacity
+
+    def append(self, *values: Any) -> bool:
+        """Append a sample, given as one value per column.
+
+        Returns False if the sample is not newer than the latest sample.
+        """
+        last_timestamp = self.last_timestamp
+        if last_timestamp is not None and values[0] <= last_timestamp:
+            return False
+        if self._size < self.capacity:
+            self._size += 1
+            for column, value in zip(self._columns.values(), values):
+                column.append(value)
+            return True
+        index = self._start
+        self._start = (self._start + 1) % self.capacity
+        for column, value in zip(self._columns.values(), values):
+            column[index] = value
+        return True
+
+    def _bisect(self, timestamp: float) -> int:
+        """Return the position of the first sample at or after timestamp."""
+        timestamps = self._columns["timestamp"]
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if timestamps[self._index(middle)] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _positions(
+        self, start: Optional[float], end: Optional[float]
+    ) -> Tuple[int, int]:
+        """Return the positions of the samples in [start, end)."""
+        first = 0 if start is None else self._bisect(start)
+        last = self._size if end is None else self._bisect(end)
+        return first, max(first, last)
+
+    def _slice(self, name: str, first: int, last: int) -> array:
+        """Return a copy of a column between two positions."""
+        column = self._columns[name]
+        begin, end = self._start + first, self._start + last
+        if end <= self.capacity:
+            return column[begin:end]
+        if begin >= self.capacity:
+            return column[begin - self.capacity : end - self.capacity]
+        return column[begin:] + column[: end - self.capacity]
+
+    def column(
+        self, name: str, start: Optional[float] = None, end: Optional[float] = None
+    ) -> array:
+        """Return the values of a column for samples in [start, end)."""
+        return self._slice(name, *self._positions(start, end))
+
+    def samples(
+        self, start: Optional[float] = None, end: Optional[float] = None
+    ) -> Iterator[TelemetrySample]:
+        """Iterate over the samples in [start, end)."""
+        first, last = self._positions(start, end)
+        columns = [self._slice(name, first, last) for name, _ in TELEMETRY_COLUMNS]
+        for timestamp, level, energy, power, temperature, plug in zip(*columns):
+            yield TelemetrySample(
+                timestamp,
+                _from_float(level),
+                _from_float(energy),
+                _from_float(power),
+                _from_float(temperature),
+                None if plug == PLUG_STATUS_UNKNOWN else plug,
+            )
+
+    def to_bytes(self) -> bytes:
+        """Serialize the samples, oldest first."""
+        parts = [FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, self._size)]
+        for name, _ in TELEMETRY_COLUMNS:
+            column = self._slice(name, 0, self._size)
+            if sys.byteorder != "little":
+                column.byteswap()
+            parts.append(column.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(
+        cls, data: bytes, capacity: int = TELEMETRY_CAPACITY
+    ) -> "TelemetryBuffer":
+        """Deserialize samples, keeping the latest if there are too many."""
+        magic, version, size = FILE_HEADER.unpack_from(data)
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            raise ValueError("Unsupported telemetry file")
+        sample_size = sum(array(typecode).itemsize for _, typecode in TELEMETRY_COLUMNS)
+        if len(data) != FILE_HEADER.size + size * sample_size:
+            raise ValueError(
+                f"Truncated telemetry file: {len(data)} bytes for {size} samples"
+            )
+        buffer = cls(capacity)
+        offset = FILE_HEADER.size
+        skip = max(0, size - capacity)
+        for name, typecode in TELEMETRY_COLUMNS:
+            column = array(typecode)
+            length = column.itemsize * size
+            column.frombytes(data[offset : offset + length])
+            if sys.byteorder != "little":
+                column.byteswap()
+            buffer._columns[name][: size - skip] = column[skip:]
+            offset += length
+        buffer._size = size - skip
+        return buffer
+
+
+class RenaultTelemetry:
+    """Record the battery telemetry of a vehicle, and persist it to disk."""
+
+    def __init__(self, hass: HomeAssistantType, vin: str) -> None:
+        """Initialise telemetry."""
+        self.buffer = TelemetryBuffer()
+        self._store = RenaultBinaryStore(
+            hass, f"telemetry.{vin.lower()}", self._serialize
+        )
+
+    def _serialize(self) -> bytes:
+        """Serialize the buffer."""
+        return self.buffer.to_bytes()
+
+    async def async_load(self) -> None:
+        """Load persisted samples."""
+        data = await self._store.async_load()
+        if data is not None:
+            try:
+                self.buffer = TelemetryBuffer.from_bytes(data)
+            except (ValueError, struct.error) as err:
+                LOGGER.warning("Unable to load telemetry %s: %s", self._store.path, err)
+
+    @callback
+    def async_record(self, snapshot: BatterySnapshot) -> None:
+        """Record a battery snapshot, unless it was already recorded."""
+        timestamp = dt_util.parse_datetime(snapshot.timestamp or "")
+        if timestamp is None:
+            return
+        if self.buffer.append(
+            timestamp.timestamp(),
+            _to_float(snapshot.battery_level),
+            _to_float(snapshot.battery_available_energy),
+            _to_float(snapshot.charging_power),
+            _to_float(snapshot.battery_temperature),
+            PLUG_STATUS_UNKNOWN
+            if snapshot.plug_status is None
+            else snapshot.plug_status,
+        ):
+            self._store.async_delay_save(TELEMETRY_SAVE_DELAY)
+
+    async def async_unload(self) -> None:
+        """Save pending samples."""
+        await self._store.async_unload()
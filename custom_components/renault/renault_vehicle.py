@@ -1,17 +1,61 @@
 """Proxy to handle account communication with Renault servers."""
-from datetime import timedelta
+import asyncio
+from datetime import datetime, timedelta
+from functools import partial
 import logging
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from homeassistant.helpers.typing import HomeAssistantType
+from homeassistant.util import dt as dt_util
 from renault_api.kamereon import models
 from renault_api.renault_vehicle import RenaultVehicle
 
-from .const import DOMAIN, RENAULT_API_URL
+from .const import (
+    DEFAULT_TRACKER_MAX_INTERVAL,
+    DEFAULT_TRACKER_MIN_DISTANCE,
+    DOMAIN,
+    RENAULT_API_URL,
+)
+from .renault_budget import REQUEST_COMMAND, REQUEST_POLL, RequestBudget
+from .renault_commands import (
+    COMMAND_AC_CANCEL,
+    COMMAND_AC_START,
+    COMMAND_CHARGE_MODE,
+    COMMAND_CHARGE_SCHEDULES,
+    COMMAND_CHARGE_START,
+    RenaultCommandQueue,
+)
 from .renault_coordinator import RenaultDataUpdateCoordinator
+from .renault_locations import RenaultLocationHistory
+from .renault_metrics import RenaultMetrics, record_duration
+from .renault_rates import RenaultChargingRates
+from .renault_schedules import (
+    NormalizedSchedule,
+    apply_schedule_update,
+    normalize_schedules,
+)
+from .renault_sessions import RenaultChargingSessions
+from .renault_snapshots import (
+    BatterySnapshot,
+    ChargeHistorySnapshot,
+    ChargeModeSnapshot,
+    ChargingSettingsSnapshot,
+    CockpitSnapshot,
+    HvacSettingsSnapshot,
+    HvacSnapshot,
+    LocationSnapshot,
+)
+from .renault_telemetry import RenaultTelemetry
 
 LOGGER = logging.getLogger(__name__)
 
+# Interval between refreshes while waiting for a command to be confirmed.
+CONFIRMATION_POLL_INTERVAL = 30
+
+# Minimum polling interval of the coordinators created on demand, for data
+# which rarely changes.
+LAZY_SCAN_INTERVAL = timedelta(hours=1)
+
 
 class RenaultVehicleProxy:
     """Handle vehicle communication with Renault servers."""
@@ -23,6 +67,11 @@ class RenaultVehicleProxy:
         details: models.KamereonVehicleDetails,
         scan_interval: timedelta,
         distances_in_miles: bool,
+        tracker_min_distance: float = DEFAULT_TRACKER_MIN_DISTANCE,
+        tracker_max_interval: timedelta = timedelta(
+            seconds=DEFAULT_TRACKER_MAX_INTERVAL
+        ),
+        request_budget: Optional[RequestBudget] = None,
     ) -> None:
         """Initialise vehicle proxy."""
         self.hass = hass
@@ -36,9 +85,37 @@ class RenaultVehicleProxy:
             "sw_version": details.get_model_code(),
         }
         self.coordinators: Dict[str, RenaultDataUpdateCoordinator] = {}
+        self.metrics = RenaultMetrics()
+        # Requests of the whole account, shared by its vehicles.
+        self._request_budget = request_budget
+        # Duration of each initialisation phase, in seconds.
+        self.startup_timings: Dict[str, float] = {}
+        # Coordinators created on demand, when one of their entities is added.
+        self._coordinator_factories: Dict[
+            str, Callable[[], RenaultDataUpdateCoordinator]
+        ] = {}
         self.hvac_target_temperature = 21
         self._scan_interval = scan_interval
         self._distances_in_miles = distances_in_miles
+        # The device tracker ignores moves shorter than tracker_min_distance
+        # (in meters), unless its position is older than tracker_max_interval.
+        self.tracker_min_distance = tracker_min_distance
+        self.tracker_max_interval = tracker_max_interval
+        self._command_queue = RenaultCommandQueue(
+            hass, details.vin, on_send=self._record_command
+        )
+        self._charge_settings: Optional[
+            models.KamereonVehicleChargingSettingsData
+        ] = None
+        self._charge_schedules: Tuple[NormalizedSchedule, ...] = ()
+        self._charge_settings_updated: Optional[datetime] = None
+        # Serializes the read-modify-write of the charge schedules.
+        self._charge_schedules_lock = asyncio.Lock()
+        self.telemetry = RenaultTelemetry(hass, details.vin)
+        self.charging_sessions = RenaultChargingSessions(hass, details.vin)
+        self.charging_rates = RenaultChargingRates()
+        self.location_history = RenaultLocationHistory(hass, details.vin)
+        self._unsub_listeners: List[Callable[[], None]] = []
 
     @property
     def details(self) -> models.KamereonVehicleDetails:
@@ -65,7 +142,14 @@ class RenaultVehicleProxy:
                 LOGGER,
                 # Name of the data. For logging purposes.
                 name=f"{self.details.vin} cockpit",
+                metrics=self.metrics.endpoint("cockpit"),
+                on_request=self._poll_recorder("cockpit"),
                 update_method=self.get_cockpit,
+                snapshot_factory=partial(
+                    CockpitSnapshot,
+                    distances_in_miles=self.distances_in_miles,
+                    is_metric=self.hass.config.units.is_metric,
+                ),
                 # Polling interval. Will only be polled if there are subscribers.
                 update_interval=self._scan_interval,
             )
@@ -75,7 +159,10 @@ class RenaultVehicleProxy:
                 LOGGER,
                 # Name of the data. For logging purposes.
                 name=f"{self.details.vin} hvac_status",
+                metrics=self.metrics.endpoint("hvac_status"),
+                on_request=self._poll_recorder("hvac_status"),
                 update_method=self.get_hvac_status,
+                snapshot_factory=HvacSnapshot,
                 # Polling interval. Will only be polled if there are subscribers.
                 update_interval=self._scan_interval,
             )
@@ -86,17 +173,40 @@ class RenaultVehicleProxy:
                     LOGGER,
                     # Name of the data. For logging purposes.
                     name=f"{self.details.vin} battery",
+                    metrics=self.metrics.endpoint("battery"),
+                    on_request=self._poll_recorder("battery"),
                     update_method=self.get_battery_status,
+                    snapshot_factory=partial(
+                        BatterySnapshot,
+                        distances_in_miles=self.distances_in_miles,
+                        power_in_watts=self.details.reports_charging_power_in_watts(),
+                    ),
                     # Polling interval. Will only be polled if there are subscribers.
                     update_interval=self._scan_interval,
                 )
+                with record_duration(self.startup_timings, "load_storage"):
+                    await self.telemetry.async_load()
+                    await self.charging_sessions.async_load()
+                for update_callback in (
+                    self.telemetry.async_record,
+                    self.charging_sessions.async_record,
+                    self.charging_rates.async_record,
+                ):
+                    self._unsub_listeners.append(
+                        self.coordinators["battery"].async_add_snapshot_listener(
+                            update_callback
+                        )
+                    )
             if await self.endpoint_available("charge-mode"):
                 self.coordinators["charge_mode"] = RenaultDataUpdateCoordinator(
                     self.hass,
                     LOGGER,
                     # Name of the data. For logging purposes.
                     name=f"{self.details.vin} charge_mode",
+                    metrics=self.metrics.endpoint("charge_mode"),
+                    on_request=self._poll_recorder("charge_mode"),
                     update_method=self.get_charge_mode,
+                    snapshot_factory=ChargeModeSnapshot,
                     # Polling interval. Will only be polled if there are subscribers.
                     update_interval=self._scan_interval,
                 )
@@ -106,36 +216,131 @@ class RenaultVehicleProxy:
                 LOGGER,
                 # Name of the data. For logging purposes.
                 name=f"{self.details.vin} location",
+                metrics=self.metrics.endpoint("location"),
+                on_request=self._poll_recorder("location"),
                 update_method=self.get_location,
+                snapshot_factory=LocationSnapshot,
                 # Polling interval. Will only be polled if there are subscribers.
                 update_interval=self._scan_interval,
             )
+            with record_duration(self.startup_timings, "load_storage"):
+                await self.location_history.async_load()
+            self._unsub_listeners.append(
+                self.coordinators["location"].async_add_snapshot_listener(
+                    self.location_history.async_record
+                )
+            )
+        if self.details.uses_electricity():
+            lazy_interval = max(self._scan_interval, LAZY_SCAN_INTERVAL)
+            if await self.endpoint_available("charging-settings"):
+                self._coordinator_factories["charging_settings"] = partial(
+                    RenaultDataUpdateCoordinator,
+                    self.hass,
+                    LOGGER,
+                    name=f"{self.details.vin} charging_settings",
+                    metrics=self.metrics.endpoint("charging_settings"),
+                    on_request=self._poll_recorder("charging_settings"),
+                    update_method=self.get_charging_settings,
+                    snapshot_factory=ChargingSettingsSnapshot,
+                    update_interval=lazy_interval,
+                )
+            if await self.endpoint_available("hvac-settings"):
+                self._coordinator_factories["hvac_settings"] = partial(
+                    RenaultDataUpdateCoordinator,
+                    self.hass,
+                    LOGGER,
+                    name=f"{self.details.vin} hvac_settings",
+                    metrics=self.metrics.endpoint("hvac_settings"),
+                    on_request=self._poll_recorder("hvac_settings"),
+                    update_method=self.get_hvac_settings,
+                    snapshot_factory=HvacSettingsSnapshot,
+                    update_interval=lazy_interval,
+                )
+            if await self.endpoint_available("charge-history"):
+                self._coordinator_factories["charge_history"] = partial(
+                    RenaultDataUpdateCoordinator,
+                    self.hass,
+                    LOGGER,
+                    name=f"{self.details.vin} charge_history",
+                    metrics=self.metrics.endpoint("charge_history"),
+                    on_request=self._poll_recorder("charge_history"),
+                    update_method=self.get_monthly_charge_history,
+                    snapshot_factory=ChargeHistorySnapshot,
+                    update_interval=lazy_interval,
+                )
         for key in list(self.coordinators.keys()):
-            await self.coordinators[key].async_refresh()
-            if self.coordinators[key].not_supported:
-                # Remove endpoint if it is not supported for this vehicle.
+            with record_duration(self.startup_timings, f"first_refresh_{key}"):
+                await self.coordinators[key].async_refresh()
+            if not self._check_coordinator(key):
+                # Remove endpoint if it is not supported or denied for this vehicle.
                 del self.coordinators[key]
-                LOGGER.warning(
-                    "`Not Supported` on HA coordinator %s was not caught"
-                    " by `endpoint_available` method. It may be useful"
-                    " to open an issue on %s",
-                    key,
-                    RENAULT_API_URL,
-                )
 
-            elif self.coordinators[key].access_denied:
-                # Remove endpoint if it is denied for this vehicle.
-                del self.coordinators[key]
-                LOGGER.warning(
-                    "`Access Denied` on HA coordinator %s was not caught"
-                    " by `endpoint_available` method. It may be useful"
-                    " to open an issue on %s",
-                    key,
-                    RENAULT_API_URL,
-                )
+    def _check_coordinator(self, key: str) -> bool:
+        """Return False if the first refresh disabled the coordinator."""
+        if self.coordinators[key].not_supported:
+            LOGGER.warning(
+                "`Not Supported` on HA coordinator %s was not caught"
+                " by `endpoint_available` method. It may be useful"
+                " to open an issue on %s",
+                key,
+                RENAULT_API_URL,
+            )
+            return False
+        if self.coordinators[key].access_denied:
+            LOGGER.warning(
+                "`Access Denied` on HA coordinator %s was not caught"
+                " by `endpoint_available` method. It may be useful"
+                " to open an issue on %s",
+                key,
+                RENAULT_API_URL,
+            )
+            return False
+        return True
+
+    def _poll_recorder(self, key: str) -> Optional[Callable[[], None]]:
+        """Return the callback counting the polls of a coordinator."""
+        if self._request_budget is None:
+            return None
+        return partial(self._request_budget.record, key, REQUEST_POLL)
+
+    def _record_command(self, endpoint: str) -> None:
+        """Count a request made for a service call."""
+        if self._request_budget is not None:
+            self._request_budget.record(endpoint, REQUEST_COMMAND)
+
+    @property
+    def lazy_coordinators(self) -> List[str]:
+        """Return the keys of the coordinators which are created on demand."""
+        return list(self._coordinator_factories)
+
+    async def async_get_coordinator(self, key: str) -> RenaultDataUpdateCoordinator:
+        """Return a coordinator, creating and refreshing it on first use.
+
+        Coordinators of a disabled endpoint are kept (they no longer poll), so
+        that their entities show as unavailable.
+        """
+        coordinator = self.coordinators.get(key)
+        if coordinator is None:
+            coordinator = self.coordinators[key] = self._coordinator_factories[key]()
+            await coordinator.async_refresh()
+            self._check_coordinator(key)
+        return coordinator
+
+    async def async_unload(self) -> None:
+        """Stop listening to coordinators, and save local data."""
+        while self._unsub_listeners:
+            self._unsub_listeners.pop()()
+        await self.telemetry.async_unload()
+        await self.charging_sessions.async_unload()
+        await self.location_history.async_unload()
 
     async def endpoint_available(self, endpoint: str) -> bool:
         """Ensure the endpoint is available to avoid unnecessary queries."""
+        with record_duration(self.startup_timings, "endpoint_available"):
+            return await self._endpoint_available(endpoint)
+
+    async def _endpoint_available(self, endpoint: str) -> bool:
+        """Check the vehicle model and contracts support the endpoint."""
         if not await self._vehicle.supports_endpoint(endpoint):
             LOGGER.info(
                 "Vehicle model %s does not appear to support endpoint '%s'."
@@ -156,6 +361,34 @@ class RenaultVehicleProxy:
             return False
         return True
 
+    async def async_wait_for_state(
+        self, key: str, predicate: Callable[[Any], bool], timeout: timedelta
+    ) -> bool:
+        """Refresh a coordinator until its snapshot matches the predicate.
+
+        Returns False if the state is not confirmed before the timeout, or if
+        the vehicle has no such coordinator.
+        """
+        coordinator = self.coordinators.get(key)
+        if coordinator is None:
+            LOGGER.debug(
+                "%s: unable to confirm state without %s data", self.details.vin, key
+            )
+            return False
+        loop = self.hass.loop
+        deadline = loop.time() + timeout.total_seconds()
+        while True:
+            await coordinator.async_refresh()
+            # After a failed refresh, the snapshot is the one of the last success.
+            if coordinator.last_update_success:
+                snapshot = coordinator.snapshot
+                if snapshot is not None and predicate(snapshot):
+                    return True
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(CONFIRMATION_POLL_INTERVAL, remaining))
+
     async def get_battery_status(self) -> models.KamereonVehicleBatteryStatusData:
         """Get battery status information from vehicle."""
         return await self._vehicle.get_battery_status()
@@ -168,6 +401,45 @@ class RenaultVehicleProxy:
         """Get charging settings information from vehicle."""
         return await self._vehicle.get_charging_settings()
 
+    async def _async_get_charge_settings(
+        self,
+    ) -> models.KamereonVehicleChargingSettingsData:
+        """Get the local model of the charging settings, refreshing it if stale."""
+        if (
+            self._charge_settings is None
+            or self._charge_settings_updated is None
+            or dt_util.utcnow() - self._charge_settings_updated > self._scan_interval
+        ):
+            if self._request_budget is not None:
+                # A read of the vehicle data, even when made for a service call.
+                self._request_budget.record("charging_settings", REQUEST_POLL)
+            self._set_charge_settings(await self.get_charging_settings())
+        assert self._charge_settings is not None
+        return self._charge_settings
+
+    def _set_charge_settings(
+        self, settings: Optional[models.KamereonVehicleChargingSettingsData]
+    ) -> None:
+        """Replace the local model of the charging settings."""
+        self._charge_settings = settings
+        if settings is None:
+            self._charge_schedules = ()
+            self._charge_settings_updated = None
+        else:
+            self._charge_schedules = normalize_schedules(settings)
+            self._charge_settings_updated = dt_util.utcnow()
+
+    async def get_monthly_charge_history(
+        self,
+    ) -> models.KamereonVehicleChargeHistoryData:
+        """Get charge history of the current month from vehicle."""
+        now = dt_util.now()
+        return await self._vehicle.get_charge_history(now.replace(day=1), now, "month")
+
+    async def get_hvac_settings(self) -> models.KamereonVehicleHvacSettingsData:
+        """Get hvac settings information from vehicle."""
+        return await self._vehicle.get_hvac_settings()
+
     async def get_hvac_status(self) -> models.KamereonVehicleHvacStatusData:
         """Get hvac status information from vehicle."""
         return await self._vehicle.get_hvac_status()
@@ -184,24 +456,63 @@ class RenaultVehicleProxy:
         self, temperature, when=None
     ) -> models.KamereonVehicleHvacStartActionData:
         """Start A/C on vehicle."""
-        return await self._vehicle.set_ac_start(temperature, when)
+        return await self._command_queue.async_send(
+            COMMAND_AC_START, partial(self._vehicle.set_ac_start, temperature, when)
+        )
 
     async def send_cancel_ac(self) -> models.KamereonVehicleHvacStartActionData:
         """Cancel A/C on vehicle."""
-        return await self._vehicle.set_ac_stop()
+        return await self._command_queue.async_send(
+            COMMAND_AC_CANCEL, self._vehicle.set_ac_stop
+        )
 
     async def send_set_charge_mode(
         self, charge_mode: str
     ) -> models.KamereonVehicleChargeModeActionData:
         """Set charge mode on vehicle."""
-        return await self._vehicle.set_charge_mode(charge_mode)
+        return await self._command_queue.async_send(
+            COMMAND_CHARGE_MODE, partial(self._vehicle.set_charge_mode, charge_mode)
+        )
 
     async def send_charge_start(self) -> models.KamereonVehicleChargingStartActionData:
         """Start charge on vehicle."""
-        return await self._vehicle.set_charge_start()
+        return await self._command_queue.async_send(
+            COMMAND_CHARGE_START, self._vehicle.set_charge_start
+        )
 
     async def send_set_charge_schedules(
         self, schedules: models.KamereonVehicleChargingSettingsData
     ) -> models.KamereonVehicleChargeScheduleActionData:
         """Set charge schedules on vehicle."""
-        return await self._vehicle.set_charge_schedules(schedules.schedules)
+        return await self._command_queue.async_send(
+            COMMAND_CHARGE_SCHEDULES,
+            partial(self._vehicle.set_charge_schedules, schedules.schedules),
+        )
+
+    async def send_charge_schedule_update(
+        self, update: Dict[str, Any]
+    ) -> Optional[models.KamereonVehicleChargeScheduleActionData]:
+        """Update a charge schedule on vehicle.
+
+        The update is applied to the local model of the charge schedules, and
+        nothing is sent (None is returned) if the schedules are unchanged.
+        Updates are applied one at a time, so that each upload holds the
+        updates sent before it.
+        """
+        async with self._charge_schedules_lock:
+            settings = await self._async_get_charge_settings()
+            new_settings = apply_schedule_update(settings, update)
+            if normalize_schedules(new_settings) == self._charge_schedules:
+                LOGGER.debug(
+                    "Charge schedules of %s are unchanged, skipping upload",
+                    self.details.vin,
+                )
+                return None
+            try:
+                result = await self.send_set_charge_schedules(new_settings)
+            except Exception:
+                # The vehicle may or may not have the new schedules
+                self._set_charge_settings(None)
+                raise
+            self._set_charge_settings(new_settings)
+            return result
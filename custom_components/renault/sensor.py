@@ -6,38 +6,65 @@ from homeassistant.const import (
     DEVICE_CLASS_BATTERY,
     DEVICE_CLASS_ENERGY,
     DEVICE_CLASS_TEMPERATURE,
+    DEVICE_CLASS_TIMESTAMP,
+    ENERGY_KILO_WATT_HOUR,
     LENGTH_KILOMETERS,
     LENGTH_MILES,
     PERCENTAGE,
     POWER_KILO_WATT,
     TEMP_CELSIUS,
+    TIME_HOURS,
+    TIME_MILLISECONDS,
     TIME_MINUTES,
     VOLUME_GALLONS,
     VOLUME_LITERS,
 )
+from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.icon import icon_for_battery_level
 from homeassistant.helpers.typing import HomeAssistantType
 from homeassistant.util import slugify
-from homeassistant.util.unit_system import IMPERIAL_SYSTEM, METRIC_SYSTEM
-from renault_api.kamereon.enums import ChargeState, PlugState
 
 from .const import (
+    ATTR_STATE_CLASS,
     DEVICE_CLASS_CHARGE_MODE,
     DEVICE_CLASS_CHARGE_STATE,
     DEVICE_CLASS_PLUG_STATE,
     DOMAIN,
+    STATE_CLASS_TOTAL_INCREASING,
 )
+from .renault_budget import RequestBudget
 from .renault_entities import (
     RenaultBatteryDataEntity,
+    RenaultChargeHistoryDataEntity,
     RenaultChargeModeDataEntity,
+    RenaultChargingSettingsDataEntity,
     RenaultCockpitDataEntity,
     RenaultDataEntity,
+    RenaultHvacSettingsDataEntity,
     RenaultHVACDataEntity,
+    cached_per_update,
 )
 from .renault_hub import RenaultHub
 from .renault_vehicle import RenaultVehicleProxy
 
 ATTR_BATTERY_AVAILABLE_ENERGY = "battery_available_energy"
+ATTR_CHARGE_DURATION = "charge_duration"
+ATTR_DAY_BUDGET = "day_budget"
+ATTR_DAY_ENDPOINTS = "day_endpoints"
+ATTR_DAY_KINDS = "day_kinds"
+ATTR_DAY_REQUESTS = "day_requests"
+ATTR_ERRORS = "errors"
+ATTR_HOUR_BUDGET = "hour_budget"
+ATTR_HOUR_ENDPOINTS = "hour_endpoints"
+ATTR_HOUR_KINDS = "hour_kinds"
+ATTR_LAST_SUCCESS = "last_success"
+ATTR_LATENCY_BUCKETS = "latency_buckets"
+ATTR_MODE = "mode"
+ATTR_REQUESTS = "requests"
+ATTR_SESSION_ACTIVE = "session_active"
+ATTR_SESSION_COUNT = "session_count"
+ATTR_SESSION_END = "session_end"
+ATTR_SESSION_START = "session_start"
 
 
 async def async_setup_entry(
@@ -47,7 +74,11 @@ async def async_setup_entry(
 ) -> None:
     """Set up the Renault entities from config entry."""
     proxy: RenaultHub = hass.data[DOMAIN][config_entry.unique_id]
-    entities = await get_entities(proxy)
+    entities: List[Entity] = []
+    entities.extend(await get_entities(proxy))
+    entities.append(
+        RenaultRequestBudgetSensor(proxy.request_budget, config_entry.unique_id)
+    )
     async_add_entities(entities)
 
 
@@ -79,8 +110,25 @@ async def get_vehicle_entities(vehicle: RenaultVehicleProxy) -> List[RenaultData
         entities.append(RenaultPlugStateSensor(vehicle, "Plug State"))
         entities.append(RenaultBatteryAutonomySensor(vehicle, "Battery Autonomy"))
         entities.append(RenaultBatteryTemperatureSensor(vehicle, "Battery Temperature"))
+        entities.append(
+            RenaultChargingSessionEnergySensor(vehicle, "Charging Session Energy")
+        )
+        entities.append(RenaultChargedEnergySensor(vehicle, "Charged Energy"))
+        entities.append(RenaultChargingRateSensor(vehicle, "Charging Rate"))
+        entities.append(RenaultBatteryLevelRateSensor(vehicle, "Battery Level Rate"))
+        entities.append(RenaultRangeGainRateSensor(vehicle, "Range Gain Rate"))
+        entities.append(RenaultChargeEndSensor(vehicle, "Charge End"))
     if "charge_mode" in vehicle.coordinators:
         entities.append(RenaultChargeModeSensor(vehicle, "Charge Mode"))
+    for key, coordinator in vehicle.coordinators.items():
+        if coordinator.metrics is not None:
+            entities.append(RenaultEndpointLatencySensor(vehicle, key))
+    if "charging_settings" in vehicle.lazy_coordinators:
+        entities.append(RenaultChargeSchedulesSensor(vehicle, "Charge Schedules"))
+    if "hvac_settings" in vehicle.lazy_coordinators:
+        entities.append(RenaultHvacSchedulesSensor(vehicle, "HVAC Schedules"))
+    if "charge_history" in vehicle.lazy_coordinators:
+        entities.append(RenaultMonthlyChargesSensor(vehicle, "Monthly Charges"))
     return entities
 
 
@@ -90,7 +138,7 @@ class RenaultBatteryLevelSensor(RenaultBatteryDataEntity):
     @property
     def state(self) -> Optional[int]:
         """Return the state of this entity."""
-        return self.data.batteryLevel if self.data else None
+        return self.snapshot.battery_level if self.snapshot else None
 
     @property
     def device_class(self) -> str:
@@ -105,18 +153,18 @@ class RenaultBatteryLevelSensor(RenaultBatteryDataEntity):
     @property
     def icon(self) -> str:
         """Icon handling."""
-        charging = (
-            self.data
-            and self.data.get_charging_status() == ChargeState.CHARGE_IN_PROGRESS
-        )
-        return icon_for_battery_level(battery_level=self.state, charging=charging)
+        if self.snapshot:
+            return self.snapshot.battery_icon
+        return icon_for_battery_level(battery_level=None)
 
-    @property
+    @cached_per_update
     def device_state_attributes(self) -> Dict[str, Any]:
         """Return the state attributes of this entity."""
-        attrs = super().device_state_attributes
-        if self.data.batteryAvailableEnergy is not None:
-            attrs[ATTR_BATTERY_AVAILABLE_ENERGY] = self.data.batteryAvailableEnergy
+        attrs = dict(super().device_state_attributes)
+        if self.snapshot.battery_available_energy is not None:
+            attrs[
+                ATTR_BATTERY_AVAILABLE_ENERGY
+            ] = self.snapshot.battery_available_energy
         return attrs
 
 
@@ -126,7 +174,7 @@ class RenaultBatteryTemperatureSensor(RenaultBatteryDataEntity):
     @property
     def state(self) -> Optional[int]:
         """Return the state of this entity."""
-        return self.data.batteryTemperature
+        return self.snapshot.battery_temperature
 
     @property
     def device_class(self) -> str:
@@ -145,13 +193,13 @@ class RenaultChargeModeSensor(RenaultChargeModeDataEntity):
     @property
     def state(self) -> Optional[str]:
         """Return the state of this entity."""
-        return self.data.chargeMode
+        return self.snapshot.charge_mode
 
     @property
     def icon(self) -> str:
         """Icon handling."""
-        if self.data and self.data.chargeMode == "schedule_mode":
-            return "mdi:calendar-clock"
+        if self.snapshot:
+            return self.snapshot.icon
         return "mdi:calendar-remove"
 
     @property
@@ -160,13 +208,32 @@ class RenaultChargeModeSensor(RenaultChargeModeDataEntity):
         return DEVICE_CLASS_CHARGE_MODE
 
 
+class RenaultChargeSchedulesSensor(RenaultChargingSettingsDataEntity):
+    """Number of active charge schedules."""
+
+    @property
+    def state(self) -> Optional[int]:
+        """Return the state of this entity."""
+        return self.snapshot.active_schedules
+
+    @property
+    def icon(self) -> str:
+        """Icon handling."""
+        return "mdi:calendar-clock"
+
+    @cached_per_update
+    def device_state_attributes(self) -> Dict[str, Any]:
+        """Return the state attributes of this entity."""
+        return {ATTR_MODE: self.snapshot.mode}
+
+
 class RenaultChargingRemainingTimeSensor(RenaultBatteryDataEntity):
     """Charging Remaining Time sensor."""
 
     @property
     def state(self) -> Optional[int]:
         """Return the state of this entity."""
-        return self.data.chargingRemainingTime
+        return self.snapshot.charging_remaining_time
 
     @property
     def icon(self) -> str:
@@ -185,12 +252,7 @@ class RenaultChargingPowerSensor(RenaultBatteryDataEntity):
     @property
     def state(self) -> Optional[float]:
         """Return the state of this entity."""
-        if self.data.chargingInstantaneousPower is None:
-            return None
-        if self.vehicle.details.reports_charging_power_in_watts():
-            # Need to convert to kilowatts
-            return self.data.chargingInstantaneousPower / 1000
-        return self.data.chargingInstantaneousPower
+        return self.snapshot.charging_power
 
     @property
     def unit_of_measurement(self) -> str:
@@ -203,13 +265,335 @@ class RenaultChargingPowerSensor(RenaultBatteryDataEntity):
         return DEVICE_CLASS_ENERGY
 
 
+class RenaultChargingSessionEnergySensor(RenaultBatteryDataEntity):
+    """Energy delivered by the current (or last) charging session."""
+
+    @property
+    def state(self) -> float:
+        """Return the state of this entity."""
+        return round(self.vehicle.charging_sessions.session_energy, 2)
+
+    @property
+    def icon(self) -> str:
+        """Icon handling."""
+        return "mdi:ev-station"
+
+    @property
+    def unit_of_measurement(self) -> str:
+        """Return the unit of measurement of this entity."""
+        return ENERGY_KILO_WATT_HOUR
+
+    @property
+    def device_class(self) -> str:
+        """Returning sensor device class"""
+        return DEVICE_CLASS_ENERGY
+
+    @cached_per_update
+    def device_state_attributes(self) -> Dict[str, Any]:
+        """Return the state attributes of this entity."""
+        sessions = self.vehicle.charging_sessions
+        attrs = dict(super().device_state_attributes)
+        attrs[ATTR_SESSION_ACTIVE] = sessions.session_active
+        attrs[ATTR_SESSION_START] = sessions.session_start
+        attrs[ATTR_SESSION_END] = sessions.session_end
+        return attrs
+
+
+class RenaultChargedEnergySensor(RenaultBatteryDataEntity):
+    """Energy delivered by all charging sessions, for the energy dashboard."""
+
+    @property
+    def state(self) -> float:
+        """Return the state of this entity."""
+        return round(self.vehicle.charging_sessions.total_energy, 2)
+
+    @property
+    def icon(self) -> str:
+        """Icon handling."""
+        return "mdi:ev-station"
+
+    @property
+    def unit_of_measurement(self) -> str:
+        """Return the unit of measurement of this entity."""
+        return ENERGY_KILO_WATT_HOUR
+
+    @property
+    def device_class(self) -> str:
+        """Returning sensor device class"""
+        return DEVICE_CLASS_ENERGY
+
+    @property
+    def state_class(self) -> str:
+        """Return the state class of this entity."""
+        return STATE_CLASS_TOTAL_INCREASING
+
+    @property
+    def capability_attributes(self) -> Dict[str, Any]:
+        """Return the capability attributes of this entity."""
+        return {ATTR_STATE_CLASS: self.state_class}
+
+    @cached_per_update
+    def device_state_attributes(self) -> Dict[str, Any]:
+        """Return the state attributes of this entity."""
+        attrs = dict(super().device_state_attributes)
+        attrs[ATTR_SESSION_COUNT] = self.vehicle.charging_sessions.session_count
+        return attrs
+
+
+class RenaultChargingRateSensor(RenaultBatteryDataEntity):
+    """Energy charged per hour, over the latest battery updates."""
+
+    @property
+    def state(self) -> Optional[float]:
+        """Return the state of this entity."""
+        rate = self.vehicle.charging_rates.energy_rate
+        return None if rate is None else round(rate, 2)
+
+    @property
+    def icon(self) -> str:
+        """Icon handling."""
+        return "mdi:battery-charging"
+
+    @property
+    def unit_of_measurement(self) -> str:
+        """Return the unit of measurement of this entity."""
+        return f"{ENERGY_KILO_WATT_HOUR}/{TIME_HOURS}"
+
+
+class RenaultBatteryLevelRateSensor(RenaultBatteryDataEntity):
+    """Battery level gained per hour, over the latest battery updates."""
+
+    @property
+    def state(self) -> Optional[float]:
+        """Return the state of this entity."""
+        rate = self.vehicle.charging_rates.level_rate
+        return None if rate is None else round(rate, 1)
+
+    @property
+    def icon(self) -> str:
+        """Icon handling."""
+        return "mdi:battery-arrow-up"
+
+    @property
+    def unit_of_measurement(self) -> str:
+        """Return the unit of measurement of this entity."""
+        return f"{PERCENTAGE}/{TIME_HOURS}"
+
+
+class RenaultRangeGainRateSensor(RenaultBatteryDataEntity):
+    """Range gained per hour, over the latest battery updates."""
+
+    @property
+    def state(self) -> Optional[float]:
+        """Return the state of this entity."""
+        rate = self.vehicle.charging_rates.autonomy_rate
+        return None if rate is None else round(rate)
+
+    @property
+    def icon(self) -> str:
+        """Icon handling."""
+        return "mdi:ev-station"
+
+    @property
+    def unit_of_measurement(self) -> str:
+        """Return the unit of measurement of this entity."""
+        if self.vehicle.distances_in_miles:
+            return f"{LENGTH_MILES}/{TIME_HOURS}"
+        return f"{LENGTH_KILOMETERS}/{TIME_HOURS}"
+
+
+class RenaultChargeEndSensor(RenaultBatteryDataEntity):
+    """Predicted end of charge, from the battery level gained per hour."""
+
+    @property
+    def state(self) -> Optional[str]:
+        """Return the state of this entity."""
+        charge_end = self.vehicle.charging_rates.charge_end
+        if charge_end is None:
+            return None
+        return charge_end.replace(microsecond=0).isoformat()
+
+    @property
+    def icon(self) -> str:
+        """Icon handling."""
+        return "mdi:timer-sand"
+
+    @property
+    def device_class(self) -> str:
+        """Returning sensor device class"""
+        return DEVICE_CLASS_TIMESTAMP
+
+
+class RenaultEndpointLatencySensor(RenaultDataEntity):
+    """Diagnostic sensor with the request metrics of an endpoint."""
+
+    def __init__(self, vehicle: RenaultVehicleProxy, coordinator_key: str) -> None:
+        """Initialise entity."""
+        super().__init__(
+            vehicle,
+            f"{coordinator_key.replace('_', ' ').title()} Latency",
+            coordinator_key,
+        )
+
+    @property
+    def entity_registry_enabled_default(self) -> bool:
+        """Return if the entity should be enabled when first added."""
+        return False
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        # Metrics are meaningful even when the requests fail.
+        return True
+
+    @property
+    def state(self) -> Optional[int]:
+        """Return the state of this entity."""
+        latency = self.coordinator.metrics.mean_latency
+        return None if latency is None else round(latency * 1000)
+
+    @property
+    def icon(self) -> str:
+        """Icon handling."""
+        return "mdi:timer-outline"
+
+    @property
+    def unit_of_measurement(self) -> str:
+        """Return the unit of measurement of this entity."""
+        return TIME_MILLISECONDS
+
+    @cached_per_update
+    def device_state_attributes(self) -> Dict[str, Any]:
+        """Return the state attributes of this entity."""
+        metrics = self.coordinator.metrics.as_dict()
+        return {
+            ATTR_REQUESTS: metrics["requests"],
+            ATTR_ERRORS: metrics["errors"],
+            ATTR_LAST_SUCCESS: metrics["last_success"],
+            ATTR_LATENCY_BUCKETS: metrics["latency_buckets"],
+        }
+
+
+class RenaultRequestBudgetSensor(Entity):
+    """Requests made by an account in the last hour, with their breakdown.
+
+    The state is written after each request of the account.
+    """
+
+    def __init__(self, request_budget: RequestBudget, account_id: str) -> None:
+        """Initialise entity."""
+        self._request_budget = request_budget
+        self._name = f"{account_id}-requests"
+        self._unique_id = slugify(self._name)
+        self._device_info = {
+            "identifiers": {(DOMAIN, account_id)},
+            "manufacturer": "Renault",
+            "model": "Kamereon account",
+            "name": f"Renault account {account_id}",
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Write the state after each request."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._request_budget.async_add_listener(self.async_write_ha_state)
+        )
+
+    @property
+    def should_poll(self) -> bool:
+        """No polling needed, requests push updates."""
+        return False
+
+    @property
+    def unique_id(self) -> str:
+        """Return a unique identifier for this entity."""
+        return self._unique_id
+
+    @property
+    def name(self) -> str:
+        """Return the name of this entity."""
+        return self._name
+
+    @property
+    def device_info(self) -> Dict[str, Any]:
+        """Return the account device, for device registry."""
+        return self._device_info
+
+    @property
+    def state(self) -> int:
+        """Return the state of this entity."""
+        return self._request_budget.hour_requests
+
+    @property
+    def icon(self) -> str:
+        """Icon handling."""
+        return "mdi:counter"
+
+    @property
+    def unit_of_measurement(self) -> str:
+        """Return the unit of measurement of this entity."""
+        return "requests"
+
+    @property
+    def device_state_attributes(self) -> Dict[str, Any]:
+        """Return the state attributes of this entity."""
+        budget = self._request_budget.as_dict()
+        return {
+            ATTR_HOUR_BUDGET: budget["hour"]["budget"],
+            ATTR_HOUR_ENDPOINTS: budget["hour"]["endpoints"],
+            ATTR_HOUR_KINDS: budget["hour"]["kinds"],
+            ATTR_DAY_REQUESTS: budget["day"]["requests"],
+            ATTR_DAY_BUDGET: budget["day"]["budget"],
+            ATTR_DAY_ENDPOINTS: budget["day"]["endpoints"],
+            ATTR_DAY_KINDS: budget["day"]["kinds"],
+        }
+
+
+class RenaultHvacSchedulesSensor(RenaultHvacSettingsDataEntity):
+    """Number of active HVAC schedules."""
+
+    @property
+    def state(self) -> Optional[int]:
+        """Return the state of this entity."""
+        return self.snapshot.active_schedules
+
+    @property
+    def icon(self) -> str:
+        """Icon handling."""
+        return "mdi:calendar-clock"
+
+    @cached_per_update
+    def device_state_attributes(self) -> Dict[str, Any]:
+        """Return the state attributes of this entity."""
+        return {ATTR_MODE: self.snapshot.mode}
+
+
+class RenaultMonthlyChargesSensor(RenaultChargeHistoryDataEntity):
+    """Number of charges during the current month."""
+
+    @property
+    def state(self) -> Optional[int]:
+        """Return the state of this entity."""
+        return self.snapshot.charge_count
+
+    @property
+    def icon(self) -> str:
+        """Icon handling."""
+        return "mdi:ev-station"
+
+    @cached_per_update
+    def device_state_attributes(self) -> Dict[str, Any]:
+        """Return the state attributes of this entity."""
+        return {ATTR_CHARGE_DURATION: self.snapshot.charge_duration}
+
+
 class RenaultOutsideTemperatureSensor(RenaultHVACDataEntity):
     """HVAC Outside Temperature sensor."""
 
     @property
     def state(self) -> Optional[float]:
         """Return the state of this entity."""
-        return self.data.externalTemperature
+        return self.snapshot.external_temperature
 
     @property
     def device_class(self) -> str:
@@ -228,16 +612,12 @@ class RenaultPlugStateSensor(RenaultBatteryDataEntity):
     @property
     def state(self) -> Optional[str]:
         """Return the state of this entity."""
-        return (
-            slugify(self.data.get_plug_status().name)
-            if self.data and self.data.plugStatus is not None
-            else None
-        )
+        return self.snapshot.plug_state if self.snapshot else None
 
     @property
     def icon(self) -> str:
         """Icon handling."""
-        if self.state == PlugState.PLUGGED.name:
+        if self.snapshot and self.snapshot.plugged_in:
             return "mdi:power-plug"
         return "mdi:power-plug-off"
 
@@ -253,16 +633,12 @@ class RenaultChargeStateSensor(RenaultBatteryDataEntity):
     @property
     def state(self) -> Optional[str]:
         """Return the state of this entity."""
-        return (
-            slugify(self.data.get_charging_status().name)
-            if self.data and self.data.chargingStatus is not None
-            else None
-        )
+        return self.snapshot.charge_state if self.snapshot else None
 
     @property
     def icon(self) -> str:
         """Icon handling."""
-        if self.state == ChargeState.CHARGE_IN_PROGRESS.name:
+        if self.snapshot and self.snapshot.charging:
             return "mdi:flash"
         return "mdi:flash-off"
 
@@ -278,15 +654,7 @@ class RenaultFuelAutonomySensor(RenaultCockpitDataEntity):
     @property
     def state(self) -> Optional[int]:
         """Return the state of this entity."""
-        if self.data.fuelAutonomy is None:
-            return None
-        if self.vehicle.distances_in_miles:
-            return round(
-                IMPERIAL_SYSTEM.length(
-                    self.data.fuelAutonomy, METRIC_SYSTEM.length_unit
-                )
-            )
-        return round(self.data.fuelAutonomy)
+        return self.snapshot.fuel_autonomy
 
     @property
     def icon(self) -> str:
@@ -307,13 +675,7 @@ class RenaultFuelQuantitySensor(RenaultCockpitDataEntity):
     @property
     def state(self) -> Optional[int]:
         """Return the state of this entity."""
-        if self.data.fuelQuantity is None:
-            return None
-        if self.hass.config.units.is_metric:
-            return round(self.data.fuelQuantity)
-        return round(
-            IMPERIAL_SYSTEM.volume(self.data.fuelQuantity, METRIC_SYSTEM.volume_unit)
-        )
+        return self.snapshot.fuel_quantity
 
     @property
     def icon(self) -> str:
@@ -334,15 +696,7 @@ class RenaultMileageSensor(RenaultCockpitDataEntity):
     @property
     def state(self) -> Optional[int]:
         """Return the state of this entity."""
-        if self.data.totalMileage is None:
-            return None
-        if self.vehicle.distances_in_miles:
-            return round(
-                IMPERIAL_SYSTEM.length(
-                    self.data.totalMileage, METRIC_SYSTEM.length_unit
-                )
-            )
-        return round(self.data.totalMileage)
+        return self.snapshot.mileage
 
     @property
     def icon(self) -> str:
@@ -363,15 +717,7 @@ class RenaultBatteryAutonomySensor(RenaultBatteryDataEntity):
     @property
     def state(self) -> Optional[int]:
         """Return the state of this entity."""
-        if self.data.batteryAutonomy is None:
-            return None
-        if self.vehicle.distances_in_miles:
-            return round(
-                IMPERIAL_SYSTEM.length(
-                    self.data.batteryAutonomy, METRIC_SYSTEM.length_unit
-                )
-            )
-        return self.data.batteryAutonomy
+        return self.snapshot.battery_autonomy
 
     @property
     def icon(self) -> str:
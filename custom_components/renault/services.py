@@ -1,60 +1,170 @@
 """Support for Renault services."""
+import asyncio
+from datetime import timedelta
 import logging
-from typing import Any, Dict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
+import aiohttp
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.typing import HomeAssistantType
+from homeassistant.util import dt as dt_util
 from renault_api.kamereon.exceptions import KamereonResponseException
 import voluptuous as vol
 
 from .const import DOMAIN, REGEX_VIN
+from .renault_cassette import async_start_recorder
+from .renault_commands import CommandSupersededError
 from .renault_hub import RenaultHub
+from .renault_locations import (
+    EXPORT_GEOJSON,
+    EXPORT_GPX,
+    export_geojson,
+    export_gpx,
+)
+from .renault_profiler import async_start_profiler, async_stop_profiler
+from .renault_schedules import SCHEDULE_UPDATE_SCHEMA
 from .renault_vehicle import RenaultVehicleProxy
 
 _LOGGER = logging.getLogger(__name__)
 
 RENAULT_SERVICES = "renault_services"
+RENAULT_VEHICLES = "renault_vehicles"
+
+MAX_CONCURRENT_COMMANDS = 5
+
+DEFAULT_PROFILE_DURATION = timedelta(seconds=60)
+MAX_PROFILE_DURATION = timedelta(minutes=30)
+DEFAULT_RECORD_DURATION = timedelta(hours=1)
+MAX_RECORD_DURATION = timedelta(days=1)
+
+EVENT_METRICS = "renault_metrics"
+EVENT_SERVICE_RESULT = "renault_service_result"
+
+ATTR_CONFIRMED = "confirmed"
+ATTR_ERROR = "error"
+ATTR_LATENCY = "latency"
+ATTR_METRICS = "metrics"
+ATTR_SERVICE = "service"
+ATTR_SUCCESS = "success"
+ATTR_SUPERSEDED = "superseded"
+ATTR_VIN = "vin"
 
+SCHEMA_ACCOUNT = "account"
 SCHEMA_CHARGE_MODE = "charge_mode"
+SCHEMA_CONFIRM_TIMEOUT = "confirm_timeout"
+SCHEMA_DURATION = "duration"
+SCHEMA_END = "end"
+SCHEMA_FORMAT = "format"
+SCHEMA_RELOAD = "reload"
 SCHEMA_SCHEDULES = "schedules"
+SCHEMA_START = "start"
 SCHEMA_TEMPERATURE = "temperature"
 SCHEMA_VIN = "vin"
 SCHEMA_WHEN = "when"
 
+# there was some confusion in earlier release regarding upper or lower case of vin
+# so forcing to upper manually for the custom-component
+VIN_VALIDATOR = vol.All(cv.matches_regex(REGEX_VIN), vol.Upper)
+
+# Services target a single VIN, a list of VINs or all vehicles of an account.
+SERVICE_VEHICLES_SCHEMA = {
+    vol.Exclusive(SCHEMA_VIN, "vehicles"): vol.All(cv.ensure_list, [VIN_VALIDATOR]),
+    vol.Exclusive(SCHEMA_ACCOUNT, "vehicles"): cv.string,
+}
+
+# Services can wait until the vehicle data confirms the command.
+SERVICE_CONFIRM_SCHEMA = {
+    vol.Optional(SCHEMA_CONFIRM_TIMEOUT): vol.All(
+        cv.time_period, cv.positive_timedelta
+    ),
+}
+
+
+def _vehicles_schema(schema: Dict[Any, Any]) -> vol.All:
+    """Extend a service schema with the vehicle selection fields."""
+    return vol.All(
+        vol.Schema({**SERVICE_VEHICLES_SCHEMA, **schema}),
+        cv.has_at_least_one_key(SCHEMA_VIN, SCHEMA_ACCOUNT),
+    )
+
+
 SERVICE_AC_CANCEL = "ac_cancel"
-SERVICE_AC_CANCEL_SCHEMA = vol.Schema(
-    {
-        vol.Required(SCHEMA_VIN): cv.matches_regex(REGEX_VIN),
-    }
-)
+SERVICE_AC_CANCEL_SCHEMA = _vehicles_schema(SERVICE_CONFIRM_SCHEMA)
 SERVICE_AC_START = "ac_start"
-SERVICE_AC_START_SCHEMA = vol.Schema(
+SERVICE_AC_START_SCHEMA = _vehicles_schema(
     {
-        vol.Required(SCHEMA_VIN): cv.matches_regex(REGEX_VIN),
+        **SERVICE_CONFIRM_SCHEMA,
         vol.Optional(SCHEMA_WHEN): cv.datetime,
         vol.Optional(SCHEMA_TEMPERATURE): cv.positive_int,
     }
 )
 SERVICE_CHARGE_SET_MODE = "charge_set_mode"
-SERVICE_CHARGE_SET_MODE_SCHEMA = vol.Schema(
+SERVICE_CHARGE_SET_MODE_SCHEMA = _vehicles_schema(
     {
-        vol.Required(SCHEMA_VIN): cv.matches_regex(REGEX_VIN),
+        **SERVICE_CONFIRM_SCHEMA,
         vol.Required(SCHEMA_CHARGE_MODE): cv.string,
     }
 )
 SERVICE_CHARGE_SET_SCHEDULES = "charge_set_schedules"
-SERVICE_CHARGE_SET_SCHEDULES_SCHEMA = vol.Schema(
+SERVICE_CHARGE_SET_SCHEDULES_SCHEMA = _vehicles_schema(
     {
-        vol.Required(SCHEMA_VIN): cv.matches_regex(REGEX_VIN),
-        vol.Required(SCHEMA_SCHEDULES): dict,
+        vol.Required(SCHEMA_SCHEDULES): SCHEDULE_UPDATE_SCHEMA,
     }
 )
 SERVICE_CHARGE_START = "charge_start"
-SERVICE_CHARGE_START_SCHEMA = vol.Schema(
+SERVICE_CHARGE_START_SCHEMA = _vehicles_schema(SERVICE_CONFIRM_SCHEMA)
+SERVICE_DUMP_METRICS = "dump_metrics"
+SERVICE_DUMP_METRICS_SCHEMA = _vehicles_schema({})
+SERVICE_EXPORT_LOCATION_HISTORY = "export_location_history"
+SERVICE_EXPORT_LOCATION_HISTORY_SCHEMA = _vehicles_schema(
+    {
+        vol.Optional(SCHEMA_FORMAT, default=EXPORT_GPX): vol.In(
+            [EXPORT_GPX, EXPORT_GEOJSON]
+        ),
+        vol.Optional(SCHEMA_START): cv.datetime,
+        vol.Optional(SCHEMA_END): cv.datetime,
+    }
+)
+SERVICE_PROFILE = "profile"
+SERVICE_PROFILE_SCHEMA = vol.Schema(
     {
-        vol.Required(SCHEMA_VIN): cv.matches_regex(REGEX_VIN),
+        vol.Optional(SCHEMA_DURATION, default=DEFAULT_PROFILE_DURATION): vol.All(
+            cv.time_period,
+            cv.positive_timedelta,
+            vol.Range(max=MAX_PROFILE_DURATION),
+        ),
     }
 )
+SERVICE_RECORD_CASSETTE = "record_cassette"
+SERVICE_RECORD_CASSETTE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(SCHEMA_DURATION, default=DEFAULT_RECORD_DURATION): vol.All(
+            cv.time_period,
+            cv.positive_timedelta,
+            vol.Range(max=MAX_RECORD_DURATION),
+        ),
+        vol.Optional(SCHEMA_RELOAD, default=False): cv.boolean,
+    }
+)
+
+
+def _outcome(event_data: Dict[str, Any]) -> str:
+    """Return the outcome of a command, for metrics."""
+    if event_data.get(ATTR_SUPERSEDED):
+        return "superseded"
+    if not event_data[ATTR_SUCCESS]:
+        return "error"
+    if ATTR_CONFIRMED in event_data:
+        return "confirmed" if event_data[ATTR_CONFIRMED] else "unconfirmed"
+    return "success"
+
+
+def _write_file(path: str, content: str) -> None:
+    """Write a text file."""
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(content)
 
 
 async def async_setup_services(hass: HomeAssistantType) -> None:
@@ -71,83 +181,212 @@ async def async_setup_services(hass: HomeAssistantType) -> None:
         service_call_data: Dict[str, Any] = service_call.data
         when = service_call_data.get(SCHEMA_WHEN, None)
         temperature = service_call_data.get(SCHEMA_TEMPERATURE, 21)
-        vehicle = get_vehicle(service_call_data)
         _LOGGER.debug("A/C start attempt: %s / %s", when, temperature)
-        try:
+
+        async def send(vehicle: RenaultVehicleProxy) -> Any:
             result = await vehicle.send_ac_start(temperature=temperature, when=when)
-        except KamereonResponseException as err:
-            _LOGGER.error("A/C start failed: %s", err)
-        else:
-            _LOGGER.info("A/C start result: %s", result.raw_data)
+            return result.raw_data
+
+        # A scheduled start cannot be confirmed until it is due.
+        await run_for_vehicles(
+            service_call,
+            "A/C start",
+            send,
+            None
+            if when is not None
+            else ("hvac_status", lambda snapshot: snapshot.hvac_status == "on"),
+        )
 
     async def ac_cancel(service_call) -> None:
         """Cancel A/C."""
-        service_call_data: Dict[str, Any] = service_call.data
-        vehicle = get_vehicle(service_call_data)
         _LOGGER.debug("A/C cancel attempt.")
-        try:
-            result = await vehicle.send_cancel_ac()
-        except KamereonResponseException as err:
-            _LOGGER.error("A/C cancel failed: %s", err)
-        else:
-            _LOGGER.info("A/C cancel result: %s", result)
+
+        async def send(vehicle: RenaultVehicleProxy) -> Any:
+            return await vehicle.send_cancel_ac()
+
+        await run_for_vehicles(
+            service_call,
+            "A/C cancel",
+            send,
+            ("hvac_status", lambda snapshot: snapshot.hvac_status == "off"),
+        )
 
     async def charge_set_mode(service_call) -> None:
         """Set charge mode."""
         service_call_data: Dict[str, Any] = service_call.data
         charge_mode: str = service_call_data[SCHEMA_CHARGE_MODE]
-        vehicle = get_vehicle(service_call_data)
         _LOGGER.debug("Charge set mode attempt: %s", charge_mode)
-        try:
+
+        async def send(vehicle: RenaultVehicleProxy) -> Any:
             # there was some confusion in earlier release regarding upper or lower case of charge-mode
             # so forcing to lower manually for the custom-component (always or always_charging or schedule_mode)
-            result = await vehicle.send_set_charge_mode(charge_mode.lower())
-        except KamereonResponseException as err:
-            _LOGGER.error("Charge set mode failed: %s", err)
-        else:
-            _LOGGER.info("Charge set mode result: %s", result)
+            return await vehicle.send_set_charge_mode(charge_mode.lower())
+
+        await run_for_vehicles(
+            service_call,
+            "Charge set mode",
+            send,
+            (
+                "charge_mode",
+                lambda snapshot: snapshot.charge_mode == charge_mode.lower(),
+            ),
+        )
 
     async def charge_start(service_call) -> None:
         """Start charge."""
-        service_call_data: Dict[str, Any] = service_call.data
-        vehicle = get_vehicle(service_call_data)
         _LOGGER.debug("Charge start attempt.")
-        try:
-            result = await vehicle.send_charge_start()
-        except KamereonResponseException as err:
-            _LOGGER.error("Charge start failed: %s", err)
-        else:
-            _LOGGER.info("Charge start result: %s", result)
+
+        async def send(vehicle: RenaultVehicleProxy) -> Any:
+            return await vehicle.send_charge_start()
+
+        await run_for_vehicles(
+            service_call,
+            "Charge start",
+            send,
+            ("battery", lambda snapshot: snapshot.charging),
+        )
 
     async def charge_set_schedules(service_call) -> None:
         """Set charge schedules."""
         service_call_data: Dict[str, Any] = service_call.data
         schedules = service_call_data.get(SCHEMA_SCHEDULES)
-        vehicle = get_vehicle(service_call_data)
-        charge_schedules = await vehicle.get_charging_settings()
-        charge_schedules.update(schedules)
-        try:
-            _LOGGER.debug("Charge set schedules attempt: %s", schedules)
-            result = await vehicle.send_set_charge_schedules(charge_schedules)
-        except KamereonResponseException as err:
-            _LOGGER.error("Charge set schedules failed: %s", err)
-        else:
-            _LOGGER.info("Charge set schedules result: %s", result)
+        _LOGGER.debug("Charge set schedules attempt: %s", schedules)
+
+        async def send(vehicle: RenaultVehicleProxy) -> Any:
+            result = await vehicle.send_charge_schedule_update(schedules)
+            if result is None:
+                return "unchanged"
+            return result.raw_data
+
+        if await run_for_vehicles(service_call, "Charge set schedules", send):
             _LOGGER.info(
                 "It may take some time before these changes are reflected in your vehicle."
             )
 
-    def get_vehicle(service_call_data: Dict[str, Any]) -> RenaultVehicleProxy:
-        """Get vehicle from service_call data."""
-        vin: str = service_call_data[SCHEMA_VIN]
-        proxy: RenaultHub
-        for proxy in hass.data[DOMAIN].values():
-            # there was some confusion in earlier release regarding upper or lower case of vin
-            # so forcing to upper manually for the custom-component
-            vehicle = proxy.vehicles.get(vin.upper())
-            if vehicle is not None:
-                return vehicle
-        raise ValueError(f"Unable to find vehicle with VIN: {vin}")
+    async def dump_metrics(service_call) -> None:
+        """Fire an event with the request metrics of each vehicle."""
+        for vehicle in get_vehicles(service_call.data):
+            vin = vehicle.details.vin
+            metrics = vehicle.metrics.as_dict()
+            _LOGGER.info("Request metrics for %s: %s", vin, metrics)
+            hass.bus.async_fire(EVENT_METRICS, {ATTR_VIN: vin, ATTR_METRICS: metrics})
+
+    async def export_location_history(service_call) -> None:
+        """Export location history to the configuration directory."""
+        service_call_data: Dict[str, Any] = service_call.data
+        export_format: str = service_call_data[SCHEMA_FORMAT]
+        start = service_call_data.get(SCHEMA_START)
+        end = service_call_data.get(SCHEMA_END)
+        export = export_gpx if export_format == EXPORT_GPX else export_geojson
+
+        for vehicle in get_vehicles(service_call_data):
+            vin = vehicle.details.vin
+            points = list(
+                vehicle.location_history.history.points(
+                    dt_util.as_utc(start).timestamp() if start else None,
+                    dt_util.as_utc(end).timestamp() if end else None,
+                )
+            )
+            path = hass.config.path(f"renault_{vin.lower()}_locations.{export_format}")
+            await hass.async_add_executor_job(_write_file, path, export(vin, points))
+            _LOGGER.info("Exported %s locations for %s to %s", len(points), vin, path)
+
+    async def profile(service_call) -> None:
+        """Profile the integration for a bounded duration."""
+        async_start_profiler(
+            hass,
+            service_call.data[SCHEMA_DURATION],
+            excluded_services=[SERVICE_PROFILE],
+        )
+
+    async def record_cassette(service_call) -> None:
+        """Record the exchanges with the Renault servers for a bounded duration."""
+        async_start_recorder(hass, service_call.data[SCHEMA_DURATION])
+        if service_call.data[SCHEMA_RELOAD]:
+            # Reloading records the setup exchanges, needed to replay the cassette.
+            for config_entry in hass.config_entries.async_entries(DOMAIN):
+                await hass.config_entries.async_reload(config_entry.entry_id)
+
+    async def run_for_vehicles(
+        service_call,
+        description: str,
+        send: Callable[[RenaultVehicleProxy], Awaitable[Any]],
+        confirmation: Optional[Tuple[str, Callable[[Any], bool]]] = None,
+    ) -> bool:
+        """Run a command on the targeted vehicles, with limited concurrency.
+
+        A result event is fired for each vehicle, flagged as superseded if a
+        newer command was sent instead. If a confirmation timeout was
+        requested, the event is only fired once the coordinator data (key,
+        predicate) confirms the command, or the timeout expires.
+        Returns True if the command succeeded on at least one vehicle.
+        """
+        vehicles = get_vehicles(service_call.data)
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_COMMANDS)
+        confirm_timeout: Optional[timedelta] = service_call.data.get(
+            SCHEMA_CONFIRM_TIMEOUT
+        )
+
+        async def run(vehicle: RenaultVehicleProxy) -> bool:
+            vin = vehicle.details.vin
+            event_data = {ATTR_SERVICE: service_call.service, ATTR_VIN: vin}
+            async with semaphore:
+                started = hass.loop.time()
+                try:
+                    result = await send(vehicle)
+                except CommandSupersededError as err:
+                    # A newer command was sent instead, there is nothing to confirm.
+                    _LOGGER.info("%s not sent to %s: %s", description, vin, err)
+                    event_data[ATTR_SUCCESS] = False
+                    event_data[ATTR_SUPERSEDED] = True
+                except (
+                    KamereonResponseException,
+                    aiohttp.ClientError,
+                    asyncio.TimeoutError,
+                ) as err:
+                    # Timeouts have no message, report their type instead.
+                    error = str(err) or type(err).__name__
+                    _LOGGER.error("%s failed for %s: %s", description, vin, error)
+                    event_data[ATTR_SUCCESS] = False
+                    event_data[ATTR_ERROR] = error
+                else:
+                    _LOGGER.info("%s result for %s: %s", description, vin, result)
+                    event_data[ATTR_SUCCESS] = True
+            if (
+                event_data[ATTR_SUCCESS]
+                and confirm_timeout is not None
+                and confirmation is not None
+            ):
+                confirmed = await vehicle.async_wait_for_state(
+                    *confirmation, confirm_timeout
+                )
+                _LOGGER.info("%s confirmed for %s: %s", description, vin, confirmed)
+                event_data[ATTR_CONFIRMED] = confirmed
+                event_data[ATTR_LATENCY] = round(hass.loop.time() - started, 1)
+            vehicle.metrics.record_command(service_call.service, _outcome(event_data))
+            hass.bus.async_fire(EVENT_SERVICE_RESULT, event_data)
+            return event_data[ATTR_SUCCESS]
+
+        results = await asyncio.gather(*(run(vehicle) for vehicle in vehicles))
+        return any(results)
+
+    def get_vehicles(service_call_data: Dict[str, Any]) -> List[RenaultVehicleProxy]:
+        """Get vehicles from service_call data."""
+        if SCHEMA_ACCOUNT in service_call_data:
+            account: str = service_call_data[SCHEMA_ACCOUNT]
+            renault_hub: Optional[RenaultHub] = hass.data[DOMAIN].get(account)
+            if renault_hub is None:
+                raise HomeAssistantError(f"Unable to find account: {account}")
+            return list(renault_hub.vehicles.values())
+
+        vehicles: Dict[str, RenaultVehicleProxy] = hass.data.get(RENAULT_VEHICLES, {})
+        result = []
+        for vin in dict.fromkeys(service_call_data[SCHEMA_VIN]):
+            vehicle = vehicles.get(vin)
+            if vehicle is None:
+                raise HomeAssistantError(f"Unable to find vehicle with VIN: {vin}")
+            result.append(vehicle)
+        return result
 
     hass.services.async_register(
         DOMAIN,
@@ -179,6 +418,58 @@ async def async_setup_services(hass: HomeAssistantType) -> None:
         charge_set_schedules,
         schema=SERVICE_CHARGE_SET_SCHEDULES_SCHEMA,
     )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DUMP_METRICS,
+        dump_metrics,
+        schema=SERVICE_DUMP_METRICS_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_LOCATION_HISTORY,
+        export_location_history,
+        schema=SERVICE_EXPORT_LOCATION_HISTORY_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        profile,
+        schema=SERVICE_PROFILE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RECORD_CASSETTE,
+        record_cassette,
+        schema=SERVICE_RECORD_CASSETTE_SCHEMA,
+    )
+
+
+@callback
+def async_register_vehicles(hass: HomeAssistantType, renault_hub: RenaultHub) -> None:
+    """Add the hub vehicles to the VIN index used for service dispatch."""
+    vehicles: Dict[str, RenaultVehicleProxy] = hass.data.setdefault(
+        RENAULT_VEHICLES, {}
+    )
+    for vin, vehicle in renault_hub.vehicles.items():
+        vehicles[vin.upper()] = vehicle
+
+
+@callback
+def async_unregister_vehicles(hass: HomeAssistantType, renault_hub: RenaultHub) -> None:
+    """Remove the hub vehicles from the VIN index used for service dispatch.
+
+    A VIN may also be exposed by another account: the index then points to
+    the vehicle of a remaining account instead.
+    """
+    vehicles: Dict[str, RenaultVehicleProxy] = hass.data.get(RENAULT_VEHICLES, {})
+    for vin, vehicle in renault_hub.vehicles.items():
+        if vehicles.get(vin.upper()) is not vehicle:
+            continue
+        del vehicles[vin.upper()]
+        for other_hub in hass.data.get(DOMAIN, {}).values():
+            if other_hub is not renault_hub and vin in other_hub.vehicles:
+                vehicles[vin.upper()] = other_hub.vehicles[vin]
+                break
 
 
 async def async_unload_services(hass: HomeAssistantType) -> None:
@@ -188,8 +479,14 @@ async def async_unload_services(hass: HomeAssistantType) -> None:
 
     hass.data[RENAULT_SERVICES] = False
 
+    await async_stop_profiler(hass)
+
     hass.services.async_remove(DOMAIN, SERVICE_AC_CANCEL)
     hass.services.async_remove(DOMAIN, SERVICE_AC_START)
     hass.services.async_remove(DOMAIN, SERVICE_CHARGE_SET_MODE)
     hass.services.async_remove(DOMAIN, SERVICE_CHARGE_SET_SCHEDULES)
     hass.services.async_remove(DOMAIN, SERVICE_CHARGE_START)
+    hass.services.async_remove(DOMAIN, SERVICE_DUMP_METRICS)
+    hass.services.async_remove(DOMAIN, SERVICE_EXPORT_LOCATION_HISTORY)
+    hass.services.async_remove(DOMAIN, SERVICE_PROFILE)
+    hass.services.async_remove(DOMAIN, SERVICE_RECORD_CASSETTE)
@@ -1,5 +1,6 @@
 """Tests for the Renault integration."""
 from datetime import timedelta
+from typing import Any, Dict, Optional
 from unittest.mock import patch
 
 from homeassistant.config_entries import CONN_CLASS_CLOUD_POLL
@@ -20,7 +21,9 @@ from custom_components.renault.renault_vehicle import RenaultVehicleProxy
 from .const import MOCK_VEHICLES
 
 
-async def setup_renault_integration(hass: HomeAssistant):
+async def setup_renault_integration(
+    hass: HomeAssistant, options: Optional[Dict[str, Any]] = None
+):
     """Create the Renault integration."""
     config_entry = MockConfigEntry(
         domain=DOMAIN,
@@ -33,7 +36,7 @@ async def setup_renault_integration(hass: HomeAssistant):
         },
         unique_id="account_id_2",
         connection_class=CONN_CLASS_CLOUD_POLL,
-        options={},
+        options=options or {},
         entry_id="1",
     )
     config_entry.add_to_hass(hass)
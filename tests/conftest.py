@@ -31,3 +31,12 @@ def skip_notifications_fixture():
         "homeassistant.components.persistent_notification.async_dismiss"
     ):
         yield
+
+
+# This fixture keeps the files written by the integration, such as the battery telemetry,
+# out of the shared testing configuration directory.
+@pytest.fixture(name="storage_dir", autouse=True)
+def storage_dir_fixture(tmp_path):
+    """Write integration files to a temporary directory."""
+    with patch("custom_components.renault.renault_storage.STORAGE_DIR", str(tmp_path)):
+        yield tmp_path
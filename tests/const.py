@@ -12,6 +12,8 @@ from homeassistant.const import (
     DEVICE_CLASS_BATTERY,
     DEVICE_CLASS_ENERGY,
     DEVICE_CLASS_TEMPERATURE,
+    DEVICE_CLASS_TIMESTAMP,
+    ENERGY_KILO_WATT_HOUR,
     LENGTH_KILOMETERS,
     PERCENTAGE,
     POWER_KILO_WATT,
@@ -20,6 +22,8 @@ from homeassistant.const import (
     STATE_ON,
     STATE_UNKNOWN,
     TEMP_CELSIUS,
+    TIME_HOURS,
+    TIME_MILLISECONDS,
     TIME_MINUTES,
     VOLUME_LITERS,
 )
@@ -50,7 +54,7 @@ MOCK_VEHICLES = {
             "name": "REG-NUMBER",
             "sw_version": "X101VE",
         },
-        "endpoints_available": [True, True, True, True, False],
+        "endpoints_available": [True, True, True, True, False, True, True, True],
         "endpoints": {
             "cockpit": "cockpit_ev.json",
             "hvac_status": "hvac_status.json",
@@ -58,6 +62,30 @@ MOCK_VEHICLES = {
             "charge_mode": "charge_mode.json",
         },
         SENSOR_DOMAIN: [
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_cockpit_latency",
+                "unique_id": "vf1aaaaa555777999_cockpit_latency",
+                "unit": TIME_MILLISECONDS,
+                "disabled": True,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_hvac_status_latency",
+                "unique_id": "vf1aaaaa555777999_hvac_status_latency",
+                "unit": TIME_MILLISECONDS,
+                "disabled": True,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_battery_latency",
+                "unique_id": "vf1aaaaa555777999_battery_latency",
+                "unit": TIME_MILLISECONDS,
+                "disabled": True,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_charge_mode_latency",
+                "unique_id": "vf1aaaaa555777999_charge_mode_latency",
+                "unit": TIME_MILLISECONDS,
+                "disabled": True,
+            },
             {
                 "entity_id": "sensor.vf1aaaaa555777999_battery_autonomy",
                 "unique_id": "vf1aaaaa555777999_battery_autonomy",
@@ -90,6 +118,13 @@ MOCK_VEHICLES = {
                 "result": "charge_in_progress",
                 "class": DEVICE_CLASS_CHARGE_STATE,
             },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_charged_energy",
+                "unique_id": "vf1aaaaa555777999_charged_energy",
+                "result": "0.0",
+                "unit": ENERGY_KILO_WATT_HOUR,
+                "class": DEVICE_CLASS_ENERGY,
+            },
             {
                 "entity_id": "sensor.vf1aaaaa555777999_charging_power",
                 "unique_id": "vf1aaaaa555777999_charging_power",
@@ -103,6 +138,37 @@ MOCK_VEHICLES = {
                 "result": "145",
                 "unit": TIME_MINUTES,
             },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_charging_session_energy",
+                "unique_id": "vf1aaaaa555777999_charging_session_energy",
+                "result": "0.0",
+                "unit": ENERGY_KILO_WATT_HOUR,
+                "class": DEVICE_CLASS_ENERGY,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_battery_level_rate",
+                "unique_id": "vf1aaaaa555777999_battery_level_rate",
+                "result": STATE_UNKNOWN,
+                "unit": f"{PERCENTAGE}/{TIME_HOURS}",
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_charge_end",
+                "unique_id": "vf1aaaaa555777999_charge_end",
+                "result": STATE_UNKNOWN,
+                "class": DEVICE_CLASS_TIMESTAMP,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_charging_rate",
+                "unique_id": "vf1aaaaa555777999_charging_rate",
+                "result": STATE_UNKNOWN,
+                "unit": f"{ENERGY_KILO_WATT_HOUR}/{TIME_HOURS}",
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_range_gain_rate",
+                "unique_id": "vf1aaaaa555777999_range_gain_rate",
+                "result": STATE_UNKNOWN,
+                "unit": f"{LENGTH_KILOMETERS}/{TIME_HOURS}",
+            },
             {
                 "entity_id": "sensor.vf1aaaaa555777999_mileage",
                 "unique_id": "vf1aaaaa555777999_mileage",
@@ -122,6 +188,21 @@ MOCK_VEHICLES = {
                 "result": "plugged",
                 "class": DEVICE_CLASS_PLUG_STATE,
             },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_charge_schedules",
+                "unique_id": "vf1aaaaa555777999_charge_schedules",
+                "disabled": True,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_hvac_schedules",
+                "unique_id": "vf1aaaaa555777999_hvac_schedules",
+                "disabled": True,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_monthly_charges",
+                "unique_id": "vf1aaaaa555777999_monthly_charges",
+                "disabled": True,
+            },
         ],
         BINARY_SENSOR_DOMAIN: [
             {
@@ -147,7 +228,7 @@ MOCK_VEHICLES = {
             "name": "REG-NUMBER",
             "sw_version": "X102VE",
         },
-        "endpoints_available": [True, False, True, True, True],
+        "endpoints_available": [True, False, True, True, True, True, True, True],
         "endpoints": {
             "cockpit": "cockpit_ev.json",
             "battery_status": "battery_status_not_charging.json",
@@ -155,6 +236,30 @@ MOCK_VEHICLES = {
             "location": "location.json",
         },
         SENSOR_DOMAIN: [
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_cockpit_latency",
+                "unique_id": "vf1aaaaa555777999_cockpit_latency",
+                "unit": TIME_MILLISECONDS,
+                "disabled": True,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_battery_latency",
+                "unique_id": "vf1aaaaa555777999_battery_latency",
+                "unit": TIME_MILLISECONDS,
+                "disabled": True,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_charge_mode_latency",
+                "unique_id": "vf1aaaaa555777999_charge_mode_latency",
+                "unit": TIME_MILLISECONDS,
+                "disabled": True,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_location_latency",
+                "unique_id": "vf1aaaaa555777999_location_latency",
+                "unit": TIME_MILLISECONDS,
+                "disabled": True,
+            },
             {
                 "entity_id": "sensor.vf1aaaaa555777999_battery_autonomy",
                 "unique_id": "vf1aaaaa555777999_battery_autonomy",
@@ -187,6 +292,13 @@ MOCK_VEHICLES = {
                 "result": "charge_error",
                 "class": DEVICE_CLASS_CHARGE_STATE,
             },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_charged_energy",
+                "unique_id": "vf1aaaaa555777999_charged_energy",
+                "result": "0.0",
+                "unit": ENERGY_KILO_WATT_HOUR,
+                "class": DEVICE_CLASS_ENERGY,
+            },
             {
                 "entity_id": "sensor.vf1aaaaa555777999_charging_power",
                 "unique_id": "vf1aaaaa555777999_charging_power",
@@ -200,6 +312,37 @@ MOCK_VEHICLES = {
                 "result": STATE_UNKNOWN,
                 "unit": TIME_MINUTES,
             },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_charging_session_energy",
+                "unique_id": "vf1aaaaa555777999_charging_session_energy",
+                "result": "0.0",
+                "unit": ENERGY_KILO_WATT_HOUR,
+                "class": DEVICE_CLASS_ENERGY,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_battery_level_rate",
+                "unique_id": "vf1aaaaa555777999_battery_level_rate",
+                "result": STATE_UNKNOWN,
+                "unit": f"{PERCENTAGE}/{TIME_HOURS}",
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_charge_end",
+                "unique_id": "vf1aaaaa555777999_charge_end",
+                "result": STATE_UNKNOWN,
+                "class": DEVICE_CLASS_TIMESTAMP,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_charging_rate",
+                "unique_id": "vf1aaaaa555777999_charging_rate",
+                "result": STATE_UNKNOWN,
+                "unit": f"{ENERGY_KILO_WATT_HOUR}/{TIME_HOURS}",
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_range_gain_rate",
+                "unique_id": "vf1aaaaa555777999_range_gain_rate",
+                "result": STATE_UNKNOWN,
+                "unit": f"{LENGTH_KILOMETERS}/{TIME_HOURS}",
+            },
             {
                 "entity_id": "sensor.vf1aaaaa555777999_mileage",
                 "unique_id": "vf1aaaaa555777999_mileage",
@@ -212,6 +355,21 @@ MOCK_VEHICLES = {
                 "result": "unplugged",
                 "class": DEVICE_CLASS_PLUG_STATE,
             },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_charge_schedules",
+                "unique_id": "vf1aaaaa555777999_charge_schedules",
+                "disabled": True,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_hvac_schedules",
+                "unique_id": "vf1aaaaa555777999_hvac_schedules",
+                "disabled": True,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777999_monthly_charges",
+                "unique_id": "vf1aaaaa555777999_monthly_charges",
+                "disabled": True,
+            },
         ],
         BINARY_SENSOR_DOMAIN: [
             {
@@ -243,7 +401,7 @@ MOCK_VEHICLES = {
             "name": "REG-NUMBER",
             "sw_version": "XJB1SU",
         },
-        "endpoints_available": [True, False, True, True, True],
+        "endpoints_available": [True, False, True, True, True, True, True, True],
         "endpoints": {
             "cockpit": "cockpit_fuel.json",
             "battery_status": "battery_status_charging.json",
@@ -251,6 +409,30 @@ MOCK_VEHICLES = {
             "location": "location.json",
         },
         SENSOR_DOMAIN: [
+            {
+                "entity_id": "sensor.vf1aaaaa555777123_cockpit_latency",
+                "unique_id": "vf1aaaaa555777123_cockpit_latency",
+                "unit": TIME_MILLISECONDS,
+                "disabled": True,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777123_battery_latency",
+                "unique_id": "vf1aaaaa555777123_battery_latency",
+                "unit": TIME_MILLISECONDS,
+                "disabled": True,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777123_charge_mode_latency",
+                "unique_id": "vf1aaaaa555777123_charge_mode_latency",
+                "unit": TIME_MILLISECONDS,
+                "disabled": True,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777123_location_latency",
+                "unique_id": "vf1aaaaa555777123_location_latency",
+                "unit": TIME_MILLISECONDS,
+                "disabled": True,
+            },
             {
                 "entity_id": "sensor.vf1aaaaa555777123_battery_autonomy",
                 "unique_id": "vf1aaaaa555777123_battery_autonomy",
@@ -283,6 +465,13 @@ MOCK_VEHICLES = {
                 "result": "charge_in_progress",
                 "class": DEVICE_CLASS_CHARGE_STATE,
             },
+            {
+                "entity_id": "sensor.vf1aaaaa555777123_charged_energy",
+                "unique_id": "vf1aaaaa555777123_charged_energy",
+                "result": "0.0",
+                "unit": ENERGY_KILO_WATT_HOUR,
+                "class": DEVICE_CLASS_ENERGY,
+            },
             {
                 "entity_id": "sensor.vf1aaaaa555777123_charging_power",
                 "unique_id": "vf1aaaaa555777123_charging_power",
@@ -296,6 +485,37 @@ MOCK_VEHICLES = {
                 "result": "145",
                 "unit": TIME_MINUTES,
             },
+            {
+                "entity_id": "sensor.vf1aaaaa555777123_charging_session_energy",
+                "unique_id": "vf1aaaaa555777123_charging_session_energy",
+                "result": "0.0",
+                "unit": ENERGY_KILO_WATT_HOUR,
+                "class": DEVICE_CLASS_ENERGY,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777123_battery_level_rate",
+                "unique_id": "vf1aaaaa555777123_battery_level_rate",
+                "result": STATE_UNKNOWN,
+                "unit": f"{PERCENTAGE}/{TIME_HOURS}",
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777123_charge_end",
+                "unique_id": "vf1aaaaa555777123_charge_end",
+                "result": STATE_UNKNOWN,
+                "class": DEVICE_CLASS_TIMESTAMP,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777123_charging_rate",
+                "unique_id": "vf1aaaaa555777123_charging_rate",
+                "result": STATE_UNKNOWN,
+                "unit": f"{ENERGY_KILO_WATT_HOUR}/{TIME_HOURS}",
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777123_range_gain_rate",
+                "unique_id": "vf1aaaaa555777123_range_gain_rate",
+                "result": STATE_UNKNOWN,
+                "unit": f"{LENGTH_KILOMETERS}/{TIME_HOURS}",
+            },
             {
                 "entity_id": "sensor.vf1aaaaa555777123_fuel_autonomy",
                 "unique_id": "vf1aaaaa555777123_fuel_autonomy",
@@ -320,6 +540,21 @@ MOCK_VEHICLES = {
                 "result": "plugged",
                 "class": DEVICE_CLASS_PLUG_STATE,
             },
+            {
+                "entity_id": "sensor.vf1aaaaa555777123_charge_schedules",
+                "unique_id": "vf1aaaaa555777123_charge_schedules",
+                "disabled": True,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777123_hvac_schedules",
+                "unique_id": "vf1aaaaa555777123_hvac_schedules",
+                "disabled": True,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777123_monthly_charges",
+                "unique_id": "vf1aaaaa555777123_monthly_charges",
+                "disabled": True,
+            },
         ],
         BINARY_SENSOR_DOMAIN: [
             {
@@ -357,6 +592,18 @@ MOCK_VEHICLES = {
             "location": "location.json",
         },
         SENSOR_DOMAIN: [
+            {
+                "entity_id": "sensor.vf1aaaaa555777123_cockpit_latency",
+                "unique_id": "vf1aaaaa555777123_cockpit_latency",
+                "unit": TIME_MILLISECONDS,
+                "disabled": True,
+            },
+            {
+                "entity_id": "sensor.vf1aaaaa555777123_location_latency",
+                "unique_id": "vf1aaaaa555777123_location_latency",
+                "unit": TIME_MILLISECONDS,
+                "disabled": True,
+            },
             {
                 "entity_id": "sensor.vf1aaaaa555777123_fuel_autonomy",
                 "unique_id": "vf1aaaaa555777123_fuel_autonomy",
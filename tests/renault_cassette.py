@@ -0,0 +1,181 @@
+"""Offline replay of the cassettes written by the record_cassette service."""
+import asyncio
+from collections import deque
+from datetime import timedelta
+import json
+import re
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from aiohttp import web
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.renault.renault_cassette import CASSETTE_VERSION
+
+from .renault_server import (
+    RenaultServer,
+    VirtualClock,
+    encode_jwt,
+    setup_renault_integration_with_server,
+)
+
+ACCOUNT_VEHICLES_PATH = re.compile(r"/commerce/v1/accounts/([^/]+)/vehicles$")
+VIN_PLACEHOLDER = re.compile(r"vin-(\d+)$")
+
+
+def _substitute(value: Any, substitute: Callable[[str], str]) -> Any:
+    """Return a copy of a JSON value, with its strings substituted."""
+    if isinstance(value, dict):
+        return {key: _substitute(item, substitute) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_substitute(item, substitute) for item in value]
+    if isinstance(value, str):
+        return substitute(value)
+    return value
+
+
+def load_cassette(path: str) -> Dict[str, Any]:
+    """Load a cassette file."""
+    with open(path, encoding="utf-8") as file:
+        cassette: Dict[str, Any] = json.load(file)
+    if cassette.get("version") != CASSETTE_VERSION:
+        raise ValueError(f"Unsupported cassette version in {path}")
+    return cassette
+
+
+class CassetteServer(RenaultServer):
+    """Serve the exchanges of a cassette, in the order they were recorded.
+
+    Each request gets the next recorded exchange with the same method and
+    path, after the recorded duration divided by the speed (at once if the
+    speed is None). Once the exchanges of a path are used up, the last one is
+    served again and the request is listed in unmatched. Tokens expire after
+    their recorded lifetime divided by the speed, and recorded client errors,
+    such as timeouts, close the connection.
+
+    The placeholders of the cassette (account-0, vin-0...) are served as
+    their value in substitutes. By default, VIN placeholders are served as
+    generated VINs, and the other placeholders as they are.
+    """
+
+    def __init__(
+        self,
+        cassette: Dict[str, Any],
+        *,
+        speed: Optional[float] = 1.0,
+        substitutes: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Initialise server."""
+        super().__init__([], **kwargs)
+        self.speed = speed
+        self.substitutes = dict(substitutes or {})
+        self.exchanges: Dict[Tuple[str, str, str], Deque[Dict[str, Any]]] = {}
+        for recorded in cassette["exchanges"]:
+            exchange = self._substitute_exchange(recorded)
+            key = (exchange["method"], exchange["service"], exchange["path"])
+            self.exchanges.setdefault(key, deque()).append(exchange)
+        # Seconds from the first request to the end of the last response.
+        self.duration: float = max(
+            (
+                exchange["time"] + exchange["duration"]
+                for exchange in cassette["exchanges"]
+            ),
+            default=0.0,
+        )
+        self.unmatched: List[Tuple[str, str]] = []
+        self._last: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+
+    def _substitute_value(self, value: str) -> str:
+        """Return the value served for a placeholder, or the value itself."""
+        if value not in self.substitutes:
+            match = VIN_PLACEHOLDER.match(value)
+            if match is None:
+                return value
+            self.substitutes[value] = f"VF1CASSETTE{int(match.group(1)):06d}"
+        return self.substitutes[value]
+
+    def _substitute_exchange(self, exchange: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a copy of a recorded exchange, with its placeholders substituted."""
+        exchange = dict(exchange)
+        exchange["path"] = "/".join(
+            self._substitute_value(segment) for segment in exchange["path"].split("/")
+        )
+        if "response" in exchange:
+            try:
+                body = json.loads(exchange["response"])
+            except ValueError:
+                pass
+            else:
+                exchange["response"] = json.dumps(
+                    _substitute(body, self._substitute_value)
+                )
+        return exchange
+
+    @property
+    def account_id(self) -> Optional[str]:
+        """Return the first account whose vehicles were requested."""
+        for _, service, path in self.exchanges:
+            match = ACCOUNT_VEHICLES_PATH.match(path)
+            if service == "kamereon" and match:
+                return match.group(1)
+        return None
+
+    def _add_routes(self, app: web.Application) -> None:
+        """Replay every Gigya and Kamereon path."""
+        app.router.add_route("*", "/{service}/{path:.*}", self._replay)
+
+    async def _replay(self, request: web.Request) -> web.StreamResponse:
+        """Serve the next recorded exchange of the request path."""
+        key = (
+            request.method,
+            request.match_info["service"],
+            f"/{request.match_info['path']}",
+        )
+        queue = self.exchanges.get(key)
+        if queue:
+            exchange = self._last[key] = queue.popleft()
+        else:
+            self.unmatched.append((request.method, request.path))
+            if key not in self._last:
+                raise web.HTTPNotFound()
+            exchange = self._last[key]
+        if self.speed:
+            await asyncio.sleep(exchange["duration"] / self.speed)
+        if "error" in exchange:
+            if request.transport is not None:
+                request.transport.close()
+            return web.Response()
+        text = exchange["response"]
+        if exchange.get("token_lifetime") is not None:
+            body = json.loads(text)
+            body["id_token"] = encode_jwt(
+                exchange["token_lifetime"] / (self.speed or 1)
+            )
+            text = json.dumps(body)
+        return web.Response(
+            text=text, status=exchange["status"], content_type="application/json"
+        )
+
+
+async def async_replay_cassette(
+    hass: HomeAssistant,
+    server: CassetteServer,
+    options: Optional[Dict[str, Any]] = None,
+) -> MockConfigEntry:
+    """Set up the integration against the server, then replay the cassette.
+
+    The integration runs in virtual time for the duration of the cassette,
+    so that its coordinators poll as they did while recording. Use the
+    options of the recorded config entry, such as the scan interval.
+    """
+    if server.account_id is None:
+        raise ValueError("The cassette has no setup requests, record it with reload")
+    with VirtualClock() as clock:
+        config_entry = await setup_renault_integration_with_server(
+            hass, server, options, account_id=server.account_id
+        )
+        await clock.async_advance(
+            hass, timedelta(seconds=server.duration), speed=server.speed
+        )
+    return config_entry
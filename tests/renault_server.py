@@ -0,0 +1,420 @@
+"""Local stand-in for the Gigya and Kamereon servers used by the Renault API."""
+import asyncio
+from collections import deque
+from datetime import datetime, timedelta
+from functools import partial
+import json
+import random
+import time
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from unittest.mock import patch
+
+from aiohttp import web
+from homeassistant.config_entries import CONN_CLASS_CLOUD_POLL
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+import jwt
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    load_fixture,
+)
+from renault_api.const import (
+    CONF_COUNTRY,
+    CONF_GIGYA_APIKEY,
+    CONF_GIGYA_URL,
+    CONF_KAMEREON_APIKEY,
+    CONF_KAMEREON_URL,
+)
+
+from custom_components.renault.const import (
+    CONF_KAMEREON_ACCOUNT_ID,
+    CONF_LOCALE,
+    DOMAIN,
+)
+from custom_components.renault.renault_hub import RenaultHub
+
+from .const import MOCK_VEHICLES
+
+ACCOUNT_ID = "account_id_2"
+PERSON_ID = "person-id-1"
+GIGYA_UID = "gigya-uid-1"
+LOGIN_TOKEN = "login-token"
+USERNAME = "email@test.com"
+PASSWORD = "test"
+
+# Data endpoints of electric vehicles, in addition to the MOCK_VEHICLES ones.
+EV_ENDPOINTS = {
+    "charge-history": "charge_history.json",
+    "charging-settings": "charging_settings.json",
+    "hvac-settings": "hvac_settings.json",
+}
+
+# Kamereon error codes of the injectable HTTP statuses.
+KAMEREON_ERRORS = {
+    401: ("err.func.401", "Invalid or expired JWT"),
+    403: ("err.func.403", "Access is denied for this resource"),
+    429: ("err.func.wired.overloaded", "You have reached your quota limit"),
+    500: ("err.tech.500", "Invalid response from the upstream server"),
+    501: ("err.tech.501", "This feature is not technically supported"),
+}
+
+
+def _kamereon_error(status: int) -> web.Response:
+    """Return a Kamereon error response."""
+    error_code, error_message = KAMEREON_ERRORS[status]
+    return web.json_response(
+        {"errors": [{"errorCode": error_code, "errorMessage": error_message}]},
+        status=status,
+    )
+
+
+def encode_jwt(lifetime: float) -> str:
+    """Return a JWT accepted by the server, valid for lifetime seconds."""
+    token = jwt.encode(
+        {"exp": int(time.time() + lifetime)}, "secret", algorithm="HS256"
+    )
+    if isinstance(token, bytes):
+        token = token.decode("utf-8")
+    return token
+
+
+class RenaultServer:
+    """Serve Gigya and Kamereon responses built from the test fixtures.
+
+    Vehicles are given by their MOCK_VEHICLES type. Latency, random errors,
+    error statuses by endpoint and rate limiting can be changed at any time,
+    and every request is recorded as (method, path).
+    """
+
+    def __init__(
+        self,
+        vehicle_types: List[str],
+        *,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: Optional[Tuple[int, float]] = None,
+        jwt_lifetime: int = 900,
+        seed: int = 0,
+    ) -> None:
+        """Initialise server."""
+        self.vehicles: Dict[str, Dict[str, Any]] = {}
+        for vehicle_type in vehicle_types:
+            self.add_vehicle(vehicle_type)
+        # Seconds added to each response.
+        self.latency = latency
+        # Share of Kamereon requests failing with an upstream error.
+        self.error_rate = error_rate
+        # At most (count, period in seconds) Kamereon requests, then quota errors.
+        self.rate_limit = rate_limit
+        self.jwt_lifetime = jwt_lifetime
+        # Password accepted by the Gigya login.
+        self.password = PASSWORD
+        # HTTP status (one of KAMEREON_ERRORS) returned by a Kamereon endpoint.
+        self.endpoint_errors: Dict[str, int] = {}
+        self.requests: List[Tuple[str, str]] = []
+        self.actions: List[Tuple[str, str, Dict[str, Any]]] = []
+        self._random = random.Random(seed)
+        self._recent: Deque[float] = deque()
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    def add_vehicle(self, vehicle_type: str, vin: Optional[str] = None) -> str:
+        """Add a vehicle of a MOCK_VEHICLES type, optionally with another VIN.
+
+        Returns the VIN of the vehicle.
+        """
+        vehicle_link = json.loads(load_fixture(f"vehicle_{vehicle_type}.json"))[
+            "vehicleLinks"
+        ][0]
+        if vin is not None:
+            vehicle_link["vin"] = vehicle_link["vehicleDetails"]["vin"] = vin
+        endpoints = {
+            key.replace("_", "-"): fixture
+            for key, fixture in MOCK_VEHICLES[vehicle_type]["endpoints"].items()
+        }
+        if "battery-status" in endpoints:
+            endpoints.update(EV_ENDPOINTS)
+        self.vehicles[vehicle_link["vin"]] = {
+            "link": vehicle_link,
+            "endpoints": endpoints,
+        }
+        return vehicle_link["vin"]
+
+    def add_fleet(self, count: int) -> None:
+        """Add vehicles with synthetic VINs, cycling through the vehicle types."""
+        vehicle_types = list(MOCK_VEHICLES)
+        for index in range(count):
+            self.add_vehicle(
+                vehicle_types[index % len(vehicle_types)], f"VF1SYNTH{index:09d}"
+            )
+
+    @property
+    def locale_details(self) -> Dict[str, str]:
+        """Return the locale details pointing the Renault API at this server."""
+        return {
+            CONF_COUNTRY: "FR",
+            CONF_GIGYA_APIKEY: "gigya-api-key",
+            CONF_GIGYA_URL: f"{self.url}/gigya",
+            CONF_KAMEREON_APIKEY: "kamereon-api-key",
+            CONF_KAMEREON_URL: f"{self.url}/kamereon",
+        }
+
+    def request_count(self, prefix: str = "") -> int:
+        """Return the number of requests with a path starting with prefix."""
+        return sum(1 for _, path in self.requests if path.startswith(prefix))
+
+    async def start(self) -> None:
+        """Start listening on a free local port."""
+        app = web.Application(middlewares=[self._middleware])
+        self._add_routes(app)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    def _add_routes(self, app: web.Application) -> None:
+        """Add the Gigya and Kamereon routes."""
+        app.router.add_post("/gigya/accounts.login", self._login)
+        app.router.add_post("/gigya/accounts.getAccountInfo", self._account_info)
+        app.router.add_post("/gigya/accounts.getJWT", self._get_jwt)
+        commerce = "/kamereon/commerce/v1"
+        app.router.add_get(f"{commerce}/persons/{{person_id}}", self._person)
+        app.router.add_get(
+            f"{commerce}/accounts/{{account_id}}/vehicles", self._account_vehicles
+        )
+        app.router.add_get(
+            f"{commerce}/accounts/{{account_id}}/vehicles/{{vin}}/details",
+            self._vehicle_details,
+        )
+        app.router.add_get(
+            f"{commerce}/accounts/{{account_id}}/vehicles/{{vin}}/contracts",
+            self._vehicle_contracts,
+        )
+        car_adapter = (
+            f"{commerce}/accounts/{{account_id}}/kamereon/kca/car-adapter"
+            "/v{version}/cars/{vin}"
+        )
+        app.router.add_get(f"{car_adapter}/{{endpoint}}", self._vehicle_data)
+        app.router.add_post(f"{car_adapter}/actions/{{endpoint}}", self._vehicle_action)
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: Any) -> web.Response:
+        """Record requests, and inject latency and Kamereon errors."""
+        self.requests.append((request.method, request.path))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if not request.path.startswith("/kamereon"):
+            return await handler(request)
+        if request.headers.get("apikey") != "kamereon-api-key":
+            return _kamereon_error(403)
+        token = request.headers.get("x-gigya-id_token", "")
+        try:
+            jwt.decode(token, "secret", algorithms=["HS256"])
+        except jwt.InvalidTokenError:
+            return _kamereon_error(401)
+        if self.rate_limit is not None:
+            count, period = self.rate_limit
+            now = time.monotonic()
+            while self._recent and self._recent[0] <= now - period:
+                self._recent.popleft()
+            if len(self._recent) >= count:
+                return _kamereon_error(429)
+            self._recent.append(now)
+        if self.error_rate and self._random.random() < self.error_rate:
+            return _kamereon_error(500)
+        return await handler(request)
+
+    async def _login(self, request: web.Request) -> web.Response:
+        """Log in with the test credentials."""
+        data = await request.post()
+        if data.get("loginID") != USERNAME or data.get("password") != self.password:
+            return web.json_response(
+                {"errorCode": 403042, "errorDetails": "invalid loginID or password"}
+            )
+        return web.json_response(
+            {
+                "errorCode": 0,
+                "UID": GIGYA_UID,
+                "UIDSignature": "uid-signature",
+                "profile": {"email": USERNAME},
+                "sessionInfo": {"cookieName": "glt_gigya", "cookieValue": LOGIN_TOKEN},
+            }
+        )
+
+    async def _account_info(self, request: web.Request) -> web.Response:
+        """Return the person id of the logged in user, and its account details."""
+        return web.json_response(
+            {
+                "errorCode": 0,
+                "UID": GIGYA_UID,
+                "data": {"personId": PERSON_ID, "gigyaDataCenter": "eu1.gigya.com"},
+                "emails": {"verified": [USERNAME], "unverified": []},
+                "loginIDs": {"emails": [USERNAME], "unverifiedEmails": []},
+                "profile": {"email": USERNAME},
+            }
+        )
+
+    async def _get_jwt(self, request: web.Request) -> web.Response:
+        """Return a new JWT, valid for jwt_lifetime seconds."""
+        data = await request.post()
+        if data.get("login_token") != LOGIN_TOKEN:
+            return web.json_response(
+                {"errorCode": 403005, "errorDetails": "Unauthorized user"}
+            )
+        return web.json_response(
+            {"errorCode": 0, "id_token": encode_jwt(self.jwt_lifetime)}
+        )
+
+    async def _person(self, request: web.Request) -> web.Response:
+        """Return the accounts of the person."""
+        return web.json_response(
+            {
+                "personId": PERSON_ID,
+                "emails": [{"emailType": "MAIN", "emailValue": USERNAME}],
+                "accounts": [
+                    {
+                        "accountId": ACCOUNT_ID,
+                        "accountType": "MYRENAULT",
+                        "accountStatus": "ACTIVE",
+                    }
+                ],
+            }
+        )
+
+    async def _account_vehicles(self, request: web.Request) -> web.Response:
+        """Return the vehicles of the account."""
+        return web.json_response(
+            {
+                "accountId": request.match_info["account_id"],
+                "country": "FR",
+                "vehicleLinks": [vehicle["link"] for vehicle in self.vehicles.values()],
+            }
+        )
+
+    def _vehicle(self, request: web.Request) -> Dict[str, Any]:
+        """Return the vehicle of the request."""
+        vehicle = self.vehicles.get(request.match_info["vin"])
+        if vehicle is None:
+            raise web.HTTPNotFound()
+        return vehicle
+
+    async def _vehicle_details(self, request: web.Request) -> web.Response:
+        """Return the details of a vehicle."""
+        return web.json_response(self._vehicle(request)["link"]["vehicleDetails"])
+
+    async def _vehicle_contracts(self, request: web.Request) -> web.Response:
+        """Return the contracts of a vehicle."""
+        self._vehicle(request)
+        return web.json_response({"contractList": []})
+
+    async def _vehicle_data(self, request: web.Request) -> web.Response:
+        """Return the fixture of a data endpoint."""
+        vehicle = self._vehicle(request)
+        endpoint = request.match_info["endpoint"]
+        if endpoint in self.endpoint_errors:
+            return _kamereon_error(self.endpoint_errors[endpoint])
+        fixture = vehicle["endpoints"].get(endpoint)
+        if fixture is None:
+            return _kamereon_error(501)
+        return web.Response(
+            text=load_fixture(fixture), content_type="application/vnd.api+json"
+        )
+
+    async def _vehicle_action(self, request: web.Request) -> web.Response:
+        """Accept an action, and echo its data."""
+        self._vehicle(request)
+        endpoint = f"actions/{request.match_info['endpoint']}"
+        if endpoint in self.endpoint_errors:
+            return _kamereon_error(self.endpoint_errors[endpoint])
+        data = (await request.json())["data"]
+        self.actions.append((request.match_info["vin"], endpoint, data))
+        return web.json_response({"data": {"id": "guid", **data}})
+
+
+class VirtualClock:
+    """Replace utcnow by a clock which only moves when told to."""
+
+    def __init__(self, tick: timedelta = timedelta(seconds=30)) -> None:
+        """Start the clock at the current time."""
+        self.now = dt_util.utcnow()
+        self.tick = tick
+        self._patches = [
+            patch("homeassistant.util.dt.utcnow", self._utcnow),
+            patch("homeassistant.helpers.update_coordinator.utcnow", self._utcnow),
+        ]
+
+    def _utcnow(self) -> datetime:
+        """Return the virtual time."""
+        return self.now
+
+    def __enter__(self) -> "VirtualClock":
+        """Freeze the clock."""
+        for clock_patch in self._patches:
+            clock_patch.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Restore the real clock."""
+        for clock_patch in self._patches:
+            clock_patch.stop()
+
+    async def async_advance(
+        self, hass: HomeAssistant, duration: timedelta, speed: Optional[float] = None
+    ) -> None:
+        """Move the clock forward, firing the timers which are due.
+
+        With a speed, each tick also lasts its duration divided by the speed
+        in real time, so that latencies and token lifetimes keep their scale.
+        """
+        end = self.now + duration
+        while self.now < end:
+            if speed:
+                await asyncio.sleep(
+                    (min(self.now + self.tick, end) - self.now).total_seconds() / speed
+                )
+            self.now = min(self.now + self.tick, end)
+            async_fire_time_changed(hass, self.now)
+            await hass.async_block_till_done()
+
+
+async def setup_renault_integration_with_server(
+    hass: HomeAssistant,
+    server: RenaultServer,
+    options: Optional[Dict[str, Any]] = None,
+    account_id: str = ACCOUNT_ID,
+) -> MockConfigEntry:
+    """Set up the Renault integration against a stand-in server."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        source="user",
+        data={
+            CONF_LOCALE: "fr_FR",
+            CONF_USERNAME: USERNAME,
+            CONF_PASSWORD: PASSWORD,
+            CONF_KAMEREON_ACCOUNT_ID: account_id,
+        },
+        unique_id=account_id,
+        connection_class=CONN_CLASS_CLOUD_POLL,
+        options=options or {},
+        entry_id="1",
+    )
+    config_entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.renault.RenaultHub",
+        partial(RenaultHub, locale_details=server.locale_details),
+    ):
+        await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    return config_entry
@@ -0,0 +1,122 @@
+"""Memory footprint of the Renault integration, per vehicle and per entity.
+
+Unlike the other benchmarks, this one runs with the test suite: it sets up one
+account with RENAULT_MEMORY_VEHICLES synthetic vehicles (10 by default) against
+the stand-in server, and fails if the memory retained per vehicle exceeds
+RENAULT_MEMORY_BUDGET bytes after the setup, or RENAULT_MEMORY_UPDATE_BUDGET
+bytes after RENAULT_MEMORY_UPDATES refreshes of every coordinator.
+
+One-off allocations, such as modules imported and schemas built on first use,
+are left out by setting up and removing a first account before measuring.
+When RENAULT_BENCHMARK is set, the results are also appended as a JSON line to
+RENAULT_BENCHMARK_OUTPUT (benchmark_memory.jsonl by default).
+"""
+from datetime import datetime, timezone
+import gc
+import json
+import logging
+import os
+import tracemalloc
+
+from homeassistant.helpers import entity_registry as er
+from homeassistant.setup import async_setup_component
+
+from custom_components.renault.const import DOMAIN
+
+from .const import MOCK_VEHICLES
+from .renault_server import (
+    ACCOUNT_ID,
+    RenaultServer,
+    setup_renault_integration_with_server,
+)
+
+VEHICLES = int(os.environ.get("RENAULT_MEMORY_VEHICLES", "10"))
+UPDATES = int(os.environ.get("RENAULT_MEMORY_UPDATES", "10"))
+# Memory retained per vehicle after the setup, in bytes.
+BUDGET = int(os.environ.get("RENAULT_MEMORY_BUDGET", "250000"))
+# Memory retained per vehicle by the updates, in bytes.
+UPDATE_BUDGET = int(os.environ.get("RENAULT_MEMORY_UPDATE_BUDGET", "20000"))
+OUTPUT = os.environ.get("RENAULT_BENCHMARK_OUTPUT", "benchmark_memory.jsonl")
+# Allocations made while importing modules, which are not retained by the
+# vehicles.
+EXCLUDED = [
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+]
+
+
+def _retained_memory(server: RenaultServer) -> int:
+    """Return the memory allocated since tracing started, and still in use."""
+    # The server keeps a log of the requests it handled.
+    server.requests.clear()
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot().filter_traces(EXCLUDED)
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+
+async def test_memory(hass, caplog):
+    """Measure the memory retained by the vehicles and their entities."""
+    # Captured log records would otherwise count as retained memory.
+    caplog.set_level(logging.WARNING)
+    await async_setup_component(hass, "persistent_notification", {})
+    server = RenaultServer([])
+    server.add_fleet(len(MOCK_VEHICLES))
+    await server.start()
+
+    try:
+        config_entry = await setup_renault_integration_with_server(hass, server)
+        assert await hass.config_entries.async_remove(config_entry.entry_id)
+        await hass.async_block_till_done()
+        server.vehicles.clear()
+        server.add_fleet(VEHICLES)
+
+        tracemalloc.start()
+        try:
+            config_entry = await setup_renault_integration_with_server(hass, server)
+            setup_memory = _retained_memory(server)
+
+            renault_hub = hass.data[DOMAIN][ACCOUNT_ID]
+            for _ in range(UPDATES):
+                for vehicle in renault_hub.vehicles.values():
+                    for coordinator in vehicle.coordinators.values():
+                        await coordinator.async_refresh()
+                await hass.async_block_till_done()
+            update_memory = _retained_memory(server) - setup_memory
+        finally:
+            tracemalloc.stop()
+    finally:
+        await server.stop()
+
+    entity_registry = await er.async_get_registry(hass)
+    entities = [
+        entry
+        for entry in er.async_entries_for_config_entry(
+            entity_registry, config_entry.entry_id
+        )
+        if not entry.disabled
+    ]
+    assert len(renault_hub.vehicles) == VEHICLES
+
+    result = {
+        "vehicles": VEHICLES,
+        "entities": len(entities),
+        "updates": UPDATES,
+        "memory_per_vehicle": setup_memory / VEHICLES,
+        "memory_per_entity": setup_memory / len(entities),
+        "update_memory_per_vehicle": update_memory / VEHICLES,
+    }
+    if os.environ.get("RENAULT_BENCHMARK"):
+        with open(OUTPUT, "a", encoding="utf-8") as file:
+            file.write(
+                json.dumps(
+                    {
+                        "benchmark": "memory",
+                        "timestamp": datetime.now(timezone.utc).isoformat(),
+                        **result,
+                    }
+                )
+                + "\n"
+            )
+
+    assert result["memory_per_vehicle"] <= BUDGET, result
+    assert result["update_memory_per_vehicle"] <= UPDATE_BUDGET, result
@@ -0,0 +1,142 @@
+"""Long-run polling simulation of the Renault integration, in virtual time.
+
+Skipped unless RENAULT_BENCHMARK is set. Each run sets up one account with a
+synthetic fleet against the stand-in server, then moves the clock forward for
+RENAULT_BENCHMARK_HOURS (24 by default) so that the coordinators poll as they
+would over a day, and appends a JSON line with the results to
+RENAULT_BENCHMARK_OUTPUT (benchmark_polling.jsonl by default):
+
+    RENAULT_BENCHMARK=1 RENAULT_BENCHMARK_HOURS=168 pytest tests/test_benchmark_polling.py
+
+Polling strategies are compared through the scan interval option
+(RENAULT_BENCHMARK_SCAN_INTERVALS, in seconds). The server and the virtual
+clock run in the same event loop, so the CPU time includes the handling of the
+requests and the ticks of the clock: compare it between runs of this benchmark
+only. Coordinators which gain listeners while polling fail the run.
+"""
+from datetime import datetime, timedelta, timezone
+import gc
+import json
+import logging
+import os
+import time
+import tracemalloc
+
+from homeassistant.const import (
+    CONF_SCAN_INTERVAL,
+    EVENT_STATE_CHANGED,
+    EVENT_TIME_CHANGED,
+    MATCH_ALL,
+)
+from homeassistant.core import callback
+from homeassistant.setup import async_setup_component
+import pytest
+
+from custom_components.renault.const import DEFAULT_SCAN_INTERVAL, DOMAIN
+
+from . import renault_server
+from .renault_server import (
+    ACCOUNT_ID,
+    RenaultServer,
+    VirtualClock,
+    setup_renault_integration_with_server,
+)
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("RENAULT_BENCHMARK"), reason="RENAULT_BENCHMARK is not set"
+)
+
+VEHICLES = int(os.environ.get("RENAULT_BENCHMARK_VEHICLES", "10"))
+HOURS = float(os.environ.get("RENAULT_BENCHMARK_HOURS", "24"))
+SCAN_INTERVALS = [
+    int(interval)
+    for interval in os.environ.get(
+        "RENAULT_BENCHMARK_SCAN_INTERVALS", f"{DEFAULT_SCAN_INTERVAL},900"
+    ).split(",")
+]
+OUTPUT = os.environ.get("RENAULT_BENCHMARK_OUTPUT", "benchmark_polling.jsonl")
+# Frames kept by tracemalloc, enough to tell allocations made by the server.
+TRACEBACK_LIMIT = 10
+
+
+@pytest.mark.parametrize("scan_interval", SCAN_INTERVALS)
+async def test_polling(hass, caplog, scan_interval):
+    """Simulate HOURS of polling of VEHICLES vehicles."""
+    # Captured log records would otherwise count as memory growth.
+    caplog.set_level(logging.WARNING)
+    await async_setup_component(hass, "persistent_notification", {})
+    server = RenaultServer([])
+    server.add_fleet(VEHICLES)
+    await server.start()
+
+    events = {"state_writes": 0, "recorder_events": 0}
+
+    @callback
+    def count_event(event):
+        """Count the events the recorder would store."""
+        if event.event_type == EVENT_TIME_CHANGED:
+            return
+        events["recorder_events"] += 1
+        if event.event_type == EVENT_STATE_CHANGED:
+            events["state_writes"] += 1
+
+    try:
+        with VirtualClock() as clock:
+            await setup_renault_integration_with_server(
+                hass, server, options={CONF_SCAN_INTERVAL: scan_interval}
+            )
+            # Run a first poll cycle, so that delayed writes of the setup
+            # are done before measuring.
+            await clock.async_advance(hass, timedelta(seconds=scan_interval))
+            renault_hub = hass.data[DOMAIN][ACCOUNT_ID]
+            listeners = {
+                (vin, key): len(coordinator._listeners)
+                for vin, vehicle in renault_hub.vehicles.items()
+                for key, coordinator in vehicle.coordinators.items()
+            }
+            warm_requests = server.request_count("/kamereon")
+            hass.bus.async_listen(MATCH_ALL, count_event)
+
+            gc.collect()
+            tracemalloc.start(TRACEBACK_LIMIT)
+            try:
+                cpu_started = time.process_time()
+                await clock.async_advance(hass, timedelta(hours=HOURS))
+                cpu_time = time.process_time() - cpu_started
+                gc.collect()
+                snapshot = tracemalloc.take_snapshot()
+            finally:
+                tracemalloc.stop()
+    finally:
+        await server.stop()
+
+    # Coordinators must not gain listeners while they poll.
+    assert {
+        (vin, key): len(coordinator._listeners)
+        for vin, vehicle in renault_hub.vehicles.items()
+        for key, coordinator in vehicle.coordinators.items()
+    } == listeners
+
+    # The server keeps a log of the requests it handled, which is not growth
+    # of the integration.
+    snapshot = snapshot.filter_traces(
+        [tracemalloc.Filter(False, renault_server.__file__, all_frames=True)]
+    )
+    memory_growth = sum(stat.size for stat in snapshot.statistics("filename"))
+    requests = server.request_count("/kamereon") - warm_requests
+    assert requests > 0
+    result = {
+        "benchmark": "polling",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "vehicles": VEHICLES,
+        "hours": HOURS,
+        "scan_interval": scan_interval,
+        "requests": requests,
+        "requests_per_vehicle_hour": requests / VEHICLES / HOURS,
+        "state_writes": events["state_writes"],
+        "recorder_events": events["recorder_events"],
+        "cpu_time": cpu_time,
+        "memory_growth_per_vehicle": memory_growth / VEHICLES,
+    }
+    with open(OUTPUT, "a", encoding="utf-8") as file:
+        file.write(json.dumps(result) + "\n")
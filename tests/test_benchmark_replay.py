@@ -0,0 +1,76 @@
+"""Replay benchmark of the Renault integration, against a recorded cassette.
+
+Skipped unless RENAULT_BENCHMARK and RENAULT_CASSETTE are set. The cassette,
+written by the record_cassette service with reload, is replayed offline at
+RENAULT_CASSETTE_SPEED times the recorded speed (60 by default, 0 for as fast
+as possible), and a JSON line with the results is appended to
+RENAULT_BENCHMARK_OUTPUT (benchmark_replay.jsonl by default):
+
+    RENAULT_BENCHMARK=1 RENAULT_CASSETTE=renault_cassette_20210401_120000.json pytest tests/test_benchmark_replay.py
+
+Use the scan interval of the recording (RENAULT_CASSETTE_SCAN_INTERVAL, in
+seconds), so that the integration polls as it did while recording.
+"""
+from datetime import datetime, timezone
+import json
+import os
+import time
+
+from homeassistant.const import CONF_SCAN_INTERVAL, EVENT_STATE_CHANGED
+from homeassistant.setup import async_setup_component
+import pytest
+from pytest_homeassistant_custom_component.common import async_capture_events
+
+from custom_components.renault.const import DEFAULT_SCAN_INTERVAL
+
+from .renault_cassette import CassetteServer, async_replay_cassette, load_cassette
+
+CASSETTE = os.environ.get("RENAULT_CASSETTE")
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("RENAULT_BENCHMARK") or not CASSETTE,
+    reason="RENAULT_BENCHMARK or RENAULT_CASSETTE is not set",
+)
+
+SPEED = float(os.environ.get("RENAULT_CASSETTE_SPEED", "60"))
+SCAN_INTERVAL = int(
+    os.environ.get("RENAULT_CASSETTE_SCAN_INTERVAL", str(DEFAULT_SCAN_INTERVAL))
+)
+OUTPUT = os.environ.get("RENAULT_BENCHMARK_OUTPUT", "benchmark_replay.jsonl")
+
+
+async def test_replay(hass):
+    """Replay the cassette against the integration."""
+    await async_setup_component(hass, "persistent_notification", {})
+    cassette = load_cassette(CASSETTE)
+    server = CassetteServer(cassette, speed=SPEED or None)
+    state_changes = async_capture_events(hass, EVENT_STATE_CHANGED)
+    await server.start()
+    try:
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        await async_replay_cassette(
+            hass, server, options={CONF_SCAN_INTERVAL: SCAN_INTERVAL}
+        )
+        cpu_time = time.process_time() - cpu_started
+        wall_time = time.perf_counter() - started
+    finally:
+        await server.stop()
+
+    result = {
+        "benchmark": "replay",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "cassette": os.path.basename(CASSETTE),
+        "speed": SPEED,
+        "scan_interval": SCAN_INTERVAL,
+        "recorded_duration": server.duration,
+        "recorded_requests": len(cassette["exchanges"]),
+        "requests": len(server.requests),
+        "unmatched_requests": len(server.unmatched),
+        "unplayed_requests": sum(len(queue) for queue in server.exchanges.values()),
+        "state_writes": len(state_changes),
+        "wall_time": wall_time,
+        "cpu_time": cpu_time,
+    }
+    with open(OUTPUT, "a", encoding="utf-8") as file:
+        file.write(json.dumps(result) + "\n")
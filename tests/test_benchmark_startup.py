@@ -0,0 +1,98 @@
+"""Startup benchmark of the Renault integration, by fleet size.
+
+Skipped unless RENAULT_BENCHMARK is set. Each run sets up one account with a
+synthetic fleet against the stand-in server, and appends a JSON line with the
+results to RENAULT_BENCHMARK_OUTPUT (benchmark_startup.jsonl by default):
+
+    RENAULT_BENCHMARK=1 RENAULT_BENCHMARK_LATENCY=0.05 pytest tests/test_benchmark_startup.py
+
+Peak memory is measured with tracemalloc, which also slows down the setup, so
+wall times are only comparable between runs of this benchmark.
+
+The run fails if a vehicle needs more than RENAULT_BENCHMARK_MAX_REQUESTS
+requests (5 by default), or more than RENAULT_BENCHMARK_MAX_ROUND_TRIPS
+sequential round trips (6 by default). The sequential round trips are the time
+spent waiting for the server, (wall time - CPU time) / latency: requests sent
+concurrently count once, so serial awaits show up as more round trips.
+"""
+from datetime import datetime, timezone
+import json
+import os
+import time
+import tracemalloc
+
+from homeassistant.setup import async_setup_component
+import pytest
+
+from custom_components.renault.const import DOMAIN
+
+from .renault_server import (
+    ACCOUNT_ID,
+    RenaultServer,
+    setup_renault_integration_with_server,
+)
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("RENAULT_BENCHMARK"), reason="RENAULT_BENCHMARK is not set"
+)
+
+FLEET_SIZES = [
+    int(size)
+    for size in os.environ.get("RENAULT_BENCHMARK_SIZES", "1,10,100,500").split(",")
+]
+# Simulated latency of each request to the stand-in server, in seconds.
+LATENCY = float(os.environ.get("RENAULT_BENCHMARK_LATENCY", "0.01"))
+OUTPUT = os.environ.get("RENAULT_BENCHMARK_OUTPUT", "benchmark_startup.jsonl")
+# Requests, and sequential round trips to the server, per vehicle.
+MAX_REQUESTS = float(os.environ.get("RENAULT_BENCHMARK_MAX_REQUESTS", "5"))
+MAX_ROUND_TRIPS = float(os.environ.get("RENAULT_BENCHMARK_MAX_ROUND_TRIPS", "6"))
+
+
+@pytest.mark.parametrize("fleet_size", FLEET_SIZES)
+async def test_startup(hass, fleet_size):
+    """Measure the setup of an account with fleet_size vehicles and entities."""
+    await async_setup_component(hass, "persistent_notification", {})
+    server = RenaultServer([], latency=LATENCY)
+    server.add_fleet(fleet_size)
+    await server.start()
+    tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        await setup_renault_integration_with_server(hass, server)
+        cpu_time = time.process_time() - cpu_started
+        wall_time = time.perf_counter() - started
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        await server.stop()
+
+    renault_hub = hass.data[DOMAIN][ACCOUNT_ID]
+    assert len(renault_hub.vehicles) == fleet_size
+    vehicle_requests = sum(
+        1 for _, path in server.requests if any(vin in path for vin in server.vehicles)
+    )
+    account_requests = len(server.requests) - vehicle_requests
+    # The account requests (login, vehicle list) are sent one after the other.
+    round_trips = (wall_time - cpu_time) / LATENCY - account_requests if LATENCY else 0
+    result = {
+        "benchmark": "startup",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "vehicles": fleet_size,
+        "latency": LATENCY,
+        "wall_time": wall_time,
+        "cpu_time": cpu_time,
+        "requests": len(server.requests),
+        "kamereon_requests": server.request_count("/kamereon"),
+        "account_requests": account_requests,
+        "requests_per_vehicle": vehicle_requests / fleet_size,
+        "round_trips_per_vehicle": round_trips / fleet_size if LATENCY else None,
+        "peak_memory": peak_memory,
+        "startup_timings": renault_hub.startup_timings,
+    }
+    with open(OUTPUT, "a", encoding="utf-8") as file:
+        file.write(json.dumps(result) + "\n")
+
+    assert result["requests_per_vehicle"] <= MAX_REQUESTS, result
+    if LATENCY:
+        assert result["round_trips_per_vehicle"] <= MAX_ROUND_TRIPS, result
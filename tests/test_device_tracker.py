@@ -1,5 +1,6 @@
 """Tests for Renault sensors."""
-from unittest.mock import PropertyMock, patch
+import dataclasses
+from unittest.mock import AsyncMock, PropertyMock, patch
 
 from homeassistant.components.device_tracker import DOMAIN as DEVICE_TRACKER_DOMAIN
 from homeassistant.setup import async_setup_component
@@ -58,3 +59,87 @@ async def test_sensors(hass, vehicle_type):
         assert registry_entry.device_class == expected_entity.get("class")
         state = hass.states.get(entity_id)
         assert state.state == expected_entity["result"]
+
+
+async def test_device_tracker_ignores_small_moves(hass):
+    """Test the device tracker ignores moves below the minimum distance."""
+    await async_setup_component(hass, "persistent_notification", {})
+    mock_registry(hass)
+    mock_device_registry(hass)
+
+    vehicle_proxy = await create_vehicle_proxy(hass, "zoe_50")
+    vehicle_proxy.tracker_min_distance = 50
+    coordinator = vehicle_proxy.coordinators["location"]
+    location = coordinator.data
+
+    with patch(
+        "custom_components.renault.RenaultHub.vehicles",
+        new_callable=PropertyMock,
+        return_value={
+            vehicle_proxy.details.vin: vehicle_proxy,
+        },
+    ), patch("custom_components.renault.SUPPORTED_PLATFORMS", [DEVICE_TRACKER_DOMAIN]):
+        await setup_renault_integration(hass)
+        await hass.async_block_till_done()
+
+    entity_id = "device_tracker.vf1aaaaa555777999_location"
+    assert hass.states.get(entity_id).attributes["latitude"] == 48.1234567
+
+    # About 11 meters away, 10 minutes later: ignored
+    moved = dataclasses.replace(
+        location, gpsLatitude=48.1235567, lastUpdateTime="2020-02-18T17:08:38Z"
+    )
+    with patch.object(coordinator, "update_method", AsyncMock(return_value=moved)):
+        await coordinator.async_refresh()
+    state = hass.states.get(entity_id)
+    assert state.attributes["latitude"] == 48.1234567
+    assert state.attributes["last_update"] == "2020-02-18T16:58:38Z"
+
+    # About 1 kilometer away: tracked
+    moved = dataclasses.replace(
+        location, gpsLatitude=48.1324567, lastUpdateTime="2020-02-18T17:18:38Z"
+    )
+    with patch.object(coordinator, "update_method", AsyncMock(return_value=moved)):
+        await coordinator.async_refresh()
+    state = hass.states.get(entity_id)
+    assert state.attributes["latitude"] == 48.1324567
+    assert state.attributes["last_update"] == "2020-02-18T17:18:38Z"
+
+    # Same small move, but more than an hour later: tracked
+    moved = dataclasses.replace(
+        location, gpsLatitude=48.1325567, lastUpdateTime="2020-02-18T18:28:38Z"
+    )
+    with patch.object(coordinator, "update_method", AsyncMock(return_value=moved)):
+        await coordinator.async_refresh()
+    assert hass.states.get(entity_id).attributes["latitude"] == 48.1325567
+
+
+async def test_device_tracker_follows_zone_changes(hass):
+    """Test the device tracker state follows zones added at its location."""
+    await async_setup_component(hass, "persistent_notification", {})
+    mock_registry(hass)
+    mock_device_registry(hass)
+
+    vehicle_proxy = await create_vehicle_proxy(hass, "zoe_50")
+    coordinator = vehicle_proxy.coordinators["location"]
+
+    with patch(
+        "custom_components.renault.RenaultHub.vehicles",
+        new_callable=PropertyMock,
+        return_value={
+            vehicle_proxy.details.vin: vehicle_proxy,
+        },
+    ), patch("custom_components.renault.SUPPORTED_PLATFORMS", [DEVICE_TRACKER_DOMAIN]):
+        await setup_renault_integration(hass)
+        await hass.async_block_till_done()
+
+    entity_id = "device_tracker.vf1aaaaa555777999_location"
+    assert hass.states.get(entity_id).state == "not_home"
+
+    hass.states.async_set(
+        "zone.work",
+        "zoning",
+        {"latitude": 48.1234567, "longitude": 11.1234567, "radius": 100},
+    )
+    await coordinator.async_refresh()
+    assert hass.states.get(entity_id).state == "work"
@@ -1,14 +1,16 @@
 """Tests for Renault setup process."""
-from unittest.mock import patch
+from unittest.mock import PropertyMock, patch
 
 import aiohttp
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.setup import async_setup_component
 import pytest
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.renault import RenaultHub, async_setup_entry, async_unload_entry
 from custom_components.renault.const import DOMAIN
 
+from . import create_vehicle_proxy, setup_renault_integration
 from .const import MOCK_CONFIG
 
 
@@ -33,6 +35,27 @@ async def test_setup_unload_and_reload_entry(hass):
         assert config_entry.unique_id not in hass.data[DOMAIN]
 
 
+async def test_setup_entry_records_startup_timings(hass):
+    """Test the duration of startup phases is recorded for the account and vehicles."""
+    await async_setup_component(hass, "persistent_notification", {})
+    vehicle_proxy = await create_vehicle_proxy(hass, "zoe_40")
+
+    with patch(
+        "custom_components.renault.RenaultHub.vehicles",
+        new_callable=PropertyMock,
+        return_value={
+            vehicle_proxy.details.vin: vehicle_proxy,
+        },
+    ), patch("custom_components.renault.SUPPORTED_PLATFORMS", []):
+        config_entry = await setup_renault_integration(hass)
+
+    renault_hub = hass.data[DOMAIN][config_entry.unique_id]
+    assert "setup_entry" in renault_hub.startup_timings
+    assert {"load_storage", "first_refresh_battery"} <= set(
+        vehicle_proxy.startup_timings
+    )
+
+
 async def test_setup_entry_bad_password(hass):
     """Test entry setup and unload."""
     # Create a mock entry so we don't have to go through config flow
@@ -0,0 +1,144 @@
+"""Tests for the Renault request budget."""
+from datetime import timedelta
+import logging
+from unittest.mock import AsyncMock, patch
+
+from pytest_homeassistant_custom_component.common import async_capture_events
+
+from custom_components.renault.renault_budget import (
+    DAY,
+    EVENT_REQUEST_BUDGET,
+    HOUR,
+    REQUEST_COMMAND,
+    REQUEST_POLL,
+    RequestBudget,
+    RollingCounter,
+)
+from custom_components.renault.renault_commands import (
+    COMMAND_CHARGE_START,
+    RenaultCommandQueue,
+)
+from custom_components.renault.renault_coordinator import (
+    RenaultDataUpdateCoordinator,
+)
+
+NOW = 1_600_000_000
+
+
+def test_rolling_counter():
+    """Test requests leave the window once it has passed."""
+    counter = RollingCounter(HOUR)
+    counter.add(NOW, ("battery", REQUEST_POLL))
+    counter.add(NOW + 1, ("battery", REQUEST_POLL))
+    counter.add(NOW + 1800, ("charge_start", REQUEST_COMMAND))
+    assert counter.total() == 3
+    assert counter.by_position(0) == {"battery": 2, "charge_start": 1}
+    assert counter.by_position(1) == {REQUEST_POLL: 2, REQUEST_COMMAND: 1}
+
+    counter.expire(NOW + HOUR + 60)
+    assert counter.totals == {("charge_start", REQUEST_COMMAND): 1}
+    counter.expire(NOW + 1800 + HOUR + 60)
+    assert counter.totals == {}
+    assert counter.total() == 0
+
+
+async def test_request_budget(hass):
+    """Test the warning event is fired once each time the budget is reached."""
+    events = async_capture_events(hass, EVENT_REQUEST_BUDGET)
+    budget = RequestBudget(hass, "account_id_2", hourly_budget=3)
+
+    with patch("custom_components.renault.renault_budget.time", return_value=NOW):
+        for _ in range(4):
+            budget.record("battery", REQUEST_POLL)
+    await hass.async_block_till_done()
+    assert len(events) == 1
+    assert events[0].data == {
+        "account": "account_id_2",
+        "window": "hour",
+        "requests": 3,
+        "budget": 3,
+    }
+
+    with patch(
+        "custom_components.renault.renault_budget.time", return_value=NOW + HOUR + 60
+    ):
+        assert budget.hour_requests == 0
+        budget.record("charge_start", REQUEST_COMMAND)
+        assert budget.as_dict() == {
+            "hour": {
+                "requests": 1,
+                "budget": 3,
+                "endpoints": {"charge_start": 1},
+                "kinds": {REQUEST_COMMAND: 1},
+            },
+            "day": {
+                "requests": 5,
+                "budget": None,
+                "endpoints": {"battery": 4, "charge_start": 1},
+                "kinds": {REQUEST_POLL: 4, REQUEST_COMMAND: 1},
+            },
+        }
+        budget.record("charge_start", REQUEST_COMMAND)
+        budget.record("charge_start", REQUEST_COMMAND)
+    await hass.async_block_till_done()
+    assert len(events) == 2
+
+    with patch(
+        "custom_components.renault.renault_budget.time", return_value=NOW + DAY + 60
+    ):
+        assert budget.as_dict()["day"]["requests"] == 3
+
+
+async def test_daily_request_budget(hass):
+    """Test the daily budget is checked over the last day, and listeners called."""
+    events = async_capture_events(hass, EVENT_REQUEST_BUDGET)
+    budget = RequestBudget(hass, "account_id_2", daily_budget=3)
+    updates = []
+    remove_listener = budget.async_add_listener(lambda: updates.append(True))
+
+    for offset in (0, HOUR, 2 * HOUR):
+        with patch(
+            "custom_components.renault.renault_budget.time", return_value=NOW + offset
+        ):
+            budget.record("battery", REQUEST_POLL)
+    await hass.async_block_till_done()
+    assert len(updates) == 3
+    assert [event.data for event in events] == [
+        {"account": "account_id_2", "window": "day", "requests": 3, "budget": 3}
+    ]
+
+    remove_listener()
+    with patch(
+        "custom_components.renault.renault_budget.time", return_value=NOW + DAY + 60
+    ):
+        budget.record("battery", REQUEST_POLL)
+        assert budget.as_dict()["day"]["requests"] == 3
+    assert len(updates) == 3
+
+
+async def test_polls_and_commands_counted(hass):
+    """Test coordinator polls and sent commands are counted."""
+    budget = RequestBudget(hass)
+    coordinator = RenaultDataUpdateCoordinator(
+        hass,
+        logging.getLogger(__name__),
+        name="battery",
+        update_method=AsyncMock(return_value={}),
+        update_interval=timedelta(seconds=300),
+        on_request=lambda: budget.record("battery", REQUEST_POLL),
+    )
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+
+    queue = RenaultCommandQueue(
+        hass,
+        "VF1AAAAA555777999",
+        on_send=lambda command: budget.record(command, REQUEST_COMMAND),
+    )
+    await queue.async_send(COMMAND_CHARGE_START, AsyncMock())
+
+    assert budget.as_dict()["hour"]["endpoints"] == {
+        "battery": 2,
+        COMMAND_CHARGE_START: 1,
+    }
+    assert budget.as_dict()["hour"]["kinds"] == {REQUEST_POLL: 2, REQUEST_COMMAND: 1}
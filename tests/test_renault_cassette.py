@@ -0,0 +1,201 @@
+"""Tests for the recording and replay of Renault API cassettes."""
+from functools import partial
+from unittest.mock import patch
+
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.setup import async_setup_component
+import pytest
+
+from custom_components.renault.const import DOMAIN
+from custom_components.renault.renault_cassette import (
+    RENAULT_CASSETTE,
+    REDACTED,
+    async_stop_recorder,
+    scrub,
+)
+from custom_components.renault.renault_hub import RenaultHub
+from custom_components.renault.services import SERVICE_RECORD_CASSETTE
+
+from .const import MOCK_VEHICLES
+from .renault_cassette import CassetteServer, async_replay_cassette, load_cassette
+from .renault_server import (
+    ACCOUNT_ID,
+    GIGYA_UID,
+    LOGIN_TOKEN,
+    PASSWORD,
+    PERSON_ID,
+    USERNAME,
+    RenaultServer,
+    setup_renault_integration_with_server,
+)
+
+
+def test_scrub():
+    """Test credentials and locations are removed, and identifiers replaced."""
+    assert scrub(
+        {
+            "data": {
+                "id": "VF1AAAAA555777999",
+                "attributes": {"gpsLatitude": 48.1234567, "gpsLongitude": 11.1234567},
+            },
+            "sessionInfo": {"cookieValue": LOGIN_TOKEN},
+        },
+        {"VF1AAAAA555777999": "vin-0"},
+    ) == {
+        "data": {
+            "id": "vin-0",
+            "attributes": {"gpsLatitude": None, "gpsLongitude": None},
+        },
+        "sessionInfo": {"cookieValue": REDACTED},
+    }
+
+
+async def _record(hass, server, platforms=(SENSOR_DOMAIN,)):
+    """Record the setup of the integration against the server."""
+    await async_setup_component(hass, "persistent_notification", {})
+    with patch("custom_components.renault.SUPPORTED_PLATFORMS", list(platforms)):
+        await setup_renault_integration_with_server(hass, server)
+        with patch(
+            "custom_components.renault.RenaultHub",
+            partial(RenaultHub, locale_details=server.locale_details),
+        ):
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_RECORD_CASSETTE,
+                {"duration": 600, "reload": True},
+                blocking=True,
+            )
+            await hass.async_block_till_done()
+    return hass.data[RENAULT_CASSETTE]
+
+
+async def test_record_and_replay(hass, tmp_path):
+    """Test a recorded session is scrubbed, and replays offline."""
+    hass.config.config_dir = str(tmp_path)
+    server = RenaultServer(["zoe_40"])
+    await server.start()
+    try:
+        recorder = await _record(hass, server)
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN, SERVICE_RECORD_CASSETTE, {}, blocking=True
+            )
+        vehicle = hass.data[DOMAIN][ACCOUNT_ID].vehicles["VF1AAAAA555777999"]
+        await vehicle.coordinators["battery"].async_refresh()
+        await async_stop_recorder(hass)
+    finally:
+        await server.stop()
+    assert RENAULT_CASSETTE not in hass.data
+
+    with open(recorder.path, encoding="utf-8") as file:
+        text = file.read()
+    for secret in (
+        USERNAME,
+        PASSWORD,
+        LOGIN_TOKEN,
+        GIGYA_UID,
+        PERSON_ID,
+        ACCOUNT_ID,
+        "VF1AAAAA555777999",
+        "REG-NUMBER",
+        "gigya-api-key",
+        "kamereon-api-key",
+    ):
+        assert secret not in text
+    cassette = load_cassette(recorder.path)
+    exchanges = {
+        exchange["path"]: exchange for exchange in reversed(cassette["exchanges"])
+    }
+    assert exchanges["/accounts.login"]["data"]["ApiKey"] == REDACTED
+    assert exchanges["/accounts.login"]["data"]["password"] == REDACTED
+    assert REDACTED in exchanges["/accounts.getJWT"]["response"]
+    assert 890 <= exchanges["/accounts.getJWT"]["token_lifetime"] <= 900
+    battery = [
+        exchange
+        for exchange in cassette["exchanges"]
+        if exchange["path"]
+        == "/commerce/v1/accounts/account-0/kamereon/kca/car-adapter/v2/cars"
+        "/vin-0/battery-status"
+    ]
+    assert len(battery) == 2
+    assert battery[0]["params"] == {"country": "FR"}
+    assert battery[0]["status"] == 200
+
+    for config_entry in hass.config_entries.async_entries(DOMAIN):
+        await hass.config_entries.async_remove(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    replay_server = CassetteServer(
+        cassette,
+        speed=None,
+        substitutes={"account-0": ACCOUNT_ID, "vin-0": "VF1AAAAA555777999"},
+    )
+    assert replay_server.account_id == ACCOUNT_ID
+    await replay_server.start()
+    try:
+        with patch("custom_components.renault.SUPPORTED_PLATFORMS", [SENSOR_DOMAIN]):
+            await async_replay_cassette(hass, replay_server)
+
+        for expected_entity in MOCK_VEHICLES["zoe_40"][SENSOR_DOMAIN]:
+            if expected_entity.get("disabled"):
+                continue
+            state = hass.states.get(expected_entity["entity_id"])
+            assert state.state == expected_entity["result"]
+        assert replay_server.unmatched == []
+
+        # The refresh of the recording was not scheduled by the integration
+        battery_path = (
+            f"/commerce/v1/accounts/{ACCOUNT_ID}/kamereon/kca/car-adapter/v2/cars"
+            "/VF1AAAAA555777999/battery-status"
+        )
+        vehicle = hass.data[DOMAIN][ACCOUNT_ID].vehicles["VF1AAAAA555777999"]
+        await vehicle.coordinators["battery"].async_refresh()
+        assert not replay_server.exchanges[("GET", "kamereon", battery_path)]
+        assert replay_server.unmatched == []
+
+        # Once used up, the last exchange of a path is served again
+        await vehicle.coordinators["battery"].async_refresh()
+        assert vehicle.coordinators["battery"].last_update_success
+        assert replay_server.unmatched == [("GET", f"/kamereon{battery_path}")]
+    finally:
+        await replay_server.stop()
+
+
+async def test_record_client_error(hass, tmp_path):
+    """Test requests failing with a client error are recorded."""
+    hass.config.config_dir = str(tmp_path)
+    server = RenaultServer(["zoe_40"])
+    await server.start()
+    try:
+        recorder = await _record(hass, server, platforms=())
+    finally:
+        await server.stop()
+
+    vehicle = hass.data[DOMAIN][ACCOUNT_ID].vehicles["VF1AAAAA555777999"]
+    await vehicle.coordinators["battery"].async_refresh()
+    await async_stop_recorder(hass)
+
+    cassette = load_cassette(recorder.path)
+    exchange = cassette["exchanges"][-1]
+    assert exchange["path"].endswith("/battery-status")
+    assert exchange["error"] in ("ClientConnectorError", "ServerDisconnectedError")
+    assert "status" not in exchange
+
+    for config_entry in hass.config_entries.async_entries(DOMAIN):
+        await hass.config_entries.async_remove(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    # The replay drops the connection where the recording failed, and serves
+    # the placeholders as generated identifiers
+    replay_server = CassetteServer(cassette, speed=None)
+    await replay_server.start()
+    try:
+        with patch("custom_components.renault.SUPPORTED_PLATFORMS", []):
+            await async_replay_cassette(hass, replay_server)
+        vehicle = hass.data[DOMAIN]["account-0"].vehicles["VF1CASSETTE000000"]
+        assert vehicle.coordinators["battery"].last_update_success
+        await vehicle.coordinators["battery"].async_refresh()
+        assert not vehicle.coordinators["battery"].last_update_success
+    finally:
+        await replay_server.stop()
@@ -0,0 +1,116 @@
+"""Tests for the Renault command queue."""
+import asyncio
+
+import pytest
+
+from custom_components.renault.renault_commands import (
+    COMMAND_AC_CANCEL,
+    COMMAND_AC_START,
+    COMMAND_CHARGE_MODE,
+    COMMAND_CHARGE_SCHEDULES,
+    CommandSupersededError,
+    RenaultCommandQueue,
+)
+
+
+def _sender(sent, name, release=None):
+    """Create a command sender recording its calls."""
+
+    async def send():
+        sent.append(name)
+        if release is not None:
+            await release.wait()
+        return name
+
+    return send
+
+
+async def test_superseded_commands_are_merged(hass):
+    """Test only the last of several queued charge modes is sent."""
+    queue = RenaultCommandQueue(hass, "VF1AAAAA555777999")
+    sent = []
+    release = asyncio.Event()
+
+    first = hass.async_create_task(
+        queue.async_send(COMMAND_CHARGE_MODE, _sender(sent, "always", release))
+    )
+    await asyncio.sleep(0)
+    second = hass.async_create_task(
+        queue.async_send(COMMAND_CHARGE_MODE, _sender(sent, "schedule_mode"))
+    )
+    third = hass.async_create_task(
+        queue.async_send(COMMAND_CHARGE_MODE, _sender(sent, "always_charging"))
+    )
+    await asyncio.sleep(0)
+    assert queue.pending_commands == [COMMAND_CHARGE_MODE]
+
+    # The caller of a dropped command is told at once
+    with pytest.raises(CommandSupersededError):
+        await second
+
+    release.set()
+    assert await first == "always"
+    assert await third == "always_charging"
+    assert sent == ["always", "always_charging"]
+
+
+async def test_ac_start_dropped_by_ac_cancel(hass):
+    """Test a pending A/C start is dropped when followed by an A/C cancel."""
+    queue = RenaultCommandQueue(hass, "VF1AAAAA555777999")
+    sent = []
+    release = asyncio.Event()
+
+    first = hass.async_create_task(
+        queue.async_send(COMMAND_CHARGE_MODE, _sender(sent, "always", release))
+    )
+    await asyncio.sleep(0)
+    start = hass.async_create_task(
+        queue.async_send(COMMAND_AC_START, _sender(sent, COMMAND_AC_START))
+    )
+    cancel = hass.async_create_task(
+        queue.async_send(COMMAND_AC_CANCEL, _sender(sent, COMMAND_AC_CANCEL))
+    )
+    await asyncio.sleep(0)
+
+    release.set()
+    assert await first == "always"
+    assert await cancel == COMMAND_AC_CANCEL
+    with pytest.raises(CommandSupersededError) as err:
+        await start
+    assert err.value.superseded_by == COMMAND_AC_CANCEL
+    assert sent == ["always", COMMAND_AC_CANCEL]
+
+
+async def test_charge_schedules_are_not_merged(hass):
+    """Test every queued charge schedule upload is sent."""
+    queue = RenaultCommandQueue(hass, "VF1AAAAA555777999")
+    sent = []
+    release = asyncio.Event()
+
+    first = hass.async_create_task(
+        queue.async_send(COMMAND_CHARGE_SCHEDULES, _sender(sent, "first", release))
+    )
+    await asyncio.sleep(0)
+    second = hass.async_create_task(
+        queue.async_send(COMMAND_CHARGE_SCHEDULES, _sender(sent, "second"))
+    )
+    third = hass.async_create_task(
+        queue.async_send(COMMAND_CHARGE_SCHEDULES, _sender(sent, "third"))
+    )
+    await asyncio.sleep(0)
+
+    release.set()
+    assert await asyncio.gather(first, second, third) == ["first", "second", "third"]
+    assert sent == ["first", "second", "third"]
+
+
+async def test_command_errors_are_propagated(hass):
+    """Test errors raised by a command reach its caller."""
+    queue = RenaultCommandQueue(hass, "VF1AAAAA555777999")
+
+    async def send():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        await queue.async_send(COMMAND_CHARGE_MODE, send)
+    assert queue.pending_commands == []
@@ -0,0 +1,110 @@
+"""Tests for the Renault location history."""
+import json
+
+from custom_components.renault.renault_locations import (
+    CHECKPOINT_INTERVAL,
+    LocationHistory,
+    LocationPoint,
+    export_geojson,
+    export_gpx,
+    haversine_distance,
+)
+
+
+def _fill(history: LocationHistory, count: int) -> None:
+    """Append points moving back and forth around a location."""
+    for index in range(count):
+        offset = (index % 7 - 3) / 1000
+        history.append(1600000000 + index * 300, 48.123456 + offset, 11.123456 - offset)
+
+
+def test_history_range_queries():
+    """Test points can be queried by time range across checkpoints."""
+    history = LocationHistory()
+    _fill(history, 200)
+
+    assert len(history) == 200
+    # A few bytes per point instead of 24 for three 64 bit values.
+    assert history.size < 200 * 8
+    points = list(history.points())
+    assert len(points) == 200
+    assert points[5] == LocationPoint(1600001500, 48.125456, 11.121456)
+
+    selected = list(history.points(1600000000 + 100 * 300, 1600000000 + 150 * 300))
+    assert selected == points[100:150]
+    assert list(history.points(start=1700000000)) == []
+
+
+def test_history_deduplication():
+    """Test points which are not new, or at the same place, are ignored."""
+    history = LocationHistory()
+
+    assert history.append(1600000000, 48.1234567, 11.1234567)
+    assert not history.append(1600000300, 48.1234567, 11.1234567)
+    assert not history.append(1600000000, 48.2, 11.2)
+    assert history.append(1600000600, 48.2, 11.2)
+    assert len(history) == 2
+
+
+def test_history_serialization():
+    """Test points round-trip through the binary format."""
+    history = LocationHistory()
+    _fill(history, 100)
+
+    restored = LocationHistory.from_bytes(history.to_bytes())
+    assert list(restored.points()) == list(history.points())
+    assert list(restored.points(1600000000 + 70 * 300)) == list(history.points())[70:]
+
+
+def test_history_capacity():
+    """Test the oldest checkpoint block is dropped beyond the capacity."""
+    full = LocationHistory()
+    _fill(full, 3 * CHECKPOINT_INTERVAL + 1)
+    history = LocationHistory(max_points=3 * CHECKPOINT_INTERVAL)
+    _fill(history, 3 * CHECKPOINT_INTERVAL)
+    size = history.size
+
+    # Only the last point is new
+    _fill(history, 3 * CHECKPOINT_INTERVAL + 1)
+    assert len(history) == 2 * CHECKPOINT_INTERVAL + 1
+    assert history.size < size
+    points = list(history.points())
+    assert points == list(full.points())[CHECKPOINT_INTERVAL:]
+    start = points[100].timestamp
+    assert list(history.points(start)) == points[100:]
+
+    restored = LocationHistory.from_bytes(
+        history.to_bytes(), max_points=3 * CHECKPOINT_INTERVAL
+    )
+    assert list(restored.points()) == points
+    assert restored.to_bytes() == history.to_bytes()
+    # Points keep being appended after the dropped block.
+    assert history.append(1700000000, 48.2, 11.2)
+    assert list(history.points(1700000000)) == [LocationPoint(1700000000, 48.2, 11.2)]
+
+
+def test_history_export():
+    """Test points export as GPX and GeoJSON."""
+    points = [
+        LocationPoint(1600000000, 48.1, 11.1),
+        LocationPoint(1600000300, 48.2, 11.2),
+    ]
+
+    gpx = export_gpx("VF1AAAAA555777999", points)
+    assert "<name>VF1AAAAA555777999</name>" in gpx
+    assert (
+        '<trkpt lat="48.2" lon="11.2"><time>2020-09-13T12:31:40+00:00</time></trkpt>'
+        in gpx
+    )
+
+    geojson = json.loads(export_geojson("VF1AAAAA555777999", points))
+    feature = geojson["features"][0]
+    assert feature["geometry"]["coordinates"] == [[11.1, 48.1], [11.2, 48.2]]
+    assert feature["properties"]["times"][0] == "2020-09-13T12:26:40+00:00"
+
+
+def test_haversine_distance():
+    """Test distances between two points."""
+    assert haversine_distance(48.8566, 2.3522, 48.8566, 2.3522) == 0
+    # Paris to London
+    assert 343000 < haversine_distance(48.8566, 2.3522, 51.5074, -0.1278) < 344000
@@ -0,0 +1,70 @@
+"""Tests for Renault request metrics."""
+from unittest.mock import AsyncMock, patch
+
+from renault_api.kamereon import exceptions
+
+from custom_components.renault.renault_metrics import EndpointMetrics, RenaultMetrics
+
+from . import create_vehicle_proxy
+
+
+def test_endpoint_metrics():
+    """Test latencies and outcomes are counted."""
+    metrics = EndpointMetrics()
+    assert metrics.mean_latency is None
+
+    metrics.record_success(0.05)
+    metrics.record_success(0.25)
+    metrics.record_error("QuotaLimitException", 45.0)
+    metrics.record_error("QuotaLimitException", 1.5)
+
+    assert metrics.request_count == 4
+    assert metrics.error_count == 2
+    assert metrics.mean_latency == 46.8 / 4
+    data = metrics.as_dict()
+    assert data["successes"] == 2
+    assert data["errors"] == {"QuotaLimitException": 2}
+    assert data["last_latency"] == 1.5
+    assert data["last_success"] is not None
+    assert data["latency_buckets"] == {
+        "0.1": 1,
+        "0.25": 1,
+        "0.5": 0,
+        "1.0": 0,
+        "2.5": 1,
+        "5.0": 0,
+        "10.0": 0,
+        "30.0": 0,
+        "+Inf": 1,
+    }
+
+
+def test_vehicle_metrics():
+    """Test endpoint metrics are created once."""
+    metrics = RenaultMetrics()
+    assert metrics.endpoint("battery") is metrics.endpoint("battery")
+    assert list(metrics.as_dict()) == ["battery"]
+
+
+async def test_coordinator_records_metrics(hass):
+    """Test coordinators record the outcome of each request."""
+    vehicle_proxy = await create_vehicle_proxy(hass, "zoe_40")
+    coordinator = vehicle_proxy.coordinators["battery"]
+    metrics = vehicle_proxy.metrics.endpoint("battery")
+    assert coordinator.metrics is metrics
+    assert metrics.success_count == 1
+
+    with patch.object(
+        coordinator,
+        "update_method",
+        AsyncMock(
+            side_effect=exceptions.QuotaLimitException(
+                "err.func.wired.overloaded", "You have reached your quota limit"
+            )
+        ),
+    ):
+        await coordinator.async_refresh()
+
+    assert not coordinator.last_update_success
+    assert metrics.request_count == 2
+    assert metrics.errors == {"QuotaLimitException": 1}
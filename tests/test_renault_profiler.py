@@ -0,0 +1,118 @@
+"""Tests for Renault profiling."""
+from datetime import timedelta
+import os
+import pstats
+
+from unittest.mock import PropertyMock, patch
+
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity_platform import async_get_platforms
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+import voluptuous as vol
+
+from custom_components.renault.const import DOMAIN
+from custom_components.renault.renault_coordinator import (
+    RenaultDataUpdateCoordinator,
+)
+from custom_components.renault.renault_profiler import RENAULT_PROFILER
+from custom_components.renault.services import SERVICE_DUMP_METRICS, SERVICE_PROFILE
+
+from . import create_vehicle_proxy, setup_renault_integration
+from .test_services import setup_services_integration
+
+
+async def _async_profile(hass, vehicle_proxy, tmp_path):
+    """Set up the sensors of the vehicle, then profile a refresh and a service."""
+    with patch("custom_components.renault.SUPPORTED_PLATFORMS", [SENSOR_DOMAIN]):
+        await setup_renault_integration(hass)
+        await hass.async_block_till_done()
+    coordinator = vehicle_proxy.coordinators["battery"]
+    entity = next(
+        entity
+        for platform in async_get_platforms(hass, DOMAIN)
+        for entity in platform.entities.values()
+        if getattr(entity, "coordinator", None) is coordinator
+    )
+    update_data = RenaultDataUpdateCoordinator.__dict__["_async_update_data"]
+    dump_metrics = hass.services.async_services()[DOMAIN][SERVICE_DUMP_METRICS]
+
+    async def _async_refresh():
+        """Refresh the coordinator, returning the entity state writes."""
+        with patch.object(
+            entity, "_state_fingerprint", side_effect=lambda: object()
+        ), patch.object(entity, "async_write_ha_state") as mock_write:
+            await coordinator.async_refresh()
+        return mock_write.call_count
+
+    await hass.services.async_call(
+        DOMAIN, SERVICE_PROFILE, {"duration": 10}, blocking=True
+    )
+    profiler = hass.data[RENAULT_PROFILER]
+    assert RenaultDataUpdateCoordinator._async_update_data is not update_data
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(DOMAIN, SERVICE_PROFILE, {}, blocking=True)
+
+    # Entities removed while profiling still remove the profiled listener
+    coordinator.async_remove_listener(entity._handle_coordinator_update)
+    assert await _async_refresh() == 0
+    coordinator.async_add_listener(entity._handle_coordinator_update)
+
+    with patch.object(
+        profiler._profiler, "call", wraps=profiler._profiler.call
+    ) as mock_call:
+        assert await _async_refresh() == 1
+    assert mock_call.called
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_DUMP_METRICS,
+        {"vin": vehicle_proxy.details.vin},
+        blocking=True,
+    )
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=11))
+    await hass.async_block_till_done()
+
+    assert RENAULT_PROFILER not in hass.data
+    assert RenaultDataUpdateCoordinator.__dict__["_async_update_data"] is update_data
+    service = hass.services.async_services()[DOMAIN][SERVICE_DUMP_METRICS]
+    assert service.job.target is dump_metrics.job.target
+    # The entity listener is registered once, and no longer profiled
+    with patch.object(profiler._profiler, "call") as mock_call:
+        assert await _async_refresh() == 1
+    mock_call.assert_not_called()
+
+    assert os.path.dirname(profiler.path) == str(tmp_path)
+    functions = {
+        name for _, _, name in pstats.Stats(profiler.path).stats  # type: ignore
+    }
+    assert "_async_update_data" in functions
+    assert "_handle_coordinator_update" in functions
+    assert "dump_metrics" in functions
+
+
+async def test_profile(hass, tmp_path):
+    """Test profiling wraps the hot paths and writes the profile when done."""
+    hass.config.config_dir = str(tmp_path)
+    await async_setup_component(hass, "persistent_notification", {})
+    vehicle_proxy = await create_vehicle_proxy(hass, "zoe_40")
+    with patch(
+        "custom_components.renault.RenaultHub.vehicles",
+        new_callable=PropertyMock,
+        return_value={vehicle_proxy.details.vin: vehicle_proxy},
+    ):
+        await _async_profile(hass, vehicle_proxy, tmp_path)
+
+
+async def test_profile_duration(hass):
+    """Test the profiling duration is bounded."""
+    await setup_services_integration(hass)
+
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_PROFILE, {"duration": 3600}, blocking=True
+        )
+    assert RENAULT_PROFILER not in hass.data
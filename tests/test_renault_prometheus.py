@@ -0,0 +1,78 @@
+"""Tests for the Prometheus export of Renault metrics."""
+from unittest.mock import AsyncMock, PropertyMock, patch
+
+from homeassistant.setup import async_setup_component
+from renault_api.kamereon import exceptions
+
+from custom_components.renault.const import CONF_PROMETHEUS_METRICS
+from custom_components.renault.renault_hub import RenaultHub
+from custom_components.renault.renault_prometheus import METRICS_URL, render_metrics
+
+from . import create_vehicle_proxy, setup_renault_integration
+
+
+async def test_render_metrics(hass):
+    """Test metrics are rendered in Prometheus text format."""
+    vehicle_proxy = await create_vehicle_proxy(hass, "zoe_40")
+    hub = RenaultHub(hass, "fr_FR")
+    hub.vehicles[vehicle_proxy.details.vin] = vehicle_proxy
+    hub.metrics.token_refreshes = 2
+    vehicle_proxy.metrics.record_command("charge_start", "confirmed")
+
+    coordinator = vehicle_proxy.coordinators["charge_mode"]
+    with patch.object(
+        coordinator,
+        "update_method",
+        AsyncMock(
+            side_effect=exceptions.NotSupportedException(
+                "err.tech.501", "This feature is not technically supported"
+            )
+        ),
+    ):
+        await coordinator.async_refresh()
+        await coordinator.async_refresh()
+
+    lines = render_metrics({"account_id_2": hub}).splitlines()
+    labels = 'vin="VF1AAAAA555777999",endpoint="charge_mode"'
+    assert 'renault_token_refreshes_total{account="account_id_2"} 2' in lines
+    assert "# TYPE renault_request_duration_seconds histogram" in lines
+    assert f'renault_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in lines
+    assert f"renault_request_duration_seconds_count{{{labels}}} 2" in lines
+    assert (
+        f'renault_request_errors_total{{{labels},error="NotSupportedException"}} 1'
+        in lines
+    )
+    assert f"renault_refresh_duration_seconds_count{{{labels}}} 3" in lines
+    assert f'renault_polls_skipped_total{{{labels},reason="disabled"}} 1' in lines
+    assert f'renault_endpoint_disabled{{{labels},reason="not_supported"}} 1' in lines
+    assert "renault_disabled_endpoints 1" in lines
+    assert (
+        'renault_commands_total{vin="VF1AAAAA555777999",service="charge_start",'
+        'outcome="confirmed"} 1'
+    ) in lines
+
+
+async def test_metrics_view(hass, hass_client):
+    """Test the metrics view is registered when enabled in the options."""
+    await async_setup_component(hass, "http", {})
+    await async_setup_component(hass, "persistent_notification", {})
+    vehicle_proxy = await create_vehicle_proxy(hass, "zoe_40")
+
+    with patch(
+        "custom_components.renault.RenaultHub.vehicles",
+        new_callable=PropertyMock,
+        return_value={
+            vehicle_proxy.details.vin: vehicle_proxy,
+        },
+    ), patch("custom_components.renault.SUPPORTED_PLATFORMS", []):
+        await setup_renault_integration(hass, {CONF_PROMETHEUS_METRICS: True})
+        client = await hass_client()
+        response = await client.get(METRICS_URL)
+        assert response.status == 200
+        assert response.headers["Content-Type"].startswith("text/plain")
+        body = await response.text()
+
+    assert (
+        'renault_request_duration_seconds_count{vin="VF1AAAAA555777999",'
+        'endpoint="battery"} 1'
+    ) in body.splitlines()
@@ -0,0 +1,77 @@
+"""Tests for Renault charging rates."""
+import dataclasses
+from datetime import timedelta
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import load_fixture
+import pytest
+from renault_api.kamereon import schemas
+
+from custom_components.renault.renault_rates import (
+    RenaultChargingRates,
+    RollingRegression,
+)
+from custom_components.renault.renault_snapshots import BatterySnapshot
+
+BATTERY_STATUS = schemas.KamereonVehicleDataResponseSchema.loads(
+    load_fixture("battery_status_charging.json")
+).get_attributes(schemas.KamereonVehicleBatteryStatusDataSchema)
+
+
+def _snapshot(minutes: int, **changes) -> BatterySnapshot:
+    """Create a battery snapshot, some minutes after 20:00."""
+    timestamp = dt_util.parse_datetime("2020-01-12T20:00:00Z") + timedelta(
+        minutes=minutes
+    )
+    data = dataclasses.replace(
+        BATTERY_STATUS, timestamp=timestamp.isoformat(), **changes
+    )
+    return BatterySnapshot(data, distances_in_miles=False, power_in_watts=False)
+
+
+def test_rolling_regression():
+    """Test the slope only covers the samples in the window."""
+    regression = RollingRegression(3)
+    assert regression.fit() is None
+    regression.add(0, 10)
+    assert regression.fit() is None
+
+    regression.add(1, 12)
+    regression.add(2, 14)
+    assert regression.fit() == pytest.approx((2, 10))
+
+    # The first samples leave the window
+    regression.add(3, 13)
+    regression.add(4, 12)
+    assert len(regression) == 3
+    assert regression.fit() == pytest.approx((-1, 16))
+
+
+def test_charging_rates():
+    """Test charging rates and end of charge prediction."""
+    rates = RenaultChargingRates(size=4)
+    assert rates.energy_rate is None
+    assert rates.charge_end is None
+
+    # 5 kWh, 10% and 40 km per hour, with the battery level rounded
+    for minutes, level in ((0, 60), (30, 65), (60, 70), (90, 76), (120, 80)):
+        rates.async_record(
+            _snapshot(
+                minutes,
+                batteryLevel=level,
+                batteryAvailableEnergy=30 + minutes / 12,
+                batteryAutonomy=140 + minutes * 2 / 3,
+            )
+        )
+    assert rates.energy_rate == pytest.approx(5)
+    assert rates.autonomy_rate == pytest.approx(40)
+    assert rates.level_rate == pytest.approx(10, abs=0.5)
+    # Smoothed level at 22:00 is about 80.3%, so full around 23:59
+    charge_end = rates.charge_end
+    assert dt_util.parse_datetime("2020-01-12T23:50:00Z") < charge_end
+    assert charge_end < dt_util.parse_datetime("2020-01-13T00:10:00Z")
+
+    # Rates are reset when charging stops
+    rates.async_record(_snapshot(150, chargingStatus=0.0))
+    assert rates.energy_rate is None
+    assert rates.charge_end is None
@@ -0,0 +1,115 @@
+"""End-to-end tests of the Renault integration against a stand-in server."""
+from unittest.mock import patch
+
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.setup import async_setup_component
+import pytest
+
+from custom_components.renault.const import DOMAIN
+from custom_components.renault.services import SERVICE_CHARGE_START
+
+from .const import MOCK_VEHICLES
+from .renault_server import (
+    ACCOUNT_ID,
+    RenaultServer,
+    setup_renault_integration_with_server,
+)
+
+
+@pytest.fixture
+async def renault_server():
+    """Start a stand-in server with a ZOE."""
+    server = RenaultServer(["zoe_40"])
+    await server.start()
+    yield server
+    await server.stop()
+
+
+async def _setup(hass, server, platforms=(SENSOR_DOMAIN,)):
+    """Set up the integration and its platforms against the server."""
+    await async_setup_component(hass, "persistent_notification", {})
+    with patch("custom_components.renault.SUPPORTED_PLATFORMS", list(platforms)):
+        config_entry = await setup_renault_integration_with_server(hass, server)
+    return config_entry
+
+
+async def test_setup(hass, renault_server):
+    """Test the integration logs in and polls through HTTP."""
+    await _setup(hass, renault_server)
+
+    for expected_entity in MOCK_VEHICLES["zoe_40"][SENSOR_DOMAIN]:
+        if expected_entity.get("disabled"):
+            continue
+        state = hass.states.get(expected_entity["entity_id"])
+        assert state.state == expected_entity["result"]
+
+    assert renault_server.request_count("/gigya/accounts.login") == 1
+    assert renault_server.request_count("/gigya/accounts.getJWT") == 1
+    # Vehicles, vehicle details, cockpit, hvac-status, battery-status and charge-mode
+    assert renault_server.request_count("/kamereon") == 6
+    renault_hub = hass.data[DOMAIN][ACCOUNT_ID]
+    assert renault_hub.metrics.token_refreshes == 1
+
+
+async def test_invalid_credentials(hass, renault_server):
+    """Test the setup fails with invalid credentials."""
+    renault_server.password = "other"
+    await _setup(hass, renault_server)
+    assert ACCOUNT_ID not in hass.data.get(DOMAIN, {})
+
+
+@pytest.mark.parametrize(
+    "status,attribute", [(403, "access_denied"), (501, "not_supported")]
+)
+async def test_endpoint_disabled(hass, renault_server, status, attribute):
+    """Test access denied and not supported endpoints are disabled."""
+    renault_server.endpoint_errors["hvac-status"] = status
+    await _setup(hass, renault_server)
+
+    vehicle = hass.data[DOMAIN][ACCOUNT_ID].vehicles["VF1AAAAA555777999"]
+    assert "hvac_status" not in vehicle.coordinators
+    assert vehicle.metrics.endpoint("hvac_status").disabled == attribute
+    assert hass.states.get("sensor.vf1aaaaa555777999_outside_temperature") is None
+
+
+async def test_errors_and_rate_limit(hass, renault_server):
+    """Test upstream errors and quota errors make entities unavailable."""
+    await _setup(hass, renault_server)
+    vehicle = hass.data[DOMAIN][ACCOUNT_ID].vehicles["VF1AAAAA555777999"]
+    coordinator = vehicle.coordinators["battery"]
+
+    renault_server.error_rate = 1.0
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    state = hass.states.get("sensor.vf1aaaaa555777999_battery_level")
+    assert state.state == STATE_UNAVAILABLE
+    assert vehicle.metrics.endpoint("battery").errors == {"InvalidUpstreamException": 1}
+
+    renault_server.error_rate = 0.0
+    renault_server.rate_limit = (1, 3600)
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert vehicle.metrics.endpoint("battery").errors == {
+        "InvalidUpstreamException": 1,
+        "QuotaLimitException": 1,
+    }
+
+
+async def test_command(hass, renault_server):
+    """Test commands are posted to the action endpoints."""
+    renault_server.latency = 0.01
+    await _setup(hass, renault_server, platforms=())
+
+    await hass.services.async_call(
+        DOMAIN, SERVICE_CHARGE_START, {"vin": "VF1AAAAA555777999"}, blocking=True
+    )
+    assert renault_server.actions == [
+        (
+            "VF1AAAAA555777999",
+            "actions/charging-start",
+            {"type": "ChargingStart", "attributes": {"action": "start"}},
+        )
+    ]
@@ -0,0 +1,70 @@
+"""Tests for Renault charging sessions."""
+import dataclasses
+
+from pytest_homeassistant_custom_component.common import load_fixture
+import pytest
+from renault_api.kamereon import schemas
+
+from custom_components.renault.renault_sessions import RenaultChargingSessions
+from custom_components.renault.renault_snapshots import BatterySnapshot
+
+BATTERY_STATUS = schemas.KamereonVehicleDataResponseSchema.loads(
+    load_fixture("battery_status_charging.json")
+).get_attributes(schemas.KamereonVehicleBatteryStatusDataSchema)
+
+
+def _snapshot(timestamp: str, **changes) -> BatterySnapshot:
+    """Create a battery snapshot."""
+    data = dataclasses.replace(BATTERY_STATUS, timestamp=timestamp, **changes)
+    return BatterySnapshot(data, distances_in_miles=False, power_in_watts=False)
+
+
+async def test_charging_session(hass):
+    """Test a charging session is detected and its energy accounted."""
+    sessions = RenaultChargingSessions(hass, "VF1AAAAA555777999")
+
+    sessions.async_record(_snapshot("2020-01-12T20:00:00Z", chargingStatus=0.0))
+    assert not sessions.session_active
+
+    sessions.async_record(_snapshot("2020-01-12T21:00:00Z"))
+    assert sessions.session_active
+    assert sessions.session_start == "2020-01-12T21:00:00Z"
+
+    # Available energy increased by 3 kWh
+    sessions.async_record(_snapshot("2020-01-12T22:00:00Z", batteryAvailableEnergy=34))
+    assert sessions.session_energy == 3
+
+    # Available energy unchanged: fall back to 7 kW for 30 minutes
+    sessions.async_record(
+        _snapshot(
+            "2020-01-12T22:30:00Z",
+            batteryAvailableEnergy=34,
+            chargingInstantaneousPower=7,
+        )
+    )
+    assert sessions.session_energy == pytest.approx(3 + 7 * 0.5 / 2 + 27 * 0.5 / 2)
+
+    # Duplicate updates are ignored
+    energy = sessions.session_energy
+    sessions.async_record(_snapshot("2020-01-12T22:30:00Z", batteryAvailableEnergy=40))
+    assert sessions.session_energy == energy
+
+    # Unplugging ends the session
+    sessions.async_record(
+        _snapshot(
+            "2020-01-12T23:00:00Z",
+            batteryAvailableEnergy=34,
+            plugStatus=0,
+            chargingStatus=0.0,
+        )
+    )
+    assert not sessions.session_active
+    assert sessions.session_end == "2020-01-12T23:00:00Z"
+    assert sessions.total_energy == energy
+
+    # A new session starts from zero, the total keeps increasing
+    sessions.async_record(_snapshot("2020-01-13T21:00:00Z"))
+    sessions.async_record(_snapshot("2020-01-13T22:00:00Z", batteryAvailableEnergy=32))
+    assert sessions.session_count == 2
+    assert sessions.session_energy == 1
+    assert sessions.total_energy == energy + 1
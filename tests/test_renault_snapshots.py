@@ -0,0 +1,73 @@
+"""Tests for Renault coordinator snapshots."""
+import dataclasses
+
+import pytest
+from pytest_homeassistant_custom_component.common import load_fixture
+from renault_api.kamereon import schemas
+
+from custom_components.renault.renault_snapshots import BatterySnapshot, CockpitSnapshot
+
+
+def _load_attributes(fixture: str, schema):
+    """Load the attributes of a Kamereon fixture."""
+    return schemas.KamereonVehicleDataResponseSchema.loads(
+        load_fixture(fixture)
+    ).get_attributes(schema)
+
+
+def test_battery_snapshot():
+    """Test battery snapshot derived values."""
+    data = _load_attributes(
+        "battery_status_charging.json", schemas.KamereonVehicleBatteryStatusDataSchema
+    )
+    snapshot = BatterySnapshot(data, distances_in_miles=True, power_in_watts=True)
+
+    assert snapshot.battery_level == 60
+    assert snapshot.battery_autonomy == 88
+    assert snapshot.charging_power == 0.027
+    assert snapshot.plug_state == "plugged"
+    assert snapshot.plugged_in is True
+    assert snapshot.charge_state == "charge_in_progress"
+    assert snapshot.charging is True
+    assert snapshot.battery_icon == "mdi:battery-charging-60"
+
+
+def test_battery_snapshot_autonomy_in_kilometres():
+    """Test battery autonomy is only rounded when converted to miles."""
+    data = _load_attributes(
+        "battery_status_charging.json", schemas.KamereonVehicleBatteryStatusDataSchema
+    )
+    data = dataclasses.replace(data, batteryAutonomy=141.6)
+
+    snapshot = BatterySnapshot(data, distances_in_miles=False, power_in_watts=True)
+    assert snapshot.battery_autonomy == 141.6
+    snapshot = BatterySnapshot(data, distances_in_miles=True, power_in_watts=True)
+    assert snapshot.battery_autonomy == 88
+
+
+def test_cockpit_snapshot():
+    """Test cockpit snapshot derived values."""
+    data = _load_attributes(
+        "cockpit_fuel.json", schemas.KamereonVehicleCockpitDataSchema
+    )
+    snapshot = CockpitSnapshot(data, distances_in_miles=False, is_metric=True)
+
+    assert snapshot.mileage == 5567
+    assert snapshot.fuel_autonomy == 35
+    assert snapshot.fuel_quantity == 3
+
+
+def test_snapshot_is_immutable():
+    """Test snapshots cannot be modified."""
+    data = _load_attributes(
+        "battery_status_not_charging.json",
+        schemas.KamereonVehicleBatteryStatusDataSchema,
+    )
+    snapshot = BatterySnapshot(data, distances_in_miles=False, power_in_watts=False)
+
+    assert snapshot.charging is False
+    with pytest.raises(AttributeError):
+        snapshot.battery_level = 100
+    with pytest.raises(AttributeError):
+        snapshot.unknown = 1
+    assert not hasattr(snapshot, "__dict__")
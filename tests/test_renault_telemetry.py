@@ -0,0 +1,92 @@
+"""Tests for the Renault battery telemetry."""
+from unittest.mock import AsyncMock, patch
+
+from homeassistant.util import dt as dt_util
+import pytest
+
+from custom_components.renault.renault_telemetry import (
+    PLUG_STATUS_UNKNOWN,
+    RenaultTelemetry,
+    TelemetryBuffer,
+    TelemetrySample,
+)
+
+from . import create_vehicle_proxy
+
+
+def _fill(buffer: TelemetryBuffer, timestamps) -> None:
+    """Append a sample for each timestamp."""
+    for timestamp in timestamps:
+        buffer.append(timestamp, timestamp / 10, 30.0, 0.0, 20.0, 1)
+
+
+def test_buffer_ring():
+    """Test the buffer keeps the latest samples in chronological order."""
+    buffer = TelemetryBuffer(capacity=4)
+    _fill(buffer, [10, 20, 30])
+    # Columns grow with the samples, up to the capacity
+    assert len(buffer._columns["timestamp"]) == 3
+    _fill(buffer, [40, 50, 60])
+
+    assert len(buffer) == 4
+    assert len(buffer._columns["timestamp"]) == 4
+    assert buffer.last_timestamp == 60
+    assert list(buffer.column("timestamp")) == [30, 40, 50, 60]
+    assert list(buffer.column("timestamp", 35, 60)) == [40, 50]
+    assert list(buffer.column("battery_level", start=50)) == [5, 6]
+    assert list(buffer.column("timestamp", 70)) == []
+
+    # Samples which are not newer than the latest are ignored
+    assert not buffer.append(60, 1.0, 1.0, 1.0, 1.0, 1)
+    assert len(buffer) == 4
+
+
+def test_buffer_samples_and_serialization():
+    """Test samples round-trip through the binary format."""
+    buffer = TelemetryBuffer(capacity=4)
+    _fill(buffer, [10, 20, 30])
+    buffer.append(40, float("nan"), 31.0, 3.5, 21.0, PLUG_STATUS_UNKNOWN)
+
+    restored = TelemetryBuffer.from_bytes(buffer.to_bytes(), capacity=2)
+    assert list(restored.samples()) == [
+        TelemetrySample(30, 3, 30.0, 0.0, 20.0, 1),
+        TelemetrySample(40, None, 31.0, 3.5, 21.0, None),
+    ]
+
+
+def test_buffer_truncated_file():
+    """Test files which do not hold the announced samples are rejected."""
+    buffer = TelemetryBuffer()
+    _fill(buffer, [10, 20, 30])
+    data = buffer.to_bytes()
+
+    with pytest.raises(ValueError):
+        TelemetryBuffer.from_bytes(data[:-1])
+    with pytest.raises(ValueError):
+        TelemetryBuffer.from_bytes(data + b"\0")
+
+
+async def test_telemetry_recorded_and_persisted(hass):
+    """Test battery updates are recorded, and persisted on unload."""
+    vehicle_proxy = await create_vehicle_proxy(hass, "zoe_40")
+    coordinator = vehicle_proxy.coordinators["battery"]
+    telemetry = vehicle_proxy.telemetry
+    timestamp = dt_util.parse_datetime("2020-01-12T21:40:16Z").timestamp()
+
+    (sample,) = telemetry.buffer.samples()
+    assert sample == TelemetrySample(timestamp, 60, 31, sample.charging_power, 20, 1)
+    # Columns are single precision
+    assert sample.charging_power == pytest.approx(0.027)
+
+    # Unchanged battery data is not recorded twice
+    with patch.object(
+        coordinator, "update_method", AsyncMock(return_value=coordinator.data)
+    ):
+        await coordinator.async_refresh()
+    assert len(telemetry.buffer) == 1
+
+    await vehicle_proxy.async_unload()
+    restored = RenaultTelemetry(hass, vehicle_proxy.details.vin)
+    await restored.async_load()
+    assert list(restored.buffer.samples()) == list(telemetry.buffer.samples())
+    await restored.async_unload()
@@ -1,15 +1,23 @@
 """Tests for Renault sensors."""
-from unittest.mock import PropertyMock, patch
+import dataclasses
+from unittest.mock import AsyncMock, PropertyMock, patch
 
 from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
 from homeassistant.const import STATE_UNAVAILABLE
 from homeassistant.setup import async_setup_component
 import pytest
 from pytest_homeassistant_custom_component.common import (
+    load_fixture,
     mock_device_registry,
     mock_registry,
 )
+from renault_api.kamereon import schemas
 
+from custom_components.renault.const import DOMAIN
+from custom_components.renault.renault_budget import REQUEST_POLL
+from custom_components.renault.renault_entities import RenaultDataEntity
+from custom_components.renault.renault_vehicle import LAZY_SCAN_INTERVAL
+from custom_components.renault.sensor import RenaultBatteryLevelSensor
 from tests.const import MOCK_VEHICLES
 
 from . import (
@@ -18,6 +26,8 @@ from . import (
     setup_renault_integration,
 )
 
+REQUESTS_ENTITY_ID = "sensor.account_id_2_requests"
+
 
 @pytest.mark.parametrize("vehicle_type", MOCK_VEHICLES.keys())
 async def test_sensors(hass, vehicle_type):
@@ -39,7 +49,7 @@ async def test_sensors(hass, vehicle_type):
         await hass.async_block_till_done()
 
     mock_vehicle = MOCK_VEHICLES[vehicle_type]
-    assert len(device_registry.devices) == 1
+    assert len(device_registry.devices) == 2
     expected_device = mock_vehicle["expected_device"]
     registry_entry = device_registry.async_get_device(expected_device["identifiers"])
     assert registry_entry is not None
@@ -50,7 +60,10 @@ async def test_sensors(hass, vehicle_type):
     assert registry_entry.sw_version == expected_device["sw_version"]
 
     expected_entities = mock_vehicle[SENSOR_DOMAIN]
-    assert len(entity_registry.entities) == len(expected_entities)
+    assert len(entity_registry.entities) == len(expected_entities) + 1
+    registry_entry = entity_registry.entities.get(REQUESTS_ENTITY_ID)
+    assert registry_entry.unique_id == "account_id_2_requests"
+    assert hass.states.get(REQUESTS_ENTITY_ID).state == "0"
     for expected_entity in expected_entities:
         entity_id = expected_entity["entity_id"]
         registry_entry = entity_registry.entities.get(entity_id)
@@ -58,6 +71,10 @@ async def test_sensors(hass, vehicle_type):
         assert registry_entry.unique_id == expected_entity["unique_id"]
         assert registry_entry.unit_of_measurement == expected_entity.get("unit")
         assert registry_entry.device_class == expected_entity.get("class")
+        if expected_entity.get("disabled"):
+            assert registry_entry.disabled
+            assert hass.states.get(entity_id) is None
+            continue
         state = hass.states.get(entity_id)
         assert state.state == expected_entity["result"]
 
@@ -82,7 +99,7 @@ async def test_sensor_errors(hass, vehicle_type):
         await hass.async_block_till_done()
 
     mock_vehicle = MOCK_VEHICLES[vehicle_type]
-    assert len(device_registry.devices) == 1
+    assert len(device_registry.devices) == 2
     expected_device = mock_vehicle["expected_device"]
     registry_entry = device_registry.async_get_device(expected_device["identifiers"])
     assert registry_entry is not None
@@ -93,7 +110,10 @@ async def test_sensor_errors(hass, vehicle_type):
     assert registry_entry.sw_version == expected_device["sw_version"]
 
     expected_entities = mock_vehicle[SENSOR_DOMAIN]
-    assert len(entity_registry.entities) == len(expected_entities)
+    assert len(entity_registry.entities) == len(expected_entities) + 1
+    registry_entry = entity_registry.entities.get(REQUESTS_ENTITY_ID)
+    assert registry_entry.unique_id == "account_id_2_requests"
+    assert hass.states.get(REQUESTS_ENTITY_ID).state == "0"
     for expected_entity in expected_entities:
         entity_id = expected_entity["entity_id"]
         registry_entry = entity_registry.entities.get(entity_id)
@@ -101,5 +121,188 @@ async def test_sensor_errors(hass, vehicle_type):
         assert registry_entry.unique_id == expected_entity["unique_id"]
         assert registry_entry.unit_of_measurement == expected_entity.get("unit")
         assert registry_entry.device_class == expected_entity.get("class")
+        if expected_entity.get("disabled"):
+            assert registry_entry.disabled
+            assert hass.states.get(entity_id) is None
+            continue
         state = hass.states.get(entity_id)
         assert state.state == STATE_UNAVAILABLE
+
+
+async def test_sensor_attributes_cached_per_update(hass):
+    """Test Renault sensor attributes are only rebuilt after a coordinator update."""
+    vehicle_proxy = await create_vehicle_proxy(hass, "zoe_40")
+    coordinator = vehicle_proxy.coordinators["battery"]
+    sensor = RenaultBatteryLevelSensor(vehicle_proxy, "Battery Level")
+
+    attributes = sensor.device_state_attributes
+    assert attributes == {
+        "last_update": "2020-01-12T21:40:16Z",
+        "battery_available_energy": 31,
+    }
+    assert sensor.device_state_attributes is attributes
+    assert sensor.available
+
+    await coordinator.async_refresh()
+
+    assert sensor.device_state_attributes is not attributes
+    assert sensor.device_state_attributes == attributes
+
+
+async def test_sensor_skips_unchanged_state_writes(hass):
+    """Test Renault sensors only write state when their own values change."""
+    await async_setup_component(hass, "persistent_notification", {})
+    mock_registry(hass)
+    mock_device_registry(hass)
+
+    vehicle_proxy = await create_vehicle_proxy(hass, "zoe_40")
+
+    with patch(
+        "custom_components.renault.RenaultHub.vehicles",
+        new_callable=PropertyMock,
+        return_value={
+            vehicle_proxy.details.vin: vehicle_proxy,
+        },
+    ), patch("custom_components.renault.SUPPORTED_PLATFORMS", [SENSOR_DOMAIN]):
+        await setup_renault_integration(hass)
+        await hass.async_block_till_done()
+
+    coordinator = vehicle_proxy.coordinators["battery"]
+    with patch.object(
+        RenaultDataEntity, "async_write_ha_state", autospec=True
+    ) as mock_write:
+        await coordinator.async_refresh()
+    assert mock_write.call_count == 0
+
+    with patch.object(
+        RenaultDataEntity, "async_write_ha_state", autospec=True
+    ) as mock_write, patch.object(
+        coordinator,
+        "update_method",
+        AsyncMock(return_value=dataclasses.replace(coordinator.data, batteryLevel=61)),
+    ):
+        await coordinator.async_refresh()
+    written = {call.args[0].unique_id for call in mock_write.call_args_list}
+    assert written == {"vf1aaaaa555777999_battery_level"}
+
+    with patch.object(coordinator, "update_method", AsyncMock(return_value=None)):
+        await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert (
+        hass.states.get("sensor.vf1aaaaa555777999_battery_level").state
+        == STATE_UNAVAILABLE
+    )
+
+
+async def test_lazy_sensors_not_polled(hass):
+    """Test coordinators of disabled sensors are never created."""
+    await async_setup_component(hass, "persistent_notification", {})
+    mock_registry(hass)
+    mock_device_registry(hass)
+
+    vehicle_proxy = await create_vehicle_proxy(hass, "zoe_40")
+    assert vehicle_proxy.lazy_coordinators == [
+        "charging_settings",
+        "hvac_settings",
+        "charge_history",
+    ]
+
+    with patch(
+        "custom_components.renault.RenaultHub.vehicles",
+        new_callable=PropertyMock,
+        return_value={
+            vehicle_proxy.details.vin: vehicle_proxy,
+        },
+    ), patch("custom_components.renault.SUPPORTED_PLATFORMS", [SENSOR_DOMAIN]), patch(
+        "custom_components.renault.renault_vehicle.RenaultVehicleProxy.get_charging_settings"
+    ) as mock_get:
+        await setup_renault_integration(hass)
+        await hass.async_block_till_done()
+
+    mock_get.assert_not_called()
+    assert "charging_settings" not in vehicle_proxy.coordinators
+
+
+async def test_lazy_sensors_enabled(hass):
+    """Test coordinators are created when their sensors are enabled."""
+    await async_setup_component(hass, "persistent_notification", {})
+    entity_registry = mock_registry(hass)
+    mock_device_registry(hass)
+    for unique_id in (
+        "vf1aaaaa555777999_charge_schedules",
+        "vf1aaaaa555777999_hvac_schedules",
+        "vf1aaaaa555777999_monthly_charges",
+    ):
+        entity_registry.async_get_or_create(
+            SENSOR_DOMAIN, DOMAIN, unique_id, suggested_object_id=unique_id
+        )
+
+    with patch(
+        "custom_components.renault.renault_vehicle.RenaultVehicleProxy.get_charging_settings",
+        return_value=schemas.KamereonVehicleDataResponseSchema.loads(
+            load_fixture("charging_settings.json")
+        ).get_attributes(schemas.KamereonVehicleChargingSettingsDataSchema),
+    ) as mock_get_charging_settings, patch(
+        "custom_components.renault.renault_vehicle.RenaultVehicleProxy.get_hvac_settings",
+        return_value=schemas.KamereonVehicleDataResponseSchema.loads(
+            load_fixture("hvac_settings.json")
+        ).get_attributes(schemas.KamereonVehicleHvacSettingsDataSchema),
+    ), patch(
+        "custom_components.renault.renault_vehicle.RenaultVehicleProxy.get_monthly_charge_history",
+        return_value=schemas.KamereonVehicleDataResponseSchema.loads(
+            load_fixture("charge_history.json")
+        ).get_attributes(schemas.KamereonVehicleChargeHistoryDataSchema),
+    ):
+        vehicle_proxy = await create_vehicle_proxy(hass, "zoe_40")
+        with patch(
+            "custom_components.renault.RenaultHub.vehicles",
+            new_callable=PropertyMock,
+            return_value={
+                vehicle_proxy.details.vin: vehicle_proxy,
+            },
+        ), patch("custom_components.renault.SUPPORTED_PLATFORMS", [SENSOR_DOMAIN]):
+            await setup_renault_integration(hass)
+            await hass.async_block_till_done()
+
+    mock_get_charging_settings.assert_called_once()
+    assert vehicle_proxy.coordinators["charging_settings"].update_interval == (
+        LAZY_SCAN_INTERVAL
+    )
+
+    state = hass.states.get("sensor.vf1aaaaa555777999_charge_schedules")
+    assert state.state == "1"
+    assert state.attributes["mode"] == "scheduled"
+    state = hass.states.get("sensor.vf1aaaaa555777999_hvac_schedules")
+    assert state.state == "1"
+    state = hass.states.get("sensor.vf1aaaaa555777999_monthly_charges")
+    assert state.state == "8"
+    assert state.attributes["charge_duration"] == 1026
+
+
+async def test_request_budget_sensor(hass):
+    """Test the request budget sensor is on the account device, and pushed."""
+    await async_setup_component(hass, "persistent_notification", {})
+    entity_registry = mock_registry(hass)
+    device_registry = mock_device_registry(hass)
+
+    vehicle_proxy = await create_vehicle_proxy(hass, "zoe_40")
+    with patch(
+        "custom_components.renault.RenaultHub.vehicles",
+        new_callable=PropertyMock,
+        return_value={
+            vehicle_proxy.details.vin: vehicle_proxy,
+        },
+    ), patch("custom_components.renault.SUPPORTED_PLATFORMS", [SENSOR_DOMAIN]):
+        config_entry = await setup_renault_integration(hass)
+        await hass.async_block_till_done()
+
+    device = device_registry.async_get_device({(DOMAIN, "account_id_2")})
+    assert device.name == "Renault account account_id_2"
+    assert entity_registry.entities[REQUESTS_ENTITY_ID].device_id == device.id
+
+    renault_hub = hass.data[DOMAIN][config_entry.unique_id]
+    renault_hub.request_budget.record("battery", REQUEST_POLL)
+    state = hass.states.get(REQUESTS_ENTITY_ID)
+    assert state.state == "1"
+    assert state.attributes["hour_kinds"] == {REQUEST_POLL: 1}
+    assert state.attributes["day_budget"] is None
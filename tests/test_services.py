@@ -0,0 +1,516 @@
+"""Tests for Renault services."""
+import asyncio
+import dataclasses
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, PropertyMock, patch
+
+import aiohttp
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.setup import async_setup_component
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    async_capture_events,
+    load_fixture,
+)
+from renault_api.kamereon import exceptions, schemas
+import voluptuous as vol
+
+from custom_components.renault.const import DOMAIN
+from custom_components.renault.renault_commands import (
+    COMMAND_AC_CANCEL,
+    COMMAND_AC_START,
+    CommandSupersededError,
+)
+from custom_components.renault.services import (
+    EVENT_METRICS,
+    EVENT_SERVICE_RESULT,
+    RENAULT_VEHICLES,
+    SERVICE_AC_START,
+    SERVICE_CHARGE_SET_MODE,
+    SERVICE_CHARGE_SET_SCHEDULES,
+    SERVICE_CHARGE_START,
+    SERVICE_DUMP_METRICS,
+    SERVICE_EXPORT_LOCATION_HISTORY,
+    async_register_vehicles,
+    async_unregister_vehicles,
+)
+
+from . import create_vehicle_proxy, setup_renault_integration
+
+
+async def setup_services_integration(hass, vehicle_type: str = "zoe_40"):
+    """Set up the Renault integration with a single vehicle and no platforms."""
+    await async_setup_component(hass, "persistent_notification", {})
+    vehicle_proxy = await create_vehicle_proxy(hass, vehicle_type)
+
+    with patch(
+        "custom_components.renault.RenaultHub.vehicles",
+        new_callable=PropertyMock,
+        return_value={
+            vehicle_proxy.details.vin: vehicle_proxy,
+        },
+    ), patch("custom_components.renault.SUPPORTED_PLATFORMS", []):
+        config_entry = await setup_renault_integration(hass)
+        await hass.async_block_till_done()
+
+    return config_entry, vehicle_proxy
+
+
+async def test_service_dispatch_by_vin(hass):
+    """Test services find the vehicle through the VIN index."""
+    _, vehicle_proxy = await setup_services_integration(hass)
+    assert hass.data[RENAULT_VEHICLES] == {"VF1AAAAA555777999": vehicle_proxy}
+
+    with patch(
+        "custom_components.renault.renault_vehicle.RenaultVehicleProxy.send_charge_start"
+    ) as mock_action:
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_CHARGE_START,
+            {"vin": "vf1aaaaa555777999"},
+            blocking=True,
+        )
+    mock_action.assert_awaited_once_with()
+
+
+async def test_service_dispatch_by_account(hass):
+    """Test services run on every vehicle of an account and report results."""
+    _, vehicle_proxy = await setup_services_integration(hass)
+    events = async_capture_events(hass, EVENT_SERVICE_RESULT)
+
+    with patch(
+        "custom_components.renault.RenaultHub.vehicles",
+        new_callable=PropertyMock,
+        return_value={
+            vehicle_proxy.details.vin: vehicle_proxy,
+        },
+    ), patch(
+        "custom_components.renault.renault_vehicle.RenaultVehicleProxy.send_set_charge_mode"
+    ) as mock_action:
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_CHARGE_SET_MODE,
+            {"account": "account_id_2", "charge_mode": "Schedule_Mode"},
+            blocking=True,
+        )
+    mock_action.assert_awaited_once_with("schedule_mode")
+    assert len(events) == 1
+    assert events[0].data == {
+        "service": SERVICE_CHARGE_SET_MODE,
+        "vin": "VF1AAAAA555777999",
+        "success": True,
+    }
+
+
+async def test_service_reports_failure(hass):
+    """Test services report per-vehicle failures through an event."""
+    await setup_services_integration(hass)
+    events = async_capture_events(hass, EVENT_SERVICE_RESULT)
+
+    with patch(
+        "custom_components.renault.renault_vehicle.RenaultVehicleProxy.send_charge_start",
+        side_effect=exceptions.KamereonResponseException("err.func.403", "Denied"),
+    ):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_CHARGE_START,
+            {"vin": ["VF1AAAAA555777999", "vf1aaaaa555777999"]},
+            blocking=True,
+        )
+    assert len(events) == 1
+    assert events[0].data["success"] is False
+    assert "Denied" in events[0].data["error"]
+
+
+async def test_service_reports_client_errors(hass):
+    """Test a client error on one vehicle does not abort the other vehicles."""
+    _, vehicle_proxy = await setup_services_integration(hass)
+    other_proxy = await create_vehicle_proxy(hass, "zoe_50")
+    hass.data[RENAULT_VEHICLES][other_proxy.details.vin] = other_proxy
+    events = async_capture_events(hass, EVENT_SERVICE_RESULT)
+
+    with patch.object(
+        vehicle_proxy, "send_charge_start", side_effect=asyncio.TimeoutError
+    ), patch.object(
+        other_proxy,
+        "send_charge_start",
+        side_effect=aiohttp.ClientConnectionError("Connection reset"),
+    ):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_CHARGE_START,
+            {"vin": [vehicle_proxy.details.vin, other_proxy.details.vin]},
+            blocking=True,
+        )
+    assert {event.data["vin"]: event.data["error"] for event in events} == {
+        vehicle_proxy.details.vin: "TimeoutError",
+        other_proxy.details.vin: "Connection reset",
+    }
+    assert not any(event.data["success"] for event in events)
+
+
+async def test_service_reports_superseded_commands(hass):
+    """Test a command dropped for a newer one is reported as superseded."""
+    _, vehicle_proxy = await setup_services_integration(hass)
+    events = async_capture_events(hass, EVENT_SERVICE_RESULT)
+
+    with patch.object(
+        vehicle_proxy,
+        "send_ac_start",
+        side_effect=CommandSupersededError(COMMAND_AC_START, COMMAND_AC_CANCEL),
+    ), patch.object(vehicle_proxy, "async_wait_for_state") as mock_wait:
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_AC_START,
+            {"vin": vehicle_proxy.details.vin, "confirm_timeout": 60},
+            blocking=True,
+        )
+    mock_wait.assert_not_called()
+    assert events[0].data == {
+        "service": SERVICE_AC_START,
+        "vin": "VF1AAAAA555777999",
+        "success": False,
+        "superseded": True,
+    }
+    assert vehicle_proxy.metrics.commands == {(SERVICE_AC_START, "superseded"): 1}
+
+
+async def test_service_unknown_account(hass):
+    """Test services raise a service error for an unknown account."""
+    await setup_services_integration(hass)
+
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_CHARGE_START,
+            {"account": "account_id_0"},
+            blocking=True,
+        )
+
+
+async def test_service_unknown_vin(hass):
+    """Test services raise a service error for an unknown VIN."""
+    await setup_services_integration(hass)
+
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_CHARGE_START,
+            {"vin": "VF1AAAAA555777000"},
+            blocking=True,
+        )
+
+
+async def test_unload_removes_vehicles_from_index(hass):
+    """Test unloading the config entry removes its vehicles from the VIN index."""
+    config_entry, vehicle_proxy = await setup_services_integration(hass)
+
+    with patch(
+        "custom_components.renault.RenaultHub.vehicles",
+        new_callable=PropertyMock,
+        return_value={
+            vehicle_proxy.details.vin: vehicle_proxy,
+        },
+    ), patch("custom_components.renault.SUPPORTED_PLATFORMS", []):
+        assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert hass.data[RENAULT_VEHICLES] == {}
+    assert not hass.services.has_service(DOMAIN, SERVICE_CHARGE_START)
+
+
+async def test_unregister_keeps_vehicles_of_other_accounts(hass):
+    """Test a VIN shared by two accounts stays in the index until both unload."""
+    vehicle_1 = object()
+    vehicle_2 = object()
+    hub_1 = SimpleNamespace(vehicles={"VF1AAAAA555777999": vehicle_1})
+    hub_2 = SimpleNamespace(vehicles={"VF1AAAAA555777999": vehicle_2})
+    hass.data[DOMAIN] = {"account_id_1": hub_1, "account_id_2": hub_2}
+    async_register_vehicles(hass, hub_1)
+    async_register_vehicles(hass, hub_2)
+    assert hass.data[RENAULT_VEHICLES] == {"VF1AAAAA555777999": vehicle_2}
+
+    # The index points to the vehicle of the second account
+    del hass.data[DOMAIN]["account_id_1"]
+    async_unregister_vehicles(hass, hub_1)
+    assert hass.data[RENAULT_VEHICLES] == {"VF1AAAAA555777999": vehicle_2}
+
+    hass.data[DOMAIN]["account_id_1"] = hub_1
+    del hass.data[DOMAIN]["account_id_2"]
+    async_unregister_vehicles(hass, hub_2)
+    assert hass.data[RENAULT_VEHICLES] == {"VF1AAAAA555777999": vehicle_1}
+
+    del hass.data[DOMAIN]["account_id_1"]
+    async_unregister_vehicles(hass, hub_1)
+    assert hass.data[RENAULT_VEHICLES] == {}
+
+
+async def test_charge_set_schedules_skips_unchanged(hass):
+    """Test identical charge schedules are not uploaded again."""
+    _, vehicle_proxy = await setup_services_integration(hass)
+    charging_settings = schemas.KamereonVehicleDataResponseSchema.loads(
+        load_fixture("charging_settings.json")
+    ).get_attributes(schemas.KamereonVehicleChargingSettingsDataSchema)
+    schedule = {
+        "id": 1,
+        "activated": True,
+        "monday": {"startTime": "T12:00Z", "duration": 15},
+    }
+
+    with patch(
+        "custom_components.renault.renault_vehicle.RenaultVehicleProxy.get_charging_settings",
+        return_value=charging_settings,
+    ) as mock_get, patch(
+        "renault_api.renault_vehicle.RenaultVehicle.set_charge_schedules"
+    ) as mock_action:
+        for _ in range(2):
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_CHARGE_SET_SCHEDULES,
+                {"vin": vehicle_proxy.details.vin, "schedules": schedule},
+                blocking=True,
+            )
+    mock_get.assert_awaited_once_with()
+    mock_action.assert_awaited_once()
+    uploaded = mock_action.call_args[0][0]
+    assert uploaded[0].monday.startTime == "T12:00Z"
+    assert uploaded[0].tuesday.startTime == "T00:00Z"
+    assert uploaded[1] is charging_settings.schedules[1]
+
+
+async def test_charge_set_schedules_clears_day(hass):
+    """Test a null day clears the charge schedule of that day."""
+    _, vehicle_proxy = await setup_services_integration(hass)
+    charging_settings = schemas.KamereonVehicleDataResponseSchema.loads(
+        load_fixture("charging_settings.json")
+    ).get_attributes(schemas.KamereonVehicleChargingSettingsDataSchema)
+
+    with patch(
+        "custom_components.renault.renault_vehicle.RenaultVehicleProxy.get_charging_settings",
+        return_value=charging_settings,
+    ), patch(
+        "renault_api.renault_vehicle.RenaultVehicle.set_charge_schedules"
+    ) as mock_action:
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_CHARGE_SET_SCHEDULES,
+            {
+                "vin": vehicle_proxy.details.vin,
+                "schedules": {"id": 1, "tuesday": None},
+            },
+            blocking=True,
+        )
+    mock_action.assert_awaited_once()
+    uploaded = mock_action.call_args[0][0]
+    assert uploaded[0].monday.startTime == "T00:00Z"
+    assert uploaded[0].tuesday is None
+    assert uploaded[0].for_json()["tuesday"] is None
+
+
+async def test_charge_set_schedules_concurrent_updates(hass):
+    """Test concurrent updates of different charge schedules are all uploaded."""
+    _, vehicle_proxy = await setup_services_integration(hass)
+    charging_settings = schemas.KamereonVehicleDataResponseSchema.loads(
+        load_fixture("charging_settings.json")
+    ).get_attributes(schemas.KamereonVehicleChargingSettingsDataSchema)
+    uploads = []
+
+    async def set_charge_schedules(schedules):
+        uploads.append(schedules)
+        await asyncio.sleep(0)
+
+    with patch(
+        "custom_components.renault.renault_vehicle.RenaultVehicleProxy.get_charging_settings",
+        return_value=charging_settings,
+    ), patch(
+        "renault_api.renault_vehicle.RenaultVehicle.set_charge_schedules",
+        side_effect=set_charge_schedules,
+    ):
+        await asyncio.gather(
+            *(
+                hass.services.async_call(
+                    DOMAIN,
+                    SERVICE_CHARGE_SET_SCHEDULES,
+                    {
+                        "vin": vehicle_proxy.details.vin,
+                        "schedules": {"id": schedule_id, "activated": activated},
+                    },
+                    blocking=True,
+                )
+                for schedule_id, activated in ((1, False), (2, True))
+            )
+        )
+    assert len(uploads) == 2
+    # The second upload holds the update of the first one
+    assert [schedule.activated for schedule in uploads[0]] == [False, False]
+    assert [schedule.activated for schedule in uploads[1]] == [False, True]
+
+
+async def test_charge_set_schedules_validated_locally(hass):
+    """Test invalid charge schedules are rejected before anything is sent."""
+    _, vehicle_proxy = await setup_services_integration(hass)
+
+    with patch(
+        "custom_components.renault.renault_vehicle.RenaultVehicleProxy.get_charging_settings"
+    ) as mock_get, pytest.raises(vol.Invalid):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_CHARGE_SET_SCHEDULES,
+            {
+                "vin": vehicle_proxy.details.vin,
+                "schedules": {
+                    "id": 1,
+                    "monday": {"startTime": "T25:00Z", "duration": 15},
+                },
+            },
+            blocking=True,
+        )
+    mock_get.assert_not_called()
+
+
+async def test_service_waits_for_confirmation(hass):
+    """Test services can wait until the vehicle data confirms the command."""
+    _, vehicle_proxy = await setup_services_integration(hass)
+    events = async_capture_events(hass, EVENT_SERVICE_RESULT)
+    coordinator = vehicle_proxy.coordinators["hvac_status"]
+    hvac_off = coordinator.data
+    hvac_on = dataclasses.replace(hvac_off, hvacStatus="on")
+
+    with patch(
+        "custom_components.renault.renault_vehicle.RenaultVehicleProxy.send_ac_start"
+    ), patch(
+        "custom_components.renault.renault_vehicle.CONFIRMATION_POLL_INTERVAL", 0
+    ), patch.object(
+        coordinator, "update_method", AsyncMock(side_effect=[hvac_off, hvac_on])
+    ) as mock_update:
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_AC_START,
+            {"vin": vehicle_proxy.details.vin, "confirm_timeout": 60},
+            blocking=True,
+        )
+    assert mock_update.await_count == 2
+    assert len(events) == 1
+    assert events[0].data["success"] is True
+    assert events[0].data["confirmed"] is True
+    assert events[0].data["latency"] >= 0
+
+
+async def test_service_confirmation_ignores_failed_refresh(hass):
+    """Test a failed refresh does not confirm a command with stale data."""
+    _, vehicle_proxy = await setup_services_integration(hass)
+    events = async_capture_events(hass, EVENT_SERVICE_RESULT)
+    coordinator = vehicle_proxy.coordinators["charge_mode"]
+    error = exceptions.KamereonResponseException("err.func.500", "Unavailable")
+
+    with patch(
+        "custom_components.renault.renault_vehicle.RenaultVehicleProxy.send_set_charge_mode"
+    ), patch(
+        "custom_components.renault.renault_vehicle.CONFIRMATION_POLL_INTERVAL", 0
+    ), patch.object(
+        coordinator,
+        "update_method",
+        AsyncMock(side_effect=[error, coordinator.data]),
+    ) as mock_update:
+        # The charge mode of the last successful refresh already matches
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_CHARGE_SET_MODE,
+            {
+                "vin": vehicle_proxy.details.vin,
+                "charge_mode": coordinator.snapshot.charge_mode,
+                "confirm_timeout": 60,
+            },
+            blocking=True,
+        )
+    assert mock_update.await_count == 2
+    assert events[0].data["confirmed"] is True
+
+
+async def test_service_scheduled_ac_start_not_confirmed(hass):
+    """Test a scheduled A/C start does not wait for the A/C to be on."""
+    _, vehicle_proxy = await setup_services_integration(hass)
+    events = async_capture_events(hass, EVENT_SERVICE_RESULT)
+
+    with patch(
+        "custom_components.renault.renault_vehicle.RenaultVehicleProxy.send_ac_start"
+    ), patch.object(vehicle_proxy, "async_wait_for_state") as mock_wait:
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_AC_START,
+            {
+                "vin": vehicle_proxy.details.vin,
+                "when": "2021-04-01T08:00:00+00:00",
+                "confirm_timeout": 60,
+            },
+            blocking=True,
+        )
+    mock_wait.assert_not_called()
+    assert events[0].data == {
+        "service": SERVICE_AC_START,
+        "vin": "VF1AAAAA555777999",
+        "success": True,
+    }
+
+
+async def test_service_confirmation_timeout(hass):
+    """Test services report commands which are not confirmed in time."""
+    _, vehicle_proxy = await setup_services_integration(hass)
+    events = async_capture_events(hass, EVENT_SERVICE_RESULT)
+    coordinator = vehicle_proxy.coordinators["charge_mode"]
+
+    with patch(
+        "custom_components.renault.renault_vehicle.RenaultVehicleProxy.send_set_charge_mode"
+    ), patch.object(
+        coordinator, "update_method", AsyncMock(return_value=coordinator.data)
+    ):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_CHARGE_SET_MODE,
+            {
+                "vin": vehicle_proxy.details.vin,
+                "charge_mode": "schedule_mode",
+                "confirm_timeout": {"seconds": 0.1},
+            },
+            blocking=True,
+        )
+    assert len(events) == 1
+    assert events[0].data["success"] is True
+    assert events[0].data["confirmed"] is False
+
+
+async def test_export_location_history(hass, tmp_path):
+    """Test the location history is exported to the configuration directory."""
+    hass.config.config_dir = str(tmp_path)
+    _, vehicle_proxy = await setup_services_integration(hass, "zoe_50")
+    assert len(vehicle_proxy.location_history.history) == 1
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_EXPORT_LOCATION_HISTORY,
+        {"vin": vehicle_proxy.details.vin, "format": "geojson"},
+        blocking=True,
+    )
+    exported = json.loads(
+        (tmp_path / "renault_vf1aaaaa555777999_locations.geojson").read_text()
+    )
+    assert exported["features"][0]["geometry"]["coordinates"] == [
+        [11.123457, 48.123457]
+    ]
+
+
+async def test_dump_metrics(hass):
+    """Test the request metrics are reported through an event."""
+    _, vehicle_proxy = await setup_services_integration(hass)
+    events = async_capture_events(hass, EVENT_METRICS)
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_DUMP_METRICS,
+        {"vin": vehicle_proxy.details.vin},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    assert len(events) == 1
+    assert events[0].data["vin"] == "VF1AAAAA555777999"
+    assert events[0].data["metrics"]["battery"]["successes"] == 1